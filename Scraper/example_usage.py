@@ -5,6 +5,8 @@ Shows different ways to use the scraper toolkit
 """
 
 from rmsmc_scraper_toolkit import RMSMCScraperToolkit
+from rmsmc_category_index import CategoryIndex, build_category_index
+from rmsmc_search_index import SearchIndex
 import json
 
 def example_1_get_all_categories():
@@ -31,15 +33,15 @@ def example_2_find_specific_category():
     toolkit = RMSMCScraperToolkit()
     results = toolkit.get_cached_results()
     
-    search_term = "Sports"
+    # In-memory trigram index; pass a directory to keep it on disk
+    index = SearchIndex()
+    index.add_categories(results)
     
-    for site_key, site_data in results.items():
-        for cat in site_data['categories']:
-            if search_term.lower() in cat['name'].lower():
-                print(f"{site_data['site']}:")
-                print(f"  Name: {cat['name']}")
-                print(f"  URL: {cat['url']}")
-                print(f"  Slug: {cat['slug']}\n")
+    for match in index.search("Sports", kind='category'):
+        print(f"{results[match['site']]['site']}:")
+        print(f"  Name: {match['name']}")
+        print(f"  URL: {match['url']}")
+        print(f"  Slug: {match['slug']}\n")
 
 
 def example_3_count_categories():
@@ -179,6 +181,30 @@ def example_6_custom_format():
     print(f"  {output_file}")
 
 
+def example_7_lookup_by_url():
+    """Example 7: Look up categories by URL with the memory-mapped index"""
+    print("\n" + "=" * 60)
+    print("EXAMPLE 7: URL -> Category Index")
+    print("=" * 60 + "\n")
+    
+    toolkit = RMSMCScraperToolkit()
+    results = toolkit.get_cached_results()
+    
+    # Build once; any number of processes can then map the same file
+    index_file = '/mnt/user-data/outputs/rmsmc_categories.idx'
+    build_category_index(results, index_file)
+    
+    with CategoryIndex(index_file) as index:
+        for url in ['https://collegian.com/category/about-us/', 'https://kcsufm.com/category/podcast/',
+                    'https://collegeavemag.com/category/features/']:
+            category = index.lookup_url(url)
+            if category:
+                print(f"{url}")
+                print(f"  Site: {category['site']}")
+                print(f"  Name: {category['name']}")
+                print(f"  Slug: {category['slug']}\n")
+
+
 def main():
     """Run all examples"""
     example_1_get_all_categories()
@@ -187,6 +213,7 @@ def main():
     example_4_export_specific_site()
     example_5_generate_url_list()
     example_6_custom_format()
+    example_7_lookup_by_url()
     
     print("\n" + "=" * 60)
     print("✅ All examples completed!")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+RMSMC Category API
+Async HTTP server for the endpoints in API_DOCUMENTATION.md
+
+Usage:
+    python3 rmsmc_category_api.py serve [--store rmsmc_categories.json] [--port 8090]
+    python3 rmsmc_category_api.py loadtest --url http://127.0.0.1:8090 [--connections 64] [--duration 10]
+
+Endpoints:
+    GET /api/categories                 - All sites
+    GET /api/categories/{site}          - One site
+    GET /api/categories/{site}/{slug}   - One category (slugs may contain '/')
+
+Every response body is built once, when the store is loaded: serialized,
+gzip-compressed and tagged with an ETag. Serving a request is then a dict
+lookup and one write. If-None-Match gets a 304. When the store file
+changes (or on SIGHUP), the new data is validated and prebuilt in a worker
+thread and swapped in with a single reference assignment. In-flight
+requests finish against the old snapshot and none are dropped.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from rmsmc_scraper_toolkit import CATEGORY_STORE, validate_category_store
+
+API_PREFIX = '/api/categories'
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+_STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed', 413: 'Content Too Large', 431: 'Request Header Fields Too Large'}
+
+
+class PreparedResponse:
+    """A response body in identity and gzip form with ready-made header blocks"""
+
+    __slots__ = ('status', 'etag', 'plain', 'gzipped')
+
+    def __init__(self, status: int, payload, max_age: int = 60):
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha1(body).hexdigest()[:20]
+        self.status = status
+        self.etag = f'"{digest}"'
+        self.plain = self._build(body, self.etag, None, max_age)
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        # Strong ETags must differ per encoding
+        self.gzipped = (self._build(compressed, f'"{digest}-gz"', 'gzip', max_age)
+                        if len(compressed) < len(body) else self.plain)
+
+    def _build(self, body: bytes, etag: str, encoding: Optional[str], max_age: int) -> Tuple:
+        """(etag, headers before Date, headers after Date, body, 304 headers before Date)"""
+        shared = [f"Cache-Control: public, max-age={max_age}",
+                  'Vary: Accept-Encoding',
+                  'Access-Control-Allow-Origin: *',
+                  f"ETag: {etag}"]
+        head = [f"HTTP/1.1 {self.status} {_STATUS_TEXT[self.status]}",
+                'Content-Type: application/json; charset=utf-8'] + shared
+        if encoding:
+            head.append(f"Content-Encoding: {encoding}")
+        not_modified = ['HTTP/1.1 304 Not Modified'] + shared
+        return (etag,
+                ('\r\n'.join(head) + '\r\n').encode('latin-1'),
+                f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1'),
+                body,
+                ('\r\n'.join(not_modified) + '\r\n').encode('latin-1'))
+
+
+class CategorySnapshot:
+    """Immutable, fully prebuilt responses for one version of the store"""
+
+    def __init__(self, data: Dict, source: str = ''):
+        self.source = source
+        self.loaded_at = time.time()
+        self.routes = {}
+
+        self.routes[API_PREFIX] = PreparedResponse(200, data)
+        for site_key, site_data in data.items():
+            self.routes[f"{API_PREFIX}/{site_key}"] = PreparedResponse(200, site_data)
+            for cat in site_data.get('categories', []):
+                slug = cat['slug'].strip('/')
+                self.routes[f"{API_PREFIX}/{site_key}/{slug}"] = PreparedResponse(200, cat)
+
+        self.not_found = PreparedResponse(404, {'error': 'Not found'}, max_age=0)
+
+    def lookup(self, path: str) -> PreparedResponse:
+        return self.routes.get(path.rstrip('/') or '/', self.not_found)
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'CategorySnapshot':
+        with open(path, 'rb') as f:
+            data = validate_category_store(json.loads(f.read()), str(path))
+        return cls(data, str(path))
+
+
+class CategoryAPIProtocol(asyncio.Protocol):
+    """Minimal HTTP/1.1 with keep-alive and pipelining; GET and HEAD only"""
+
+    def __init__(self, server: 'CategoryAPIServer'):
+        self.server = server
+        self.transport = None
+        self.buffer = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self.buffer += data
+        while True:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                if len(self.buffer) > MAX_HEADER_BYTES:
+                    self._respond_error(431)
+                return
+            request = self._parse(bytes(self.buffer[:end]).decode('latin-1'))
+            if request is None:
+                return
+            # Requests carry no meaningful body here, but a sent one must be skipped whole
+            # before the next pipelined request can be read
+            request_end = end + 4 + request[4]
+            if len(self.buffer) < request_end:
+                return
+            del self.buffer[:request_end]
+            if not self._handle(*request[:4]):
+                return
+
+    def _parse(self, head: str) -> Optional[Tuple[str, str, str, Dict, int]]:
+        """(method, target, version, headers, body length), or None after answering a malformed request"""
+        lines = head.split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            self._respond_error(400)
+            return None
+
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'transfer-encoding' in headers:
+            self._respond_error(400)  # Chunked bodies are not supported; without a length there is no framing
+            return None
+        length = headers.get('content-length', '0')
+        if not (length.isascii() and length.isdigit()):
+            self._respond_error(400)
+            return None
+        if int(length) > MAX_BODY_BYTES:
+            self._respond_error(413)
+            return None
+        return method, target, version, headers, int(length)
+
+    def _handle(self, method: str, target: str, version: str, headers: Dict) -> bool:
+        """Answer one request; returns False once the connection is closing"""
+        keep_alive = (headers.get('connection', '').lower() != 'close'
+                      if version == 'HTTP/1.1' else headers.get('connection', '').lower() == 'keep-alive')
+
+        if method not in ('GET', 'HEAD'):
+            self._respond_error(405)
+            return False
+
+        response = self.server.snapshot.lookup(target.split('?', 1)[0])
+        self.server.requests += 1
+        variant = response.gzipped if 'gzip' in headers.get('accept-encoding', '') else response.plain
+        etag, before_date, after_date, body, not_modified = variant
+        date = self.server.date_header()
+
+        if response.status == 200 and self._etag_matches(headers.get('if-none-match'), etag):
+            self.transport.write(not_modified + date + b'\r\n')
+        elif method == 'HEAD':
+            self.transport.write(before_date + date + after_date)
+        else:
+            self.transport.write(before_date + date + after_date + body)
+
+        if not keep_alive:
+            self.transport.close()
+            return False
+        return True
+
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags
+
+    def _respond_error(self, status: int):
+        body = json.dumps({'error': _STATUS_TEXT[status]}).encode('utf-8')
+        self.transport.write(
+            f"HTTP/1.1 {status} {_STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+        )
+        self.transport.close()
+
+
+class CategoryAPIServer:
+    """Owns the current snapshot and reloads it when the store changes"""
+
+    def __init__(self, store_path: str = str(CATEGORY_STORE), reload_interval: float = 1.0):
+        self.store_path = Path(store_path)
+        self.reload_interval = reload_interval
+        self.snapshot = CategorySnapshot.from_file(self.store_path)
+        self.requests = 0
+        self._stat = self._stat_key()
+        self._date = (0, b'')
+
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.store_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def date_header(self) -> bytes:
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, f"Date: {formatdate(now, usegmt=True)}\r\n".encode('latin-1'))
+        return self._date[1]
+
+    async def reload(self, force: bool = False) -> bool:
+        """Rebuild off the event loop and swap in; a bad store keeps the current snapshot"""
+        stat = self._stat_key()
+        if stat is None or (stat == self._stat and not force):
+            return False
+        self._stat = stat
+        loop = asyncio.get_running_loop()
+        try:
+            snapshot = await loop.run_in_executor(None, CategorySnapshot.from_file, self.store_path)
+        except (ValueError, OSError) as e:
+            print(f"⚠️  Reload skipped, keeping previous data: {e}")
+            return False
+        self.snapshot = snapshot
+        print(f"♻️  Reloaded {len(snapshot.routes)} routes from {self.store_path}")
+        return True
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8090, reuse_port: bool = False):
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: CategoryAPIProtocol(self), host, port,
+                                          reuse_port=reuse_port or None, backlog=1024)
+        try:
+            loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(self.reload(force=True)))
+        except (NotImplementedError, AttributeError, ValueError):
+            pass  # No SIGHUP on this platform; file watching still applies
+
+        print(f"🚀 Category API listening on http://{host}:{port}{API_PREFIX}")
+        print(f"   {len(self.snapshot.routes)} routes from {self.store_path}")
+        watcher = asyncio.ensure_future(self._watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+# ---- Load test ----
+
+async def _load_client(host: str, port: int, paths, deadline: float, latencies: list, errors: list,
+                       pipeline: int):
+    reader, writer = await asyncio.open_connection(host, port)
+    requests = [f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n\r\n".encode('latin-1')
+                for path in paths]
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            batch = [requests[(i + k) % len(requests)] for k in range(pipeline)]
+            i += pipeline
+            started = time.perf_counter()
+            writer.write(b''.join(batch))
+            for _ in batch:
+                head = await reader.readuntil(b'\r\n\r\n')
+                status = int(head[9:12])
+                start = head.find(b'Content-Length: ')
+                length = int(head[start + 16:head.find(b'\r\n', start)]) if start >= 0 else 0
+                if length:
+                    await reader.readexactly(length)
+                if status != 200:
+                    errors.append(status)
+            latencies.append((time.perf_counter() - started) / len(batch))
+    except (asyncio.IncompleteReadError, ConnectionError) as e:
+        errors.append(str(e))
+    finally:
+        writer.close()
+
+
+def _loadtest_worker(url: str, paths, connections: int, duration: float, pipeline: int, queue):
+    from urllib.parse import urlsplit
+    parsed = urlsplit(url)
+
+    async def run():
+        latencies, errors = [], []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[
+            _load_client(parsed.hostname, parsed.port or 80, paths, deadline, latencies, errors, pipeline)
+            for _ in range(connections)
+        ])
+        return latencies, errors
+
+    latencies, errors = asyncio.run(run())
+    queue.put((len(latencies) * pipeline, sorted(latencies), len(errors)))
+
+
+def loadtest(url: str, connections: int = 64, duration: float = 10, processes: int = 2,
+             pipeline: int = 1) -> Dict:
+    """Drive the API from client processes and report throughput and latency"""
+    import urllib.request
+    with urllib.request.urlopen(url.rstrip('/') + API_PREFIX) as response:
+        data = json.loads(response.read())
+    paths = [API_PREFIX]
+    for site_key, site_data in data.items():
+        paths.append(f"{API_PREFIX}/{site_key}")
+        paths += [f"{API_PREFIX}/{site_key}/{cat['slug'].strip('/')}" for cat in site_data.get('categories', [])]
+
+    queue = multiprocessing.Queue()
+    per_process = max(1, connections // processes)
+    workers = [multiprocessing.Process(target=_loadtest_worker,
+                                       args=(url, paths, per_process, duration, pipeline, queue))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    results = [queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    total = sum(r[0] for r in results)
+    latencies = sorted(l for r in results for l in r[1])
+    pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else 0
+    return {
+        'requests': total,
+        'errors': sum(r[2] for r in results),
+        'requests_per_second': round(total / duration),
+        'p50_ms': round(pick(0.50), 3),
+        'p99_ms': round(pick(0.99), 3),
+        'paths': len(paths)
+    }
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='RMSMC category HTTP API')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='Run the API server')
+    serve.add_argument('--store', default=str(CATEGORY_STORE), help='Category store JSON')
+    serve.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    serve.add_argument('--port', type=int, default=8090, help='Port to listen on')
+    serve.add_argument('--reload-interval', type=float, default=1.0, help='Seconds between store change checks')
+
+    load = subparsers.add_parser('loadtest', help='Measure throughput against a running server')
+    load.add_argument('--url', default='http://127.0.0.1:8090', help='Server base URL')
+    load.add_argument('--connections', type=int, default=64, help='Concurrent keep-alive connections')
+    load.add_argument('--duration', type=float, default=10, help='Seconds to run')
+    load.add_argument('--processes', type=int, default=2, help='Client processes')
+    load.add_argument('--pipeline', type=int, default=1, help='Requests in flight per connection')
+    args = parser.parse_args()
+
+    if args.command == 'loadtest':
+        result = loadtest(args.url, args.connections, args.duration, args.processes, args.pipeline)
+        print(f"📈 {result['requests_per_second']:,} req/s over {args.duration:.0f}s "
+              f"({result['requests']:,} requests, {result['errors']} errors, {result['paths']} paths)")
+        print(f"   latency p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms")
+        sys.exit(1 if result['errors'] else 0)
+
+    try:
+        server = CategoryAPIServer(args.store, args.reload_interval)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot load category store: {e}")
+        sys.exit(1)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+
+
+if __name__ == '__main__':
+    main()
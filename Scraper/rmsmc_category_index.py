@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+RMSMC Category Index
+Compact, memory-mapped URL -> category lookup table
+
+The index is a single file of interned, sorted strings plus integer arrays.
+Loading it maps the file and reads a fixed header, so startup does no parsing
+and any number of worker processes share the same pages. Lookups binary-search
+the sorted arrays in place (O(log n)); category records are O(1) by id.
+
+Usage:
+    python3 rmsmc_category_index.py build --input rmsmc_categories.json --output categories.idx
+    python3 rmsmc_category_index.py build --input rmsmc_categories.json --articles articles.csv --output categories.idx
+    python3 rmsmc_category_index.py lookup --index categories.idx https://collegian.com/category/articles/news/
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+MAGIC = b'RMSCIDX1'
+HEADER = struct.Struct('<8sBxxxIIIII')  # magic, byteorder, counts...
+NO_PARENT = 0xFFFFFFFF
+CATEGORY_FIELDS = 5  # site, slug, name, url, parent
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL to host + path, without scheme, www, query or trailing slash"""
+    parsed = urlsplit(url if '//' in url else '//' + url)
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = re.sub(r'/+', '/', parsed.path).rstrip('/')
+    return host + path
+
+
+def _slug_key(site: str, slug: str) -> str:
+    return f"{site}\x00{slug.strip('/')}"
+
+
+class _StringTable:
+    """Sequence view over the interned string section, usable with bisect"""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+    def find(self, value: str) -> Optional[int]:
+        key = value.encode('utf-8')
+        i = bisect.bisect_left(self, key)
+        if i < len(self) and self[i] == key:
+            return i
+        return None
+
+    def text(self, i: int) -> str:
+        return self[i].decode('utf-8')
+
+
+class CategoryIndex:
+    """Read-only, memory-mapped category index"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, byteorder, string_count, blob_len, category_count, url_count, slug_count = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a category index")
+        if byteorder != (0 if sys.byteorder == 'little' else 1):
+            raise ValueError(f"{path} was built on a machine with different byte order")
+
+        pos = HEADER.size
+        offsets, pos = self._ints(pos, string_count + 1)
+        blob = self._view[pos:pos + blob_len]
+        pos += _padded(blob_len)
+        self._categories, pos = self._ints(pos, category_count * CATEGORY_FIELDS)
+        self._url_keys, pos = self._ints(pos, url_count)
+        self._url_cats, pos = self._ints(pos, url_count)
+        self._slug_keys, pos = self._ints(pos, slug_count)
+        self._slug_cats, pos = self._ints(pos, slug_count)
+
+        self.strings = _StringTable(offsets, blob)
+        self._site_hosts = None
+
+    def _ints(self, pos: int, count: int) -> Tuple[memoryview, int]:
+        end = pos + count * 4
+        return self._view[pos:end].cast('I'), end
+
+    def __len__(self) -> int:
+        return len(self._categories) // CATEGORY_FIELDS
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping; views handed out earlier become invalid"""
+        for name in ('_categories', '_url_keys', '_url_cats', '_slug_keys', '_slug_cats'):
+            getattr(self, name).release()
+        self.strings._offsets.release()
+        self.strings._blob.release()
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def category(self, category_id: int) -> Dict:
+        """Return the category record for an id"""
+        base = category_id * CATEGORY_FIELDS
+        site, slug, name, url, parent = self._categories[base:base + CATEGORY_FIELDS]
+        return {
+            'id': category_id,
+            'site': self.strings.text(site),
+            'slug': self.strings.text(slug),
+            'name': self.strings.text(name),
+            'url': self.strings.text(url),
+            'parent': None if parent == NO_PARENT else parent
+        }
+
+    def ancestors(self, category_id: int) -> List[Dict]:
+        """Return the parent chain of a category, nearest first"""
+        chain = []
+        parent = self._categories[category_id * CATEGORY_FIELDS + 4]
+        while parent != NO_PARENT and len(chain) < len(self):
+            chain.append(self.category(parent))
+            parent = self._categories[parent * CATEGORY_FIELDS + 4]
+        return chain
+
+    def category_id_for_url(self, url: str, site: Optional[str] = None) -> Optional[int]:
+        """Return the category id for a URL, or for a path when site is given"""
+        key = canonical_url(url)
+        if url.startswith('/'):
+            host = self._hosts().get(site) if site else None
+            if host is None:
+                return None
+            key = host + key
+
+        return self._search(self._url_keys, self._url_cats, key)
+
+    def category_id_for_slug(self, site: str, slug: str) -> Optional[int]:
+        """Return the category id for a site's slug"""
+        return self._search(self._slug_keys, self._slug_cats, _slug_key(site, slug))
+
+    def lookup_url(self, url: str, site: Optional[str] = None) -> Optional[Dict]:
+        category_id = self.category_id_for_url(url, site)
+        return None if category_id is None else self.category(category_id)
+
+    def lookup_slug(self, site: str, slug: str) -> Optional[Dict]:
+        category_id = self.category_id_for_slug(site, slug)
+        return None if category_id is None else self.category(category_id)
+
+    def _search(self, keys: memoryview, values: memoryview, key: str) -> Optional[int]:
+        string_id = self.strings.find(key)
+        if string_id is None:
+            return None
+        i = bisect.bisect_left(keys, string_id)
+        if i < len(keys) and keys[i] == string_id:
+            return values[i]
+        return None
+
+    def _hosts(self) -> Dict[str, str]:
+        # Sites are few, so resolving site -> host once from the category table is cheap
+        if self._site_hosts is None:
+            hosts = {}
+            for category_id in range(len(self)):
+                base = category_id * CATEGORY_FIELDS
+                site = self.strings.text(self._categories[base])
+                if site not in hosts:
+                    url = self.strings.text(self._categories[base + 3])
+                    hosts[site] = canonical_url(url).split('/', 1)[0]
+            self._site_hosts = hosts
+        return self._site_hosts
+
+
+def _padded(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _iter_categories(data: Dict) -> Iterator[Tuple[str, Dict]]:
+    for site_key, site_data in data.items():
+        if 'error' in site_data:
+            continue
+        for cat in site_data.get('categories', []):
+            yield site_key, cat
+
+
+def build_category_index(data: Dict, output_path: str,
+                         articles: Iterable[Tuple[str, str, str]] = ()) -> Path:
+    """
+    Write an index for category data in the rmsmc_categories.json shape.
+
+    articles yields (site, article_url, category_slug) and adds article-level
+    URLs to the URL map. The file is replaced atomically, so processes that
+    already mapped the previous index keep a consistent view.
+    """
+    categories = []
+    slug_ids = {}
+
+    for site_key, cat in _iter_categories(data):
+        slug = cat['slug'].strip('/')
+        slug_ids[(site_key, slug)] = len(categories)
+        categories.append((site_key, slug, cat['name'], cat['url'], cat.get('parent')))
+
+    url_entries = {}
+    for category_id, (site_key, slug, _, url, _) in enumerate(categories):
+        url_entries.setdefault(canonical_url(url), category_id)
+
+    for site_key, article_url, category_slug in articles:
+        category_id = slug_ids.get((site_key, category_slug.strip('/')))
+        if category_id is not None:
+            url_entries.setdefault(canonical_url(article_url), category_id)
+
+    slug_entries = {_slug_key(site, slug): cid for (site, slug), cid in slug_ids.items()}
+
+    # Intern every string once; sorting makes string id order match text order
+    strings = set(url_entries) | set(slug_entries)
+    for site_key, slug, name, url, _ in categories:
+        strings.update((site_key, slug, name, url))
+    encoded = sorted(s.encode('utf-8') for s in strings)
+    string_ids = {s.decode('utf-8'): i for i, s in enumerate(encoded)}
+
+    offsets = array('I', [0])
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+    blob = b''.join(encoded)
+
+    category_table = array('I')
+    for site_key, slug, name, url, parent in categories:
+        parent_slug = parent or (slug.rsplit('/', 1)[0] if '/' in slug else None)
+        parent_id = slug_ids.get((site_key, parent_slug), NO_PARENT) if parent_slug else NO_PARENT
+        category_table.extend((string_ids[site_key], string_ids[slug], string_ids[name],
+                               string_ids[url], parent_id))
+
+    url_pairs = sorted((string_ids[k], v) for k, v in url_entries.items())
+    slug_pairs = sorted((string_ids[k], v) for k, v in slug_entries.items())
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 0 if sys.byteorder == 'little' else 1, len(encoded),
+                            len(blob), len(categories), len(url_pairs), len(slug_pairs)))
+        offsets.tofile(f)
+        f.write(blob)
+        f.write(b'\0' * (_padded(len(blob)) - len(blob)))
+        category_table.tofile(f)
+        for pairs in (url_pairs, slug_pairs):
+            array('I', (k for k, _ in pairs)).tofile(f)
+            array('I', (v for _, v in pairs)).tofile(f)
+    os.replace(tmp_path, output_path)
+
+    return output_path
+
+
+def _read_articles(path: str) -> Iterator[Tuple[str, str, str]]:
+    """Stream (site, url, category_slug) rows from a CSV with those headers"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield row['site'], row['url'], row['category_slug']
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='Build or query the RMSMC category index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build an index from category JSON')
+    build.add_argument('--input', default='rmsmc_categories.json', help='Category JSON file')
+    build.add_argument('--articles', help='CSV of site,url,category_slug article rows')
+    build.add_argument('--output', default='rmsmc_categories.idx', help='Index file to write')
+
+    lookup = subparsers.add_parser('lookup', help='Look up URLs or paths')
+    lookup.add_argument('--index', default='rmsmc_categories.idx', help='Index file')
+    lookup.add_argument('--site', help='Site key for path-only lookups')
+    lookup.add_argument('urls', nargs='+', help='URLs or paths to look up')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.input, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        articles = _read_articles(args.articles) if args.articles else ()
+        output_path = build_category_index(data, args.output, articles)
+        with CategoryIndex(output_path) as index:
+            print(f"💾 Wrote {len(index)} categories to {output_path} "
+                  f"({output_path.stat().st_size:,} bytes)")
+    else:
+        with CategoryIndex(args.index) as index:
+            for url in args.urls:
+                category = index.lookup_url(url, args.site)
+                if category:
+                    print(f"✅ {url} -> {category['site']}/{category['slug']} ({category['name']})")
+                else:
+                    print(f"❌ {url} -> no category")
+
+
+if __name__ == '__main__':
+    main()
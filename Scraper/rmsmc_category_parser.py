@@ -159,7 +159,7 @@ Each category contains:
 
 ## API Endpoints
 
-If this were deployed as a web service, endpoints would be:
+`rmsmc_category_api.py serve` serves these from `rmsmc_categories.json` (gzip and ETag/If-None-Match supported; the store is reloaded when it changes):
 
 ### GET /api/categories
 Get all categories from all sites
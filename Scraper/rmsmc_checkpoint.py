@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+RMSMC Crawl Checkpoints
+Persists a crawl's frontier, seen-URL set and partial results so a crawl that
+dies partway through can resume instead of starting over
+"""
+
+import hashlib
+import json
+import math
+import os
+import struct
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over URLs, stored as a plain bit array"""
+
+    HEADER = struct.Struct('<8sQI')  # magic, bit count, hash count
+    MAGIC = b'RMSBLOOM'
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001,
+                 bits: Optional[bytearray] = None, num_bits: int = 0, num_hashes: int = 0):
+        if bits is not None:
+            self.num_bits = num_bits
+            self.num_hashes = num_hashes
+            self.bits = bits
+        else:
+            self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+            self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def save(self, path: Path):
+        """Write atomically and durably, since a checkpoint's state.json will point at this file"""
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.num_bits, self.num_hashes))
+            f.write(self.bits)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'BloomFilter':
+        with open(path, 'rb') as f:
+            magic, num_bits, num_hashes = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            if magic != cls.MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            bits = bytearray(f.read())
+        return cls(bits=bits, num_bits=num_bits, num_hashes=num_hashes)
+
+
+class CrawlCheckpoint:
+    """
+    Checkpoint directory for a frontier crawl.
+
+    state.json holds the frontier and partial results and names the Bloom
+    filter file written with it. The filter is written first under a new
+    generation name and state.json is replaced atomically afterwards, so a
+    crash at any point leaves a matching pair on disk.
+    """
+
+    def __init__(self, directory: str, interval_seconds: float = 30, interval_pages: int = 50,
+                 capacity: int = 1_000_000):
+        self.directory = Path(directory)
+        self.interval_seconds = interval_seconds
+        self.interval_pages = interval_pages
+        self.capacity = capacity
+        self.generation = 0
+        self._last_save = time.monotonic()
+        self._pages_since_save = 0
+
+    @property
+    def state_path(self) -> Path:
+        return self.directory / 'state.json'
+
+    def exists(self) -> bool:
+        return self.state_path.exists()
+
+    def new_seen_set(self) -> BloomFilter:
+        return BloomFilter(capacity=self.capacity)
+
+    def load(self) -> Tuple[Deque, Dict, BloomFilter]:
+        """Return (frontier, partial results, seen set) from the last checkpoint"""
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.generation = state['generation']
+        seen = BloomFilter.load(self.directory / state['seen_file'])
+        frontier = deque(tuple(item) for item in state['frontier'])
+        return frontier, state['results'], seen
+
+    def save(self, frontier: Deque, results: Dict, seen: BloomFilter):
+        """Write a checkpoint now"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.generation += 1
+        seen_file = f"seen.{self.generation}.bloom"
+        seen.save(self.directory / seen_file)
+
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generation': self.generation,
+                'saved_at': time.time(),
+                'seen_file': seen_file,
+                'frontier': list(frontier),
+                'results': results
+            }, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+        for old in self.directory.glob('seen.*.bloom*'):
+            if old.name != seen_file:
+                old.unlink()
+
+        self._last_save = time.monotonic()
+        self._pages_since_save = 0
+
+    def maybe_save(self, frontier: Deque, results: Dict, seen: BloomFilter):
+        """Save if enough pages or time have passed since the last checkpoint"""
+        self._pages_since_save += 1
+        if (self._pages_since_save >= self.interval_pages
+                or time.monotonic() - self._last_save >= self.interval_seconds):
+            self.save(frontier, results, seen)
+
+    def clear(self):
+        """Remove checkpoint files once a crawl has finished"""
+        if self.state_path.exists():
+            self.state_path.unlink()
+        for old in self.directory.glob('seen.*.bloom*'):
+            old.unlink()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+RMSMC Crawl Queue
+SQLite-backed work queue for crawling many sites with any number of worker
+processes, on one host or several hosts sharing the database file
+
+Usage:
+    python3 rmsmc_crawl_queue.py init --db crawl.db --sites rmsmc_sites.json
+    python3 rmsmc_crawl_queue.py worker --db crawl.db --processes 8 [--expand-categories]
+    python3 rmsmc_crawl_queue.py status --db crawl.db
+    python3 rmsmc_crawl_queue.py collect --db crawl.db --output-dir ./outputs
+
+Tasks are leased, not popped: a worker holds a time-limited lease that it
+renews with heartbeats. Results are only accepted from the current lease
+holder, so a task that outlives a crashed worker's lease is picked up again
+exactly once and never recorded twice.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from rmsmc_fetcher import CircuitOpenError
+from rmsmc_scraper_toolkit import RMSMCScraperToolkit, SITES_FILE, load_site_registry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sites (
+    site TEXT PRIMARY KEY,
+    info TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    site TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL,
+    UNIQUE (kind, site, url)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, lease_expires);
+"""
+
+
+class CrawlQueue:
+    """Lease-based task queue stored in a SQLite database"""
+
+    def __init__(self, db_path: str, max_attempts: int = 3, wal: bool = True, retry_delay: float = 5.0):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.wal = wal
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets readers run alongside a writer; it needs shared memory, so
+        # hosts sharing the file over a network filesystem should pass wal=False
+        self.conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self.conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front so two workers cannot lease the same row
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def close(self):
+        self.conn.close()
+
+    def register_sites(self, sites: Dict):
+        """Store the registry and enqueue one homepage task per site"""
+        with self._transaction() as conn:
+            for site_key, site_info in sites.items():
+                conn.execute('INSERT OR REPLACE INTO sites (site, info) VALUES (?, ?)',
+                             (site_key, json.dumps(site_info)))
+                conn.execute('INSERT OR IGNORE INTO tasks (kind, site, url, updated_at) VALUES (?, ?, ?, ?)',
+                             ('site', site_key, site_info['url'], time.time()))
+
+    def sites(self) -> Dict:
+        return {row['site']: json.loads(row['info']) for row in self.conn.execute('SELECT site, info FROM sites')}
+
+    def requeue_all(self):
+        """Reset every task to pending for a fresh crawl"""
+        with self._transaction() as conn:
+            conn.execute("""UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = NULL,
+                            attempts = 0, result = NULL, error = NULL, updated_at = ?""", (time.time(),))
+
+    def lease(self, worker_id: str, lease_seconds: float = 60) -> Optional[Dict]:
+        """Lease the next pending or expired task, or return None"""
+        with self._transaction() as conn:
+            while True:
+                now = time.time()
+                row = conn.execute(
+                    """SELECT id, kind, site, url, attempts FROM tasks
+                       WHERE (status = 'pending' AND COALESCE(lease_expires, 0) <= ?)
+                          OR (status = 'leased' AND lease_expires < ?)
+                       ORDER BY id LIMIT 1""",
+                    (now, now)
+                ).fetchone()
+                if row is None:
+                    return None
+
+                if row['attempts'] >= self.max_attempts:
+                    # Lease expired on the last allowed attempt: the worker kept dying
+                    conn.execute("""UPDATE tasks SET status = 'failed', lease_owner = NULL,
+                                    error = COALESCE(error, 'lease expired'), updated_at = ? WHERE id = ?""",
+                                 (now, row['id']))
+                    continue
+
+                conn.execute(
+                    """UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                       attempts = attempts + 1, updated_at = ? WHERE id = ?""",
+                    (worker_id, now + lease_seconds, now, row['id'])
+                )
+                return dict(row, attempts=row['attempts'] + 1)
+
+    def heartbeat(self, task_id: int, worker_id: str, lease_seconds: float = 60) -> bool:
+        """Extend a lease; False means the lease was lost to another worker"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """UPDATE tasks SET lease_expires = ?, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (time.time() + lease_seconds, time.time(), task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: int, worker_id: str, result: Dict, discovered: List[Dict] = ()) -> bool:
+        """Record a result and enqueue discovered tasks, only if the lease is still held"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_owner = NULL,
+                   lease_expires = NULL, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (json.dumps(result), time.time(), task_id, worker_id)
+            )
+            if cursor.rowcount != 1:
+                return False
+            for task in discovered:
+                conn.execute('INSERT OR IGNORE INTO tasks (kind, site, url, updated_at) VALUES (?, ?, ?, ?)',
+                             (task['kind'], task['site'], task['url'], time.time()))
+            return True
+
+    def fail(self, task_id: int, worker_id: str, error: str):
+        """Give a task back after an error; it fails permanently after max_attempts"""
+        with self._transaction() as conn:
+            # For pending tasks lease_expires is the earliest retry time (linear backoff)
+            conn.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                   error = ?, lease_owner = NULL, lease_expires = ? + attempts * ?, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (self.max_attempts, error, time.time(), self.retry_delay, time.time(), task_id, worker_id)
+            )
+
+    def release(self, task_id: int, worker_id: str, retry_in: float = 0):
+        """Return a task untouched (e.g. on shutdown) without counting the attempt, retryable after retry_in"""
+        with self._transaction() as conn:
+            conn.execute(
+                """UPDATE tasks SET status = 'pending', attempts = MAX(attempts - 1, 0), lease_owner = NULL,
+                   lease_expires = ?, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (time.time() + retry_in if retry_in else None, time.time(), task_id, worker_id)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        rows = self.conn.execute('SELECT status, COUNT(*) AS n FROM tasks GROUP BY status')
+        return {row['status']: row['n'] for row in rows}
+
+    def outstanding(self) -> int:
+        """Tasks not yet done or failed"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def collect(self, last_good: Optional[Callable[[str], Optional[Dict]]] = None) -> Dict:
+        """
+        Merge finished tasks into the toolkit's per-site results shape. A site
+        whose homepage task failed gets last_good(site) instead, marked 'stale',
+        when that returns a result.
+        """
+        sites = self.sites()
+        categories = {site_key: {} for site_key in sites}
+        errors = {}
+        scraped_at = {}
+
+        for row in self.conn.execute('SELECT kind, site, status, result, error FROM tasks ORDER BY id'):
+            if row['status'] == 'done':
+                result = json.loads(row['result'])
+                for cat in result.get('categories', []):
+                    categories[row['site']].setdefault(cat['slug'], cat)
+                scraped_at[row['site']] = max(scraped_at.get(row['site'], ''), result.get('scraped_at', ''))
+            elif row['status'] == 'failed' and row['kind'] == 'site':
+                errors[row['site']] = row['error']
+
+        results = {}
+        for site_key, site_info in sites.items():
+            if site_key in errors:
+                fallback = last_good(site_key) if last_good else None
+                if fallback:
+                    results[site_key] = {**fallback, 'stale': errors[site_key]}
+                else:
+                    results[site_key] = {'site': site_info['name'], 'url': site_info['url'],
+                                         'error': errors[site_key]}
+                continue
+            site_categories = sorted(categories[site_key].values(), key=lambda x: x['slug'])
+            results[site_key] = {
+                'site': site_info['name'],
+                'url': site_info['url'],
+                'total_categories': len(site_categories),
+                'categories': site_categories,
+                'scraped_at': scraped_at.get(site_key)
+            }
+        return results
+
+
+class CrawlWorker:
+    """Leases tasks from a CrawlQueue and scrapes them until the queue drains"""
+
+    def __init__(self, db_path: str, worker_id: Optional[str] = None, lease_seconds: float = 60,
+                 expand_categories: bool = False, timeout: int = 10, poll_interval: float = 2.0,
+                 wal: bool = True):
+        self.queue = CrawlQueue(db_path, wal=wal)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.expand_categories = expand_categories
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.toolkit = RMSMCScraperToolkit(output_dir=os.path.dirname(os.path.abspath(db_path)))
+
+    def run(self) -> int:
+        """Process tasks until none are pending or leased; returns tasks completed"""
+        sites = self.queue.sites()
+        completed = 0
+
+        while True:
+            task = self.queue.lease(self.worker_id, self.lease_seconds)
+            if task is None:
+                if self.queue.outstanding() == 0:
+                    break
+                # Others hold leases; wait in case one expires and needs picking up
+                time.sleep(self.poll_interval)
+                continue
+
+            if task['site'] not in sites:
+                # Seeded by another process after this worker started
+                sites = self.queue.sites()
+            site_info = sites.get(task['site'])
+            if site_info is None:
+                print(f"  ❌ [{self.worker_id}] {task['site']} {task['url']}: unknown site")
+                self.queue.fail(task['id'], self.worker_id, f"unknown site: {task['site']}")
+                continue
+
+            try:
+                if self._process(task, site_info):
+                    completed += 1
+            except KeyboardInterrupt:
+                self.queue.release(task['id'], self.worker_id)
+                raise
+
+        self.queue.close()
+        return completed
+
+    def _process(self, task: Dict, site_info: Dict) -> bool:
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task['id'], stop), daemon=True)
+        heartbeat.start()
+
+        try:
+            result = self.toolkit.scrape_site(task['site'], site_info, timeout=self.timeout, page_url=task['url'])
+        except CircuitOpenError as e:
+            # Nothing was fetched; don't spend an attempt, come back when the breaker allows a probe
+            stop.set()
+            heartbeat.join()
+            print(f"  ⏸️  [{self.worker_id}] {task['site']} {task['url']}: {e}")
+            self.queue.release(task['id'], self.worker_id, retry_in=max(e.retry_in, 1.0))
+            return False
+        except Exception as e:
+            stop.set()
+            heartbeat.join()
+            print(f"  ❌ [{self.worker_id}] {task['site']} {task['url']}: {e}")
+            self.queue.fail(task['id'], self.worker_id, str(e))
+            return False
+
+        stop.set()
+        heartbeat.join()
+
+        discovered = []
+        if self.expand_categories and task['kind'] == 'site':
+            discovered = [
+                {'kind': 'category_page', 'site': task['site'], 'url': cat['url']}
+                for cat in result['categories']
+            ]
+
+        if self.queue.complete(task['id'], self.worker_id, result, discovered):
+            print(f"  ✅ [{self.worker_id}] {task['site']} {task['url']}: {result['total_categories']} categories")
+            return True
+
+        print(f"  ⚠️  [{self.worker_id}] Lease lost for {task['url']}; result discarded")
+        return False
+
+    def _heartbeat(self, task_id: int, stop: threading.Event):
+        # sqlite3 connections cannot be shared across threads, so heartbeats use their own
+        queue = CrawlQueue(self.queue.db_path, self.queue.max_attempts, self.queue.wal)
+        try:
+            while not stop.wait(self.lease_seconds / 3):
+                if not queue.heartbeat(task_id, self.worker_id, self.lease_seconds):
+                    return
+        finally:
+            queue.close()
+
+
+def _run_worker(db_path: str, lease_seconds: float, expand_categories: bool, timeout: int, wal: bool) -> int:
+    return CrawlWorker(db_path, lease_seconds=lease_seconds, expand_categories=expand_categories,
+                       timeout=timeout, wal=wal).run()
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='Sharded RMSMC crawl over a SQLite work queue')
+    parser.add_argument('--db', default='crawl.db', help='Queue database (shared by all workers)')
+    parser.add_argument('--no-wal', action='store_true', help='Use rollback journaling (for network filesystems)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    init = subparsers.add_parser('init', help='Register sites and enqueue their homepages')
+    init.add_argument('--sites', default=str(SITES_FILE), help='Site registry JSON file')
+    init.add_argument('--recrawl', action='store_true', help='Reset all existing tasks to pending')
+
+    worker = subparsers.add_parser('worker', help='Process tasks until the queue drains')
+    worker.add_argument('--processes', type=int, default=1, help='Worker processes to start on this host')
+    worker.add_argument('--lease', type=float, default=60, help='Lease length in seconds')
+    worker.add_argument('--timeout', type=int, default=10, help='HTTP timeout per page')
+    worker.add_argument('--expand-categories', action='store_true',
+                        help='Also crawl each discovered category page for nested categories')
+
+    subparsers.add_parser('status', help='Show task counts')
+
+    collect = subparsers.add_parser('collect', help='Write merged results in the toolkit formats')
+    collect.add_argument('--output-dir', default='/mnt/user-data/outputs', help='Directory for output files')
+    collect.add_argument('--format', choices=['json', 'csv', 'markdown', 'all'], default='all', help='Output format')
+
+    args = parser.parse_args()
+    wal = not args.no_wal
+
+    if args.command == 'init':
+        queue = CrawlQueue(args.db, wal=wal)
+        sites = load_site_registry(args.sites)
+        queue.register_sites(sites)
+        if args.recrawl:
+            queue.requeue_all()
+        print(f"📋 Registered {len(sites)} sites in {args.db}: {queue.counts()}")
+
+    elif args.command == 'worker':
+        print(f"🚀 Starting {args.processes} worker process(es) on {socket.gethostname()}...")
+        worker_args = (args.db, args.lease, args.expand_categories, args.timeout, wal)
+        if args.processes == 1:
+            completed = [_run_worker(*worker_args)]
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                completed = pool.starmap(_run_worker, [worker_args] * args.processes)
+        print(f"\n✅ Completed {sum(completed)} tasks")
+
+    elif args.command == 'status':
+        print(json.dumps(CrawlQueue(args.db, wal=wal).counts(), indent=2))
+
+    else:
+        toolkit = RMSMCScraperToolkit(output_dir=args.output_dir)
+        results = CrawlQueue(args.db, wal=wal).collect(last_good=toolkit.last_good_result)
+        if not results:
+            print("❌ No results to save")
+            sys.exit(1)
+        toolkit.print_summary(results)
+        if args.format in ['json', 'all']:
+            print(f"💾 JSON: {toolkit.save_json(results)}")
+        if args.format in ['csv', 'all']:
+            print(f"💾 CSV: {toolkit.save_csv(results)}")
+        if args.format in ['markdown', 'all']:
+            print(f"💾 Markdown: {toolkit.save_markdown(results)}")
+
+
+if __name__ == '__main__':
+    main()
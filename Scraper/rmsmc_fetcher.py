@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+RMSMC Fetcher
+HTTP fetching with per-host tail-latency controls: adaptive timeouts from
+observed latency percentiles, a hedged duplicate request after the p95
+delay, and a circuit breaker that fails fast while an origin is down
+
+Usage:
+    python3 rmsmc_fetcher.py standin --port 8765 [--slow-rate 0.05 --slow-delay 3] [--fail-rate 0.1] [--flap 20]
+    python3 rmsmc_fetcher.py bench --url http://127.0.0.1:8765/ [--requests 300] [--no-hedge]
+
+The stand-in serves a small WordPress-like homepage with category links, so
+a site registry pointing at it exercises live mode end to end.
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching while a host's circuit is open"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"circuit open for {host}; next attempt in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class LatencyTracker:
+    """Rolling window of response times for one host"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """None until enough samples have been seen to trust the tail"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures. After
+    reset_timeout one trial request is let through (half-open); its success
+    closes the circuit, its failure reopens it with the cooldown doubled, up
+    to max_reset_timeout.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 600.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() >= self.opened_at + self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False  # Open, or a half-open trial is already in flight
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            elif self.failures < self.failure_threshold:
+                return
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+class HostState:
+    def __init__(self, window: int, min_samples: int, failure_threshold: int, reset_timeout: float):
+        self.latency = LatencyTracker(window, min_samples)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.counters = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'failures': 0, 'rejected': 0}
+
+
+class HedgedFetcher:
+    """
+    GET with per-host adaptive timeouts, hedging and circuit breaking.
+
+    Until a host has min_samples responses, requests use the caller's
+    timeout and are not hedged. After that, the deadline is p99 latency times
+    timeout_multiplier, clamped to [min_timeout, caller's timeout]. If the
+    first attempt has not answered by the p95 latency, a second identical
+    request is sent and whichever answers first wins. A first attempt that
+    errors quickly is retried once the same way. Timeouts, connection errors
+    and 5xx responses count as failures for the host's circuit breaker; 4xx
+    responses are real answers and are returned.
+    """
+
+    def __init__(self, max_timeout: float = 10.0, min_timeout: float = 0.5, timeout_multiplier: float = 3.0,
+                 hedge: bool = True, min_hedge_delay: float = 0.02, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, window: int = 200, min_samples: int = 20, max_workers: int = 16):
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("HedgedFetcher requires the 'requests' package")
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.window = window
+        self.min_samples = min_samples
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rmsmc-fetch')
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def host_state(self, host: str) -> HostState:
+        with self._lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostState(self.window, self.min_samples,
+                                             self.failure_threshold, self.reset_timeout)
+            return self.hosts[host]
+
+    def timeout_for(self, host: str, cap: Optional[float] = None) -> float:
+        cap = cap or self.max_timeout
+        state = self.host_state(host)
+        p99 = state.latency.percentile(0.99)
+        if p99 is None or state.breaker.state == CircuitBreaker.HALF_OPEN:
+            # No history yet, or a recovery probe: give the origin the full allowance
+            return cap
+        return min(cap, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay_for(self, host: str) -> Optional[float]:
+        p95 = self.host_state(host).latency.percentile(0.95)
+        return None if p95 is None else max(self.min_hedge_delay, p95)
+
+    def get(self, url: str, headers: Optional[Dict] = None, timeout: Optional[float] = None) -> 'requests.Response':
+        """Fetch url; raises CircuitOpenError, requests exceptions, or returns the response (even 4xx/5xx)"""
+        host = urlsplit(url).netloc
+        state = self.host_state(host)
+        if not state.breaker.allow():
+            state.counters['rejected'] += 1
+            raise CircuitOpenError(host, state.breaker.retry_in())
+
+        state.counters['requests'] += 1
+        budget = self.timeout_for(host, timeout)
+        hedge_delay = self.hedge_delay_for(host) if self.hedge else None
+        start = time.monotonic()
+        deadline = start + budget
+
+        def attempt():
+            sent = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, timeout=max(0.05, deadline - sent))
+            except requests.Timeout:
+                # A censored sample at least as long as the timeout, so a host that has
+                # genuinely slowed down pulls its own timeout up instead of failing forever
+                state.latency.record(time.monotonic() - sent)
+                raise
+            # Every attempt is a sample, including hedge losers that finish after the caller moved on
+            if response.status_code < 500:
+                state.latency.record(time.monotonic() - sent)
+            return response
+
+        hedged = None
+        last_error = None
+        last_response = None
+        succeeded = False
+        try:
+            primary = self.executor.submit(attempt)
+            pending = {primary}
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                wake = deadline
+                if hedged is None and hedge_delay is not None:
+                    wake = min(wake, start + hedge_delay)
+                done, pending = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    try:
+                        response = future.result()
+                    except Exception as e:  # Not only RequestException: anything an attempt raises is a failed attempt
+                        last_error = e
+                        continue
+                    if response.status_code >= 500:
+                        last_response = response
+                        continue
+                    succeeded = True
+                    state.breaker.record_success()
+                    if future is hedged:
+                        state.counters['hedge_wins'] += 1
+                    return response
+
+                # Second attempt: at the p95 delay, or right away if the first one already failed
+                send_hedge = hedged is None and self.hedge and time.monotonic() < deadline and (
+                    not pending or (hedge_delay is not None and time.monotonic() >= start + hedge_delay)
+                )
+                if send_hedge:
+                    hedged = self.executor.submit(attempt)
+                    pending.add(hedged)
+                    state.counters['hedged'] += 1
+                elif not pending:
+                    break
+        finally:
+            # Every admitted request settles the breaker, or a half-open probe would block the host forever
+            if not succeeded:
+                state.counters['failures'] += 1
+                state.breaker.record_failure()
+
+        if last_response is not None:
+            return last_response
+        if last_error is not None:
+            raise last_error
+        raise requests.Timeout(f"{host} did not respond within {budget:.2f}s")
+
+    def summary(self) -> Dict:
+        """Per-host counters, breaker state and the current timeout/hedge settings"""
+        result = {}
+        for host, state in list(self.hosts.items()):
+            p50 = state.latency.percentile(0.50)
+            hedge_delay = self.hedge_delay_for(host)
+            result[host] = {
+                **state.counters,
+                'circuit': state.breaker.state,
+                'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'timeout_s': round(self.timeout_for(host), 3),
+                'hedge_after_ms': round(hedge_delay * 1000, 1) if hedge_delay is not None else None
+            }
+        return result
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+# ---- Local stand-in origin for testing ----
+
+STANDIN_CATEGORIES = ['news', 'sports', 'arts-culture', 'opinion', 'science']
+
+
+def make_standin_server(host: str = '127.0.0.1', port: int = 8765, delay: float = 0.01,
+                        slow_rate: float = 0.0, slow_delay: float = 2.0, fail_rate: float = 0.0,
+                        flap: float = 0.0, seed: Optional[int] = None) -> ThreadingHTTPServer:
+    """
+    A slow/flaky origin: every response takes `delay`, a slow_rate fraction
+    takes slow_delay instead, a fail_rate fraction gets a 503, and with flap
+    the server alternates between up and down (all 503s) every flap seconds.
+    """
+    rng = random.Random(seed)
+    started = time.monotonic()
+    links = ''.join(f'<li><a href="/category/{slug}/">{slug.replace("-", " ").title()}</a></li>'
+                    for slug in STANDIN_CATEGORIES)
+    page = (f'<html><body><nav><ul>{links}</ul></nav>'
+            f'<article><h2><a href="/2026/01/01/hello/">Hello</a></h2></article></body></html>').encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            down = flap and int((time.monotonic() - started) / flap) % 2 == 1
+            time.sleep(slow_delay if rng.random() < slow_rate else delay)
+            status = 503 if down or rng.random() < fail_rate else 200
+            body = page if status == 200 else b'unavailable'
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client gave up on this attempt (e.g. a hedge already won)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def bench(url: str, count: int, hedge: bool, timeout: float, pause: float = 0.0,
+          reset_timeout: float = 30.0) -> Dict:
+    """Sequential fetches through one fetcher; returns latency percentiles and counters"""
+    fetcher = HedgedFetcher(max_timeout=timeout, hedge=hedge, reset_timeout=reset_timeout)
+    latencies, outcomes = [], {'ok': 0, 'error': 0, 'circuit_open': 0}
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            response = fetcher.get(url)
+            outcomes['ok' if response.status_code < 500 else 'error'] += 1
+        except CircuitOpenError:
+            outcomes['circuit_open'] += 1
+        except requests.RequestException:
+            outcomes['error'] += 1
+        latencies.append(time.perf_counter() - started)
+        time.sleep(pause)
+    fetcher.close()
+
+    latencies.sort()
+    pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1)
+    host = urlsplit(url).netloc
+    return {**fetcher.summary().get(host, {}), **outcomes,
+            'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99),
+            'max_ms': round(latencies[-1] * 1000, 1)}
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='RMSMC hedged fetcher tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    standin = subparsers.add_parser('standin', help='Run a slow/flaky stand-in origin')
+    standin.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    standin.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    standin.add_argument('--delay', type=float, default=0.01, help='Normal response time in seconds')
+    standin.add_argument('--slow-rate', type=float, default=0.0, help='Fraction of responses that are slow')
+    standin.add_argument('--slow-delay', type=float, default=2.0, help='Response time of slow responses')
+    standin.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of responses that are 503')
+    standin.add_argument('--flap', type=float, default=0.0, help='Alternate up/down every N seconds')
+
+    bench_parser = subparsers.add_parser('bench', help='Measure fetch latency against an origin')
+    bench_parser.add_argument('--url', default='http://127.0.0.1:8765/', help='URL to fetch')
+    bench_parser.add_argument('--requests', type=int, default=300, help='Number of fetches')
+    bench_parser.add_argument('--timeout', type=float, default=10.0, help='Maximum per-fetch timeout')
+    bench_parser.add_argument('--no-hedge', action='store_true', help='Disable hedged requests')
+    bench_parser.add_argument('--pause', type=float, default=0.0, help='Seconds between fetches')
+    bench_parser.add_argument('--reset-timeout', type=float, default=30.0, help='Circuit breaker cooldown')
+    args = parser.parse_args()
+
+    if args.command == 'standin':
+        server = make_standin_server(args.host, args.port, args.delay, args.slow_rate,
+                                     args.slow_delay, args.fail_rate, args.flap)
+        print(f"🐢 Stand-in origin on http://{args.host}:{args.port}/ "
+              f"(delay {args.delay}s, {args.slow_rate:.0%} slow at {args.slow_delay}s, "
+              f"{args.fail_rate:.0%} failing{f', flapping every {args.flap}s' if args.flap else ''})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Shutting down")
+        return
+
+    if not REQUESTS_AVAILABLE:
+        print("❌ bench requires the 'requests' package")
+        return
+    result = bench(args.url, args.requests, not args.no_hedge, args.timeout, args.pause, args.reset_timeout)
+    print(f"📈 {args.requests} fetches {'without' if args.no_hedge else 'with'} hedging: "
+          f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms, max {result['max_ms']} ms")
+    print(f"   ok {result['ok']}, errors {result['error']}, short-circuited {result['circuit_open']}, "
+          f"hedged {result.get('hedged', 0)} (won {result.get('hedge_wins', 0)}), "
+          f"timeout now {result.get('timeout_s')}s")
+
+
+if __name__ == '__main__':
+    main()
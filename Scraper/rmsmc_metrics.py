@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+RMSMC Scraper Metrics
+Per-stage timings and counters for scraper runs, exported as JSON and
+Prometheus text-exposition files
+"""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class ScrapeMetrics:
+    """Collects stage timings and per-site counters for a single run"""
+
+    PREFIX = 'rmsmc_scraper'
+
+    def __init__(self, mode: str = ''):
+        self.mode = mode
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        self.stages = {}
+        self.sites = {}
+        self.profile_parse = set()
+        self.parse_profiles = {}
+        self.parse_memory = {}
+
+    @contextmanager
+    def stage(self, name: str, site: Optional[str] = None):
+        """Time a stage; repeated stages accumulate duration and call count"""
+        key = (name, site or '')
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.stages.setdefault(key, {'seconds': 0.0, 'count': 0})
+            entry['seconds'] += elapsed
+            entry['count'] += 1
+
+    @contextmanager
+    def parse_stage(self, site: str, page: str = ''):
+        """
+        Time the parse stage, optionally under cProfile and/or tracemalloc.
+        A site's pages share one profiler, so its stats cover every page
+        parsed; memory stats are kept per page.
+        """
+        profiler = None
+        if 'cprofile' in self.profile_parse:
+            profiler = self.parse_profiles.setdefault(site, cProfile.Profile())
+        trace_memory = 'tracemalloc' in self.profile_parse
+
+        if trace_memory:
+            tracemalloc.start()
+        if profiler:
+            profiler.enable()
+
+        try:
+            with self.stage('parse', site):
+                yield
+        finally:
+            if profiler:
+                profiler.disable()
+            if trace_memory:
+                # Keep only the top allocations; whole snapshots per page would pile up on long crawls
+                top = tracemalloc.take_snapshot().statistics('lineno')[:25]
+                tracemalloc.stop()
+                self.parse_memory.setdefault(site, []).append((page, [str(stat) for stat in top]))
+
+    def increment(self, site: str, counter: str, value: int = 1):
+        """Add to a per-site counter (bytes_downloaded, pages_parsed, ...)"""
+        counters = self.sites.setdefault(site, {})
+        counters[counter] = counters.get(counter, 0) + value
+
+    def set_value(self, site: str, counter: str, value: int):
+        """Set a per-site gauge (categories_found)"""
+        self.sites.setdefault(site, {})[counter] = value
+
+    def to_dict(self) -> Dict:
+        """Return metrics as a JSON-serializable dict"""
+        stages = []
+        for (name, site), entry in sorted(self.stages.items()):
+            stages.append({
+                'stage': name,
+                'site': site or None,
+                'seconds': round(entry['seconds'], 6),
+                'count': entry['count']
+            })
+
+        return {
+            'mode': self.mode,
+            'started_at': self.started_at,
+            'total_seconds': round(time.perf_counter() - self._start, 6),
+            'stages': stages,
+            'sites': self.sites
+        }
+
+    def to_prometheus(self) -> str:
+        """Render metrics in the Prometheus text-exposition format"""
+        lines = []
+        prefix = self.PREFIX
+
+        lines.append(f"# HELP {prefix}_stage_seconds Total time spent in each scraper stage.")
+        lines.append(f"# TYPE {prefix}_stage_seconds gauge")
+        for (name, site), entry in sorted(self.stages.items()):
+            labels = self._labels(mode=self.mode, stage=name, site=site)
+            lines.append(f"{prefix}_stage_seconds{{{labels}}} {entry['seconds']:.6f}")
+
+        lines.append(f"# HELP {prefix}_stage_calls Number of times each scraper stage ran.")
+        lines.append(f"# TYPE {prefix}_stage_calls gauge")
+        for (name, site), entry in sorted(self.stages.items()):
+            labels = self._labels(mode=self.mode, stage=name, site=site)
+            lines.append(f"{prefix}_stage_calls{{{labels}}} {entry['count']}")
+
+        counter_names = sorted({c for counters in self.sites.values() for c in counters})
+        for counter in counter_names:
+            lines.append(f"# HELP {prefix}_{counter} Per-site {counter.replace('_', ' ')}.")
+            lines.append(f"# TYPE {prefix}_{counter} gauge")
+            for site, counters in sorted(self.sites.items()):
+                if counter in counters:
+                    labels = self._labels(mode=self.mode, site=site)
+                    lines.append(f"{prefix}_{counter}{{{labels}}} {counters[counter]}")
+
+        return '\n'.join(lines) + '\n'
+
+    def save(self, output_dir: Path) -> List[Path]:
+        """Write JSON, Prometheus and any parse-stage profile dumps"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        saved = []
+
+        json_path = output_dir / 'scrape_metrics.json'
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        saved.append(json_path)
+
+        prom_path = output_dir / 'scrape_metrics.prom'
+        with open(prom_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        saved.append(prom_path)
+
+        for site, profiler in self.parse_profiles.items():
+            prof_path = output_dir / f"parse_{site}.prof"
+            profiler.dump_stats(str(prof_path))
+            saved.append(prof_path)
+
+        for site, pages in self.parse_memory.items():
+            mem_path = output_dir / f"parse_{site}_tracemalloc.txt"
+            with open(mem_path, 'w', encoding='utf-8') as f:
+                for page, stats in pages:
+                    f.write(f"# {page}\n")
+                    for stat in stats:
+                        f.write(f"{stat}\n")
+                    f.write("\n")
+            saved.append(mem_path)
+
+        return saved
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        """Format non-empty labels as a Prometheus label set"""
+        parts = []
+        for key, value in labels.items():
+            if value:
+                escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+                parts.append(f'{key}="{escaped}"')
+        return ','.join(parts)
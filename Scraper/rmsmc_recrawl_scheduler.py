@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+RMSMC Recrawl Scheduler
+Long-running replacement for a fixed cron interval: each site homepage and
+category page is recrawled on its own schedule, driven by how often it has
+actually changed
+
+Usage:
+    python3 rmsmc_recrawl_scheduler.py run --output-dir ./outputs [--min-interval 900] [--max-interval 86400]
+    python3 rmsmc_recrawl_scheduler.py status --output-dir ./outputs
+
+A homepage counts as changed when its category set changes; a category page
+when its article list changes. A change shrinks that page's interval, a quiet
+check grows it, always within [min-interval, max-interval], and every due time
+gets random jitter so pages never settle into firing together.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from rmsmc_scraper_toolkit import RMSMCScraperToolkit, SITES_FILE, LIVE_MODE_AVAILABLE
+
+
+def fingerprint(items: List[str]) -> str:
+    """Order-independent digest of a category slug set or article URL list"""
+    digest = hashlib.sha1()
+    for item in sorted(set(items)):
+        digest.update(item.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class RecrawlScheduler:
+    """
+    Per-page adaptive recrawl intervals, persisted to a JSON state file.
+
+    Each target keeps its current interval, next due time, the fingerprint
+    from its last successful fetch and running check/change counts.
+    """
+
+    def __init__(self, toolkit: RMSMCScraperToolkit, state_path: str,
+                 min_interval: float = 900, max_interval: float = 86400,
+                 initial_interval: Optional[float] = None, speedup: float = 0.5,
+                 backoff: float = 1.5, jitter: float = 0.1, timeout: int = 10,
+                 on_change: Optional[Callable[[Dict], None]] = None):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval must be positive and no larger than max_interval")
+        self.toolkit = toolkit
+        self.state_path = Path(state_path)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval or min_interval
+        self.speedup = speedup
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.on_change = on_change
+        self.targets = {}
+        self.results = {}
+        self.seeded = {}
+
+    def load(self):
+        """Load saved targets and results, if a state file exists"""
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.targets = state['targets']
+            self.results = state['results']
+            self.seeded = state.get('seeded', {})
+
+            # The bounds may have changed since the state was saved
+            now = time.time()
+            for target in self.targets.values():
+                target['interval'] = min(self.max_interval, max(self.min_interval, target['interval']))
+                target['next_due'] = min(target['next_due'], now + target['interval'] * (1 + self.jitter))
+
+    def save(self):
+        """Write state atomically"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'targets': self.targets, 'results': self.results, 'seeded': self.seeded}, f,
+                      ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _add_target(self, site_key: str, url: str, kind: str, now: float):
+        if url in self.targets:
+            return
+        self.targets[url] = {
+            'site': site_key,
+            'url': url,
+            'kind': kind,
+            'interval': self.initial_interval,
+            # Spread first fetches over one interval instead of firing everything at startup
+            'next_due': now + random.uniform(0, self.initial_interval) if self.targets else now,
+            'fingerprint': None,
+            'checks': 0,
+            'changes': 0,
+            'errors': 0,
+            'last_checked': None,
+            'last_changed': None
+        }
+
+    def sync_targets(self, seed: Optional[Dict] = None, now: Optional[float] = None):
+        """
+        Make the target set match the sites and their known categories: one
+        homepage target per site and one per category page. `seed` (e.g. the
+        cached category store) supplies categories not yet crawled; seeded
+        categories stay tracked even when the homepage doesn't link them, since
+        the store also holds nested categories found by --follow-categories.
+        """
+        now = time.time() if now is None else now
+        for site_key, site_data in (seed or {}).items():
+            if site_key in self.toolkit.SITES and 'categories' in site_data:
+                self.seeded[site_key] = site_data['categories']
+                if site_key not in self.results:
+                    self.results[site_key] = site_data
+
+        wanted = set()
+        for site_key, site_info in self.toolkit.SITES.items():
+            self._add_target(site_key, site_info['url'], 'site', now)
+            wanted.add(site_info['url'])
+            known = self.results.get(site_key, {}).get('categories', []) + self.seeded.get(site_key, [])
+            for cat in known:
+                self._add_target(site_key, cat['url'], 'category_page', now)
+                wanted.add(cat['url'])
+
+        for url in list(self.targets):
+            if url not in wanted:
+                del self.targets[url]
+
+    def record(self, url: str, items: List[str], now: Optional[float] = None) -> bool:
+        """Record a successful fetch, reschedule the target; returns whether it changed"""
+        now = time.time() if now is None else now
+        target = self.targets[url]
+        new_fingerprint = fingerprint(items)
+        changed = target['fingerprint'] is not None and new_fingerprint != target['fingerprint']
+
+        if changed:
+            target['interval'] = max(self.min_interval, target['interval'] * self.speedup)
+            target['changes'] += 1
+            target['last_changed'] = now
+        elif target['fingerprint'] is not None:
+            target['interval'] = min(self.max_interval, target['interval'] * self.backoff)
+
+        target['fingerprint'] = new_fingerprint
+        target['checks'] += 1
+        target['last_checked'] = now
+        target['next_due'] = now + self._jittered(target['interval'])
+        return changed
+
+    def record_error(self, url: str, now: Optional[float] = None):
+        """Leave the interval alone on a failed fetch and retry after min_interval"""
+        now = time.time() if now is None else now
+        target = self.targets[url]
+        target['errors'] += 1
+        target['next_due'] = now + self._jittered(self.min_interval)
+
+    def _drop_seeded(self, target: Dict) -> bool:
+        """Stop tracking a seeded category whose page no longer exists; False if it isn't seeded"""
+        site_key, url = target['site'], target['url']
+        seeded = self.seeded.get(site_key, [])
+        if target['kind'] != 'category_page' or not any(cat['url'] == url for cat in seeded):
+            return False
+
+        self.seeded[site_key] = [cat for cat in seeded if cat['url'] != url]
+        del self.targets[url]
+        site_result = self.results.get(site_key)
+        if site_result and 'categories' in site_result:
+            site_result['categories'] = [cat for cat in site_result['categories'] if cat['url'] != url]
+            site_result['total_categories'] = len(site_result['categories'])
+        if self.on_change:
+            self.on_change(self.results)
+        return True
+
+    def next_target(self) -> Optional[Dict]:
+        return min(self.targets.values(), key=lambda t: t['next_due'], default=None)
+
+    def crawl(self, target: Dict, now: Optional[float] = None) -> bool:
+        """Fetch one target and record it; returns whether its content changed"""
+        site_key = target['site']
+        site_info = self.toolkit.SITES[site_key]
+        label = site_info['name'] if target['kind'] == 'site' else target['url']
+
+        try:
+            page = self.toolkit.scrape_site(site_key, site_info, timeout=self.timeout,
+                                            page_url=target['url'],
+                                            include_articles=target['kind'] == 'category_page')
+        except Exception as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            if status in (404, 410) and self._drop_seeded(target):
+                print(f"  🗑️  {label}: gone ({status}), no longer tracked")
+                return True
+            print(f"  ❌ {label}: {e}")
+            self.record_error(target['url'], now)
+            return False
+
+        if target['kind'] == 'site':
+            first_fetch = target['checks'] == 0
+            changed = self.record(target['url'], [cat['slug'] for cat in page['categories']], now)
+            result = {key: value for key, value in page.items() if key != 'articles'}
+            # Keep seeded categories the homepage doesn't link, or the rewritten store would drop them.
+            # Ones it does link are the homepage's from now on, so they go if the homepage drops them
+            linked = {cat['url'] for cat in page['categories']}
+            self.seeded[site_key] = [cat for cat in self.seeded.get(site_key, []) if cat['url'] not in linked]
+            result['categories'] = sorted(
+                page['categories'] + self.seeded[site_key],
+                key=lambda cat: cat['slug']
+            )
+            result['total_categories'] = len(result['categories'])
+            self.results[site_key] = result
+            if changed or first_fetch:
+                self.sync_targets(now=now)
+                if self.on_change:
+                    self.on_change(self.results)
+        else:
+            changed = self.record(target['url'], page['articles'], now)
+
+        status = '🆕 changed' if changed else 'unchanged'
+        print(f"  🔁 {label}: {status}, next in {target['interval'] / 60:.0f} min")
+        return changed
+
+    def run(self, max_fetches: Optional[int] = None):
+        """Crawl targets as they fall due, forever or until max_fetches"""
+        fetches = 0
+        while max_fetches is None or fetches < max_fetches:
+            target = self.next_target()
+            if target is None:
+                print("⚠️  Nothing to schedule")
+                return
+            delay = target['next_due'] - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self.crawl(target)
+            self.save()
+            fetches += 1
+
+    def summary(self) -> List[Dict]:
+        """Per-target schedule and observed change rate, soonest first"""
+        rows = []
+        for target in sorted(self.targets.values(), key=lambda t: t['next_due']):
+            rows.append({
+                'site': target['site'],
+                'url': target['url'],
+                'kind': target['kind'],
+                'interval_minutes': round(target['interval'] / 60, 1),
+                'change_rate': round(target['changes'] / max(1, target['checks'] - 1), 3),
+                'checks': target['checks'],
+                'next_due': datetime.fromtimestamp(target['next_due']).isoformat(timespec='seconds')
+            })
+        return rows
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='Adaptive recrawl scheduler for RMSMC sites')
+    parser.add_argument('command', choices=['run', 'status'], help='run the scheduler or print its schedule')
+    parser.add_argument('--output-dir', default='/mnt/user-data/outputs', help='Directory for output files and state')
+    parser.add_argument('--state-file', help='Scheduler state (default: <output-dir>/recrawl_state.json)')
+    parser.add_argument('--sites', default=str(SITES_FILE) if SITES_FILE.exists() else None,
+                        help='Site registry JSON file')
+    parser.add_argument('--min-interval', type=float, default=900, help='Shortest recrawl interval in seconds')
+    parser.add_argument('--max-interval', type=float, default=86400, help='Longest recrawl interval in seconds')
+    parser.add_argument('--initial-interval', type=float, help='Interval for new pages (default: --min-interval)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Random +/- fraction applied to each interval')
+    parser.add_argument('--timeout', type=int, default=10, help='Per-request timeout in seconds')
+    parser.add_argument('--max-fetches', type=int, help='Stop after this many fetches')
+    args = parser.parse_args()
+
+    toolkit = RMSMCScraperToolkit(output_dir=args.output_dir, sites_file=args.sites)
+    scheduler = RecrawlScheduler(
+        toolkit, args.state_file or Path(args.output_dir) / 'recrawl_state.json',
+        min_interval=args.min_interval, max_interval=args.max_interval,
+        initial_interval=args.initial_interval, jitter=args.jitter, timeout=args.timeout,
+        on_change=lambda results: print(f"  💾 Categories updated: {toolkit.save_json(results)}")
+    )
+    scheduler.load()
+
+    if args.command == 'status':
+        for row in scheduler.summary():
+            print(f"{row['next_due']}  every {row['interval_minutes']:>7} min  "
+                  f"change rate {row['change_rate']:<5}  {row['url']}")
+        return
+
+    if not LIVE_MODE_AVAILABLE:
+        print("❌ The scheduler requires 'requests' and 'beautifulsoup4' packages")
+        sys.exit(1)
+
+    scheduler.sync_targets(seed=toolkit.get_cached_results())
+    print(f"⏱️  Scheduling {len(scheduler.targets)} pages "
+          f"({args.min_interval:.0f}s - {args.max_interval:.0f}s)")
+    try:
+        scheduler.run(args.max_fetches)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping")
+    finally:
+        scheduler.save()
+
+
+if __name__ == '__main__':
+    main()
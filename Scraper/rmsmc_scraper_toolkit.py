@@ -4,22 +4,31 @@ RMSMC Category Scraper Toolkit
 A comprehensive toolkit for scraping and analyzing content categories from RMSMC websites
 
 Usage:
-    python3 rmsmc_scraper_toolkit.py --mode [live|cached|manual]
+    python3 rmsmc_scraper_toolkit.py --mode [live|cached|manual] [--profile]
+    python3 rmsmc_scraper_toolkit.py --mode live --follow-categories --resume
     
 Modes:
     live    - Fetch data directly from websites (requires network access)
-    cached  - Use pre-analyzed category data
+    cached  - Use the on-disk category store (rmsmc_categories.json)
     manual  - Analyze HTML files from a directory
 """
 
 import argparse
+import hashlib
 import json
 import csv
+import os
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import sys
 
+from rmsmc_checkpoint import BloomFilter, CrawlCheckpoint
+from rmsmc_fetcher import HedgedFetcher
+from rmsmc_metrics import ScrapeMetrics
+from rmsmc_snapshot_archive import SnapshotArchive, is_archive
+
 try:
     import requests
     from bs4 import BeautifulSoup
@@ -28,6 +37,79 @@ except ImportError:
     LIVE_MODE_AVAILABLE = False
     print("⚠️  requests/beautifulsoup4 not available - live mode disabled")
 
+SITES_FILE = Path(__file__).with_name('rmsmc_sites.json')
+CATEGORY_STORE = Path(__file__).with_name('rmsmc_categories.json')
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def load_site_registry(path: str) -> Dict:
+    """Load and validate a site registry: {site_key: {name, url, patterns}}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        sites = json.load(f)
+    
+    for site_key, site_info in sites.items():
+        missing = [field for field in ('name', 'url') if field not in site_info]
+        if missing:
+            raise ValueError(f"Site '{site_key}' in {path} is missing: {', '.join(missing)}")
+        site_info['url'] = site_info['url'].rstrip('/')
+        site_info.setdefault('patterns', ['/category/'])
+    
+    return sites
+
+
+def validate_category_store(data: Dict, source: str = 'category store') -> Dict:
+    """Check the {site_key: {site, url, categories: [{name, slug, url}]}} shape; raises ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError(f"{source}: expected an object of sites")
+    
+    for site_key, site_data in data.items():
+        where = f"{source}: site '{site_key}'"
+        if not isinstance(site_data, dict):
+            raise ValueError(f"{where} is not an object")
+        for field in ('site', 'url'):
+            if not isinstance(site_data.get(field), str):
+                raise ValueError(f"{where} is missing '{field}'")
+        if 'error' in site_data:
+            continue
+        if not isinstance(site_data.get('categories'), list):
+            raise ValueError(f"{where} is missing 'categories'")
+        for i, cat in enumerate(site_data['categories']):
+            for field in ('name', 'slug', 'url'):
+                if not isinstance(cat.get(field) if isinstance(cat, dict) else None, str):
+                    raise ValueError(f"{where} category {i} is missing '{field}'")
+    
+    return data
+
+
+# path -> (mtime_ns, size, sha256, data)
+_STORE_CACHE = {}
+
+
+def load_category_store(path: Path = CATEGORY_STORE) -> Dict:
+    """
+    Load and validate the category store, memoized per process.
+    
+    A stat() per call detects changes; if mtime or size moved, the file is
+    hashed and only re-parsed when its content actually changed.
+    """
+    path = Path(path).resolve()
+    stat = os.stat(path)
+    cached = _STORE_CACHE.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[3]
+    
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    
+    if cached and cached[2] == digest:
+        data = cached[3]
+    else:
+        data = validate_category_store(json.loads(raw), str(path))
+    
+    _STORE_CACHE[path] = (stat.st_mtime_ns, stat.st_size, digest, data)
+    return data
+
 
 class RMSMCScraperToolkit:
     """Main scraper toolkit class"""
@@ -50,6 +132,7 @@ class RMSMCScraperToolkit:
         }
     }
     
+    # Fallback only, used when the category store file is missing
     CACHED_DATA = {
         'collegian': {
             'categories': [
@@ -80,13 +163,40 @@ class RMSMCScraperToolkit:
         }
     }
     
-    def __init__(self, output_dir: str = '/mnt/user-data/outputs'):
+    def __init__(self, output_dir: str = '/mnt/user-data/outputs', sites_file: Optional[str] = None,
+                 store_file: Optional[str] = None):
         self.output_dir = Path(output_dir)
+        self.store_file = Path(store_file) if store_file else CATEGORY_STORE
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.results = {}
+        self.metrics = ScrapeMetrics()
+        self.fetcher = HedgedFetcher() if LIVE_MODE_AVAILABLE else None
+        self.last_good = {}
+        
+        # A registry file replaces the built-in three sites
+        if sites_file:
+            self.SITES = load_site_registry(sites_file)
     
     def get_cached_results(self) -> Dict:
-        """Return pre-analyzed category data"""
+        """Return category data from the on-disk store (memoized; callers get their own copy)"""
+        try:
+            store = load_category_store(self.store_file)
+        except FileNotFoundError:
+            print(f"⚠️  Category store not found: {self.store_file} - using built-in data")
+            return self._get_builtin_results()
+        
+        results = {}
+        for site_key, site_data in store.items():
+            site_copy = dict(site_data)
+            if 'categories' in site_data:
+                site_copy['categories'] = [dict(cat) for cat in site_data['categories']]
+                site_copy['total_categories'] = len(site_copy['categories'])
+            results[site_key] = site_copy
+        
+        return results
+    
+    def _get_builtin_results(self) -> Dict:
+        """Return the built-in CACHED_DATA with full URLs"""
         results = {}
         
         for site_key, site_info in self.SITES.items():
@@ -111,87 +221,219 @@ class RMSMCScraperToolkit:
         
         return results
     
-    def scrape_live(self, timeout: int = 10) -> Dict:
-        """Scrape categories live from websites"""
+    def scrape_live(self, timeout: float = 10, checkpoint: Optional[CrawlCheckpoint] = None,
+                    resume: bool = False, follow_categories: bool = False) -> Dict:
+        """
+        Scrape categories live from websites.
+        
+        Pages are crawled from a frontier that starts with each site's homepage;
+        with follow_categories, discovered category pages are added to it. When a
+        checkpoint is given, progress is saved periodically and resume=True
+        continues from the last saved frontier.
+        
+        timeout is the ceiling per page; the fetcher shortens it per host from
+        observed latency. A site whose homepage cannot be fetched (including
+        while its circuit is open) gets its last good result, marked 'stale'.
+        """
         if not LIVE_MODE_AVAILABLE:
             print("❌ Live mode not available - missing dependencies")
             return {}
         
-        results = {}
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        if checkpoint and resume and checkpoint.exists():
+            frontier, partial, seen = checkpoint.load()
+            print(f"♻️  Resuming from checkpoint: {len(frontier)} pages left in frontier")
+            for site_key in [key for key in partial if key not in self.SITES]:
+                print(f"  ⚠️  Dropping results for {site_key}: no longer in the site registry")
+                del partial[site_key]
+        else:
+            frontier, partial = deque(), {}
+            seen = checkpoint.new_seen_set() if checkpoint else BloomFilter()
+            for site_key, site_info in self.SITES.items():
+                frontier.append((site_key, site_info['url']))
+                seen.add(site_info['url'])
         
-        for site_key, site_info in self.SITES.items():
-            print(f"\n🔍 Scraping {site_info['name']}...")
+        while frontier:
+            site_key, page_url = frontier[0]
+            site_info = self.SITES.get(site_key)
+            if site_info is None:
+                # Checkpointed before the site was removed from the registry
+                print(f"\n⚠️  Skipping {page_url}: {site_key} is no longer in the site registry")
+                frontier.popleft()
+                continue
+            is_homepage = page_url == site_info['url']
+            print(f"\n🔍 Scraping {site_info['name'] if is_homepage else page_url}...")
             
             try:
-                response = requests.get(site_info['url'], headers=headers, timeout=timeout)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                categories = self._extract_categories(soup, site_info)
-                
-                results[site_key] = {
+                page = self.scrape_site(site_key, site_info, timeout=timeout, page_url=page_url)
+                site_partial = partial.setdefault(site_key, {
                     'site': site_info['name'],
                     'url': site_info['url'],
-                    'total_categories': len(categories),
-                    'categories': categories,
-                    'scraped_at': datetime.now().isoformat()
-                }
-                
-                print(f"  ✅ Found {len(categories)} categories")
+                    'categories': {}
+                })
+                for cat in page['categories']:
+                    site_partial['categories'].setdefault(cat['slug'], cat)
+                    if follow_categories and is_homepage and cat['url'] not in seen:
+                        seen.add(cat['url'])
+                        frontier.append((site_key, cat['url']))
+                site_partial['scraped_at'] = page['scraped_at']
+                if is_homepage:
+                    self.last_good[site_key] = page
+                print(f"  ✅ Found {page['total_categories']} categories")
                 
             except Exception as e:
                 print(f"  ❌ Error: {e}")
-                results[site_key] = {
-                    'site': site_info['name'],
-                    'url': site_info['url'],
-                    'error': str(e)
-                }
+                if is_homepage:
+                    fallback = self.last_good_result(site_key)
+                    if fallback:
+                        print(f"  ♻️  Serving last good result ({fallback['total_categories']} categories"
+                              f"{', from ' + fallback['scraped_at'] if fallback.get('scraped_at') else ''})")
+                        partial[site_key] = {
+                            'site': site_info['name'],
+                            'url': site_info['url'],
+                            'categories': {cat['slug']: dict(cat) for cat in fallback['categories']},
+                            'scraped_at': fallback.get('scraped_at'),
+                            'stale': str(e)
+                        }
+                    else:
+                        partial[site_key] = {
+                            'site': site_info['name'],
+                            'url': site_info['url'],
+                            'error': str(e)
+                        }
+            
+            # Pop only once the page is recorded, so a crash re-crawls it on resume
+            frontier.popleft()
+            if checkpoint:
+                checkpoint.maybe_save(frontier, partial, seen)
+        
+        if checkpoint:
+            checkpoint.clear()
+        
+        results = {}
+        for site_key, site_partial in partial.items():
+            if 'error' in site_partial:
+                results[site_key] = site_partial
+                continue
+            categories = sorted(site_partial['categories'].values(), key=lambda x: x['slug'])
+            results[site_key] = {
+                'site': site_partial['site'],
+                'url': site_partial['url'],
+                'total_categories': len(categories),
+                'categories': categories,
+                'scraped_at': site_partial.get('scraped_at')
+            }
+            if 'stale' in site_partial:
+                results[site_key]['stale'] = site_partial['stale']
         
         return results
     
-    def _extract_categories(self, soup: BeautifulSoup, site_info: Dict) -> List[Dict]:
+    def last_good_result(self, site_key: str) -> Optional[Dict]:
+        """This process's last successful homepage scrape, else the site's entry in the category store"""
+        if site_key in self.last_good:
+            return self.last_good[site_key]
+        try:
+            site_data = load_category_store(self.store_file).get(site_key)
+        except (OSError, ValueError):
+            return None
+        if not site_data or 'error' in site_data or not site_data.get('categories'):
+            return None
+        return {**site_data, 'total_categories': len(site_data['categories'])}
+    
+    def scrape_site(self, site_key: str, site_info: Dict, timeout: float = 10,
+                    page_url: Optional[str] = None, include_articles: bool = False) -> Dict:
+        """Fetch one page of a site (its homepage by default) and extract categories; raises on failure"""
+        headers = {'User-Agent': USER_AGENT}
+        
+        with self.metrics.stage('fetch', site_key):
+            response = self.fetcher.get(page_url or site_info['url'], headers=headers, timeout=timeout)
+            response.raise_for_status()
+        self.metrics.increment(site_key, 'bytes_downloaded', len(response.content))
+        
+        with self.metrics.parse_stage(site_key, page_url or site_info['url']):
+            soup = BeautifulSoup(response.content, 'html.parser')
+        self.metrics.increment(site_key, 'pages_parsed')
+        categories = self._extract_categories(soup, site_info, site_key)
+        if page_url in (None, site_info['url']):
+            # The gauge is the homepage's category count; followed category pages would overwrite it
+            self.metrics.set_value(site_key, 'categories_found', len(categories))
+        
+        result = {
+            'site': site_info['name'],
+            'url': site_info['url'],
+            'total_categories': len(categories),
+            'categories': categories,
+            'scraped_at': datetime.now().isoformat()
+        }
+        if include_articles:
+            result['articles'] = self._extract_articles(soup, site_info)
+        return result
+    
+    def _extract_categories(self, soup: 'BeautifulSoup', site_info: Dict, site_key: str = '') -> List[Dict]:
         """Extract categories from parsed HTML"""
         import re
         
-        categories = {}
+        candidates = []
         patterns = site_info['patterns']
         
         # Find all links matching category patterns
-        for pattern in patterns:
-            links = soup.find_all('a', href=re.compile(pattern))
-            
-            for link in links:
-                href = link.get('href', '')
-                text = link.get_text(strip=True)
+        with self.metrics.stage('extract', site_key):
+            for pattern in patterns:
+                links = soup.find_all('a', href=re.compile(pattern))
                 
-                # Extract slug from URL
-                match = re.search(r'/category/(.+?)(?:/|$)', href)
-                if match:
-                    slug = match.group(1)
+                for link in links:
+                    href = link.get('href', '')
                     
-                    # Use slug as key to avoid duplicates
-                    if slug not in categories:
-                        full_url = href if href.startswith('http') else site_info['url'] + href
-                        
-                        categories[slug] = {
-                            'name': text or slug.replace('-', ' ').title(),
-                            'slug': slug,
-                            'url': full_url
-                        }
+                    # Extract slug from URL
+                    match = re.search(r'/category/(.+?)(?:/|$)', href)
+                    if match:
+                        candidates.append((match.group(1), href, link.get_text(strip=True)))
         
-        return sorted(categories.values(), key=lambda x: x['slug'])
+        # Use slug as key to avoid duplicates
+        with self.metrics.stage('dedup', site_key):
+            categories = {}
+            for slug, href, text in candidates:
+                if slug not in categories:
+                    full_url = href if href.startswith('http') else site_info['url'] + href
+                    
+                    categories[slug] = {
+                        'name': text or slug.replace('-', ' ').title(),
+                        'slug': slug,
+                        'url': full_url
+                    }
+            
+            return sorted(categories.values(), key=lambda x: x['slug'])
+    
+    def _extract_articles(self, soup: 'BeautifulSoup', site_info: Dict) -> List[str]:
+        """Extract article links (headline links inside <article> or h2/h3) in page order"""
+        import re
+        
+        skip = re.compile(r'/(?:category|tag|author|page)/|/feed/?$|#')
+        articles = []
+        seen = set()
+        
+        for link in soup.select('article a[href], h2 a[href], h3 a[href]'):
+            href = link['href']
+            full_url = href if href.startswith('http') else site_info['url'] + href
+            if not full_url.startswith(site_info['url']) or skip.search(full_url):
+                continue
+            if full_url.rstrip('/') == site_info['url'].rstrip('/') or full_url in seen:
+                continue
+            seen.add(full_url)
+            articles.append(full_url)
+        
+        return articles
     
     def analyze_manual_html(self, html_dir: str) -> Dict:
-        """Analyze HTML files from a directory"""
+        """Analyze HTML files from a directory, or the latest snapshots in a snapshot archive"""
         html_path = Path(html_dir)
         
         if not html_path.exists():
             print(f"❌ Directory not found: {html_dir}")
             return {}
         
+        if is_archive(html_path):
+            return self._analyze_snapshot_archive(html_path)
+        
         results = {}
         
         for site_key, site_info in self.SITES.items():
@@ -204,11 +446,16 @@ class RMSMCScraperToolkit:
             print(f"📄 Analyzing {html_file.name}...")
             
             try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
+                with self.metrics.stage('fetch', site_key):
+                    with open(html_file, 'r', encoding='utf-8') as f:
+                        html_content = f.read()
+                self.metrics.increment(site_key, 'bytes_downloaded', len(html_content.encode('utf-8')))
                 
-                soup = BeautifulSoup(html_content, 'html.parser')
-                categories = self._extract_categories(soup, site_info)
+                with self.metrics.parse_stage(site_key, str(html_file)):
+                    soup = BeautifulSoup(html_content, 'html.parser')
+                self.metrics.increment(site_key, 'pages_parsed')
+                categories = self._extract_categories(soup, site_info, site_key)
+                self.metrics.set_value(site_key, 'categories_found', len(categories))
                 
                 results[site_key] = {
                     'site': site_info['name'],
@@ -224,12 +471,56 @@ class RMSMCScraperToolkit:
         
         return results
     
+    def _analyze_snapshot_archive(self, archive_dir: Path) -> Dict:
+        """Manual mode over a snapshot archive: each site's latest snapshot, read straight from its segment"""
+        archive = SnapshotArchive(archive_dir, create=False)
+        results = {}
+        
+        for site_key, site_info in self.SITES.items():
+            entry = archive.latest(site_key)
+            if entry is None:
+                print(f"⚠️  No snapshot found for {site_key}")
+                continue
+            
+            print(f"📦 Analyzing {site_key} snapshot from {entry.to_dict()['captured_at']}...")
+            
+            try:
+                with self.metrics.stage('fetch', site_key):
+                    html_content = archive.read(entry)
+                self.metrics.increment(site_key, 'bytes_downloaded', entry.length)
+                
+                with self.metrics.parse_stage(site_key, f"snapshot {entry.to_dict()['captured_at']}"):
+                    soup = BeautifulSoup(html_content, 'html.parser')
+                self.metrics.increment(site_key, 'pages_parsed')
+                categories = self._extract_categories(soup, site_info, site_key)
+                self.metrics.set_value(site_key, 'categories_found', len(categories))
+                
+                results[site_key] = {
+                    'site': site_info['name'],
+                    'url': site_info['url'],
+                    'total_categories': len(categories),
+                    'categories': categories,
+                    'scraped_at': datetime.fromtimestamp(entry.captured_at).isoformat()
+                }
+                
+                print(f"  ✅ Found {len(categories)} categories")
+                
+            except Exception as e:
+                print(f"  ❌ Error: {e}")
+        
+        return results
+    
     def save_json(self, data: Dict, filename: str = 'rmsmc_categories.json') -> Path:
-        """Save results as JSON"""
+        """Save results as JSON, replacing the file atomically so readers never see a partial write"""
         output_path = self.output_dir / filename
+        tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with self.metrics.stage('write_json'):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, output_path)
         
         return output_path
     
@@ -237,7 +528,7 @@ class RMSMCScraperToolkit:
         """Save results as CSV"""
         output_path = self.output_dir / filename
         
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        with self.metrics.stage('write_csv'), open(output_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['Site', 'Category Name', 'Category URL', 'Slug', 'Total Site Categories'])
             
@@ -260,7 +551,7 @@ class RMSMCScraperToolkit:
         """Save results as formatted Markdown"""
         output_path = self.output_dir / filename
         
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with self.metrics.stage('write_markdown'), open(output_path, 'w', encoding='utf-8') as f:
             f.write("# RMSMC Content Categories Report\n\n")
             f.write(f"**Generated:** {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n\n")
             
@@ -281,6 +572,8 @@ class RMSMCScraperToolkit:
                 
                 f.write(f"## {site_data['site']}\n\n")
                 f.write(f"**URL:** {site_data['url']}\n\n")
+                if site_data.get('stale'):
+                    f.write(f"**⚠️ Stale:** site unreachable ({site_data['stale']}); last good result shown\n\n")
                 f.write(f"**Total Categories:** {site_data['total_categories']}\n\n")
                 
                 f.write("| # | Category | URL | Slug |\n")
@@ -309,6 +602,8 @@ class RMSMCScraperToolkit:
             
             print(f"✨ {site_data['site'].upper()}")
             print(f"   URL: {site_data['url']}")
+            if site_data.get('stale'):
+                print(f"   ⚠️  Stale (last good result): {site_data['stale']}")
             print(f"   Total Categories: {site_data['total_categories']}\n")
             print("   Categories:")
             
@@ -340,7 +635,7 @@ def main():
     parser.add_argument(
         '--html-dir',
         default='./html_files',
-        help='Directory containing HTML files for manual mode'
+        help='Directory containing HTML files, or a snapshot archive, for manual mode'
     )
     
     parser.add_argument(
@@ -349,6 +644,17 @@ def main():
         help='Directory for output files'
     )
     
+    parser.add_argument(
+        '--store',
+        help='Category store JSON for cached mode (default: rmsmc_categories.json next to this script)'
+    )
+    
+    parser.add_argument(
+        '--sites',
+        default=str(SITES_FILE) if SITES_FILE.exists() else None,
+        help='Site registry JSON file (default: rmsmc_sites.json next to this script)'
+    )
+    
     parser.add_argument(
         '--format',
         choices=['json', 'csv', 'markdown', 'all'],
@@ -356,10 +662,51 @@ def main():
         help='Output format'
     )
     
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Live mode: continue from the last checkpoint instead of starting over'
+    )
+    
+    parser.add_argument(
+        '--checkpoint-dir',
+        help='Live mode: checkpoint directory (default: <output-dir>/checkpoint)'
+    )
+    
+    parser.add_argument(
+        '--follow-categories',
+        action='store_true',
+        help='Live mode: also crawl each discovered category page for nested categories'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=10,
+        help='Live mode: maximum seconds per page; shortened per host from observed latency'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Record per-stage timings and counters to scrape_metrics.json and scrape_metrics.prom'
+    )
+    
+    parser.add_argument(
+        '--profile-parse',
+        choices=['cprofile', 'tracemalloc', 'both'],
+        help='Also dump cProfile stats and/or tracemalloc snapshots for the parse stage (implies --profile)'
+    )
+    
     args = parser.parse_args()
+    # Parse profiles are written alongside the stage metrics, so asking for one means asking for both
+    args.profile = args.profile or bool(args.profile_parse)
     
     # Initialize toolkit
-    toolkit = RMSMCScraperToolkit(output_dir=args.output_dir)
+    toolkit = RMSMCScraperToolkit(output_dir=args.output_dir, sites_file=args.sites, store_file=args.store)
+    toolkit.metrics.mode = args.mode
+    if args.profile_parse:
+        toolkit.metrics.profile_parse = {'cprofile', 'tracemalloc'} if args.profile_parse == 'both' else {args.profile_parse}
     
     # Get data based on mode
     print(f"🚀 Running in {args.mode.upper()} mode...\n")
@@ -369,7 +716,14 @@ def main():
             print("❌ Live mode requires 'requests' and 'beautifulsoup4' packages")
             print("   Install with: pip install requests beautifulsoup4")
             sys.exit(1)
-        results = toolkit.scrape_live()
+        checkpoint = CrawlCheckpoint(args.checkpoint_dir or Path(args.output_dir) / 'checkpoint')
+        results = toolkit.scrape_live(timeout=args.timeout, checkpoint=checkpoint, resume=args.resume,
+                                      follow_categories=args.follow_categories)
+        for host, stats in toolkit.fetcher.summary().items():
+            if stats['hedged'] or stats['failures'] or stats['rejected']:
+                print(f"🌐 {host}: {stats['requests']} requests, {stats['hedged']} hedged "
+                      f"({stats['hedge_wins']} won), {stats['failures']} failed, "
+                      f"{stats['rejected']} short-circuited, circuit {stats['circuit']}")
     elif args.mode == 'cached':
         results = toolkit.get_cached_results()
     else:  # manual
@@ -397,6 +751,11 @@ def main():
         md_path = toolkit.save_markdown(results)
         saved_files.append(('Markdown', md_path))
     
+    if args.profile:
+        metrics_dir = Path(args.output_dir)
+        for metrics_path in toolkit.metrics.save(metrics_dir):
+            saved_files.append(('Metrics', metrics_path))
+    
     # Print saved files
     print("💾 Saved files:")
     for format_name, file_path in saved_files:
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+RMSMC Search Index
+Inverted trigram index over category names, slugs and article titles, for
+fuzzy and prefix search with site filters and ranked results
+
+Usage:
+    python3 rmsmc_search_index.py --index ./search build --input rmsmc_categories.json [--articles articles.csv]
+    python3 rmsmc_search_index.py --index ./search add --input new_crawl.json
+    python3 rmsmc_search_index.py --index ./search query "sprots" [--site collegian] [--kind category] [--limit 10]
+    python3 rmsmc_search_index.py bench --docs 1000000
+
+Every word is padded and split into trigrams ("  s", " sp", "spo", ...).
+The query's last word gets no trailing pad, so a prefix's trigrams are a
+subset of the full word's, and a typo still shares most of them. Each trigram maps to a sorted array of document ids, and so does each site
+and each kind of document, so filters are intersected along with the
+trigrams instead of checked per document. Queries first intersect the
+arrays (every trigram present), then fall back to candidates that share at
+least 40% of them. Exact matches are ranked with a per-document upper bound
+on their score, so only the few that can reach the top are fully scored.
+
+On disk, index.bin is a compacted snapshot and journal.jsonl holds the
+adds/removes since then, replayed on open. Crawls can therefore land
+incrementally and save() compacts them when convenient.
+"""
+
+import argparse
+import bisect
+import csv
+import heapq
+import json
+import os
+import random
+import re
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+MAGIC = b'RMSSRCH1'
+HEADER = struct.Struct('<8sQQ')  # magic, docs blob length, trigram table length
+KIND_WEIGHT = {'category': 0.1, 'article': 0.0}
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase words; slugs split on their hyphens"""
+    return _NON_WORD.sub(' ', text.lower()).split()
+
+
+def trigrams(words: Iterable[str], partial_last: bool = False) -> Set[str]:
+    """
+    Padded trigrams of each word. With partial_last the last word gets no
+    trailing pad, so a query still being typed ("spo") has only trigrams
+    that a longer word ("sports") also has.
+    """
+    words = list(words)
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f"  {word}" if partial_last and i == len(words) - 1 else f"  {word} "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    In-memory trigram index, optionally backed by a directory.
+
+    Documents are keyed by URL; adding an existing key replaces it. Removed
+    or replaced documents leave a tombstone until the next save().
+    """
+
+    def __init__(self, directory: Optional[str] = None, candidate_limit: int = 300):
+        self.directory = Path(directory) if directory else None
+        self.candidate_limit = candidate_limit  # Fuzzy fallback: docs scored at most
+        self.docs = []        # id -> (key, site_id, kind, name, slug, url) or None
+        self.keys = {}        # key -> id
+        self.postings = {}    # trigram -> array('I') of ids, ascending
+        self.filters = {}     # ('site' | 'kind' | 'len' | 'head', value) -> array('I') of ids, ascending
+        self.names = {}       # normalized name -> [ids], for exact-name matches
+        self.gram_counts = array('H')  # id -> number of distinct trigrams in name + slug
+        self.site_names = []
+        self.site_ids = {}
+        self._journal = None
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    # ---- Updates ----
+
+    def _site_id(self, site: str) -> int:
+        if site not in self.site_ids:
+            self.site_ids[site] = len(self.site_names)
+            self.site_names.append(site)
+        return self.site_ids[site]
+
+    def _index(self, doc: Tuple, gram_count: Optional[int] = None, postings: bool = True) -> int:
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        self.keys[doc[0]] = doc_id
+        name_words = normalize(doc[3])
+        if postings:
+            grams = trigrams(name_words + normalize(doc[4]))
+            gram_count = len(grams)
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('I')
+                posting.append(doc_id)
+        gram_count = min(gram_count, 0xFFFF)
+        self.gram_counts.append(gram_count)
+        name_text = ' '.join(name_words)
+        for key in (('site', doc[1]), ('kind', doc[2]), ('len', gram_count), ('head', name_text[:3])):
+            posting = self.filters.get(key)
+            if posting is None:
+                posting = self.filters[key] = array('I')
+            posting.append(doc_id)
+        self.names.setdefault(name_text, []).append(doc_id)
+        return doc_id
+
+    def add(self, key: str, site: str, kind: str, name: str, slug: str = '', url: str = '',
+            journal: bool = True) -> int:
+        """Add or replace a document; returns its id"""
+        doc = (key, self._site_id(site), kind, name, slug, url or key)
+        existing = self.keys.get(key)
+        if existing is not None:
+            if self.docs[existing] == doc:
+                return existing
+            self.docs[existing] = None
+        if journal:
+            self._log({'op': 'add', 'key': key, 'site': site, 'kind': kind,
+                       'name': name, 'slug': slug, 'url': url or key})
+        return self._index(doc)
+
+    def remove(self, key: str, journal: bool = True) -> bool:
+        doc_id = self.keys.pop(key, None)
+        if doc_id is None:
+            return False
+        self.docs[doc_id] = None
+        if journal:
+            self._log({'op': 'remove', 'key': key})
+        return True
+
+    def add_categories(self, data: Dict) -> int:
+        """Index every category in a {site: {categories: [...]}} store; articles too if present"""
+        count = 0
+        for site_key, site_data in data.items():
+            for cat in site_data.get('categories', []):
+                self.add(cat['url'], site_key, 'category', cat['name'], cat['slug'], cat['url'])
+                count += 1
+            for article in site_data.get('articles', []):
+                if isinstance(article, dict) and article.get('title'):
+                    self.add(article['url'], site_key, 'article', article['title'], '', article['url'])
+                    count += 1
+        self.flush()
+        return count
+
+    def add_articles(self, rows: Iterable[Dict]) -> int:
+        """Index article rows with site, url and title"""
+        count = 0
+        for row in rows:
+            self.add(row['url'], row['site'], 'article', row['title'], '', row['url'])
+            count += 1
+        self.flush()
+        return count
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # ---- Queries ----
+
+    @staticmethod
+    def _contains(posting: array, doc_id: int) -> bool:
+        i = bisect.bisect_left(posting, doc_id)
+        return i < len(posting) and posting[i] == doc_id
+
+    def _filter_lists(self, site_id: Optional[int], kind: Optional[str]) -> List[array]:
+        lists = []
+        if site_id is not None:
+            lists.append(self.filters.get(('site', site_id), array('I')))
+        if kind is not None:
+            lists.append(self.filters.get(('kind', kind), array('I')))
+        return lists
+
+    def _iter_matches(self, lists: List[array]) -> Iterator[int]:
+        """Live ids present in every list, newest first: walk the rarest list, bisecting the rest in shrinking windows"""
+        lists = sorted(lists, key=len)
+        if not lists or not lists[0]:
+            return
+        bisect_left = bisect.bisect_left
+        docs = self.docs
+        others = lists[1:]
+        highs = [len(other) for other in others]
+        for doc_id in reversed(lists[0]):
+            for j, other in enumerate(others):
+                i = bisect_left(other, doc_id, 0, highs[j])
+                highs[j] = i
+                if i == len(other) or other[i] != doc_id:
+                    break
+            else:
+                if docs[doc_id] is not None:
+                    yield doc_id
+
+    def _fuzzy(self, gram_lists: List[array], filter_lists: List[array], need: int,
+               exclude: Set[int]) -> List[Tuple[int, int]]:
+        """(id, shared trigrams) for docs sharing at least `need` trigrams, scanning a bounded number"""
+        # A doc sharing `need` trigrams must appear in one of the k - need + 1 rarest lists;
+        # when a filter list is smaller than those, scan the filter list instead
+        sources = gram_lists[:len(gram_lists) - need + 1]
+        checks = filter_lists
+        if filter_lists:
+            smallest = min(filter_lists, key=len)
+            if len(smallest) <= sum(len(source) for source in sources):
+                sources = [smallest]
+                checks = [f for f in filter_lists if f is not smallest]
+
+        contains = self._contains
+        seen = set(exclude)
+        found = []
+        scanned = 0
+        for posting in sources:
+            for doc_id in reversed(posting):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                scanned += 1
+                if scanned > self.candidate_limit:
+                    return found
+                if self.docs[doc_id] is None or not all(contains(f, doc_id) for f in checks):
+                    continue
+                shared = sum(1 for other in gram_lists if contains(other, doc_id))
+                if shared >= need:
+                    found.append((doc_id, shared))
+        return found
+
+    def _score(self, doc_id: int, shared: int, query_grams: int, words: List[str], phrase: str) -> float:
+        doc = self.docs[doc_id]
+        name_words = normalize(doc[3])
+        score = 2 * shared / (query_grams + self.gram_counts[doc_id])
+        name_text = ' '.join(name_words)
+        if name_text == phrase:
+            score += 1.0
+        elif name_text.startswith(phrase):
+            score += 0.5
+        elif all(any(w.startswith(q) for w in name_words) for q in words):
+            score += 0.25
+        return score + KIND_WEIGHT.get(doc[2], 0.0)
+
+    def search(self, query: str, site: Optional[str] = None, kind: Optional[str] = None,
+               limit: int = 10, min_overlap: float = 0.4) -> List[Dict]:
+        """Ranked matches for a query, optionally limited to one site and/or kind"""
+        words = normalize(query)
+        # A query ending mid-word is a prefix of its last word; a trailing space or symbol ends the word
+        grams = trigrams(words, partial_last=query[-1:].isalnum())
+        if not grams:
+            return []
+        site_id = self.site_ids.get(site) if site else None
+        if site and site_id is None:
+            return []
+
+        phrase = ' '.join(words)
+        q = len(grams)
+        empty = array('I')
+        gram_lists = sorted((self.postings.get(g, empty) for g in grams), key=len)
+        filter_lists = self._filter_lists(site_id, kind)
+        top = []  # min-heap of (score, id)
+
+        def offer(doc_id: int, shared: int, query_grams: int = q):
+            item = (self._score(doc_id, shared, query_grams, words, phrase), doc_id)
+            if len(top) < limit:
+                heapq.heappush(top, item)
+            elif item > top[0]:
+                heapq.heapreplace(top, item)
+
+        # Exact name matches first: they carry the largest bonus
+        offered = set()
+        for doc_id in self.names.get(phrase, ()):
+            if self.docs[doc_id] is not None and all(self._contains(f, doc_id) for f in filter_lists):
+                offered.add(doc_id)
+                offer(doc_id, q)
+
+        walked_all = True
+        if not gram_lists[0] or (filter_lists and not min(filter_lists, key=len)):
+            pass
+        elif len(min(gram_lists + filter_lists, key=len)) <= self.candidate_limit * 8:
+            # Few enough to score every match outright
+            for doc_id in self._iter_matches(gram_lists + filter_lists):
+                if doc_id not in offered:
+                    offer(doc_id, q)
+        else:
+            # A doc with every query trigram scores 2q / (q + its trigram count), plus at most
+            # 0.5 if its name can start with the query (else 0.25), plus its kind weight. Walk
+            # (count, head, kind) groups in upper-bound order and stop once the next group
+            # cannot beat the current k-th best.
+            head = self.filters.get(('head', phrase[:3]), array('I'))
+            kinds = [kind] if kind else list(KIND_WEIGHT)
+            groups = []
+            for (field, count) in self.filters:
+                if field != 'len' or count < q:
+                    continue
+                for doc_kind in kinds:
+                    base = 2 * q / (q + count) + KIND_WEIGHT[doc_kind]
+                    groups.append((base + 0.5, count, doc_kind, True))
+                    groups.append((base + 0.25, count, doc_kind, False))
+            groups.sort(key=lambda g: (-g[0], not g[3]))
+
+            for bound, count, doc_kind, prefix in groups:
+                if len(top) == limit and top[0][0] >= bound:
+                    walked_all = False
+                    break
+                lists = gram_lists + filter_lists + [self.filters[('len', count)],
+                                                     self.filters.get(('kind', doc_kind), array('I'))]
+                if prefix:
+                    lists.append(head)  # Docs outside it are picked up by the non-prefix group
+                for doc_id in self._iter_matches(lists):
+                    if doc_id not in offered:
+                        offered.add(doc_id)
+                        offer(doc_id, q)
+                        if len(top) == limit and top[0][0] >= bound:
+                            break
+
+        if walked_all and len(top) < limit:
+            # Typos often keep the word's ending, so the fallback matches on fully padded trigrams
+            full = trigrams(words)
+            full_lists = sorted((self.postings.get(g, empty) for g in full), key=len)
+            need = max(1, int(len(full) * min_overlap + 0.999))
+            for doc_id, shared in self._fuzzy(full_lists, filter_lists, need, {d for _, d in top}):
+                offer(doc_id, shared, len(full))
+
+        results = []
+        for score, doc_id in sorted(top, reverse=True):
+            key, doc_site, doc_kind, name, slug, url = self.docs[doc_id]
+            results.append({'site': self.site_names[doc_site], 'kind': doc_kind, 'name': name,
+                            'slug': slug, 'url': url, 'score': round(score, 4)})
+        return results
+
+    # ---- Persistence ----
+
+    @property
+    def _snapshot_path(self) -> Path:
+        return self.directory / 'index.bin'
+
+    @property
+    def _journal_path(self) -> Path:
+        return self.directory / 'journal.jsonl'
+
+    def _log(self, entry: Dict):
+        if not self.directory:
+            return
+        if self._journal is None:
+            self._journal = open(self._journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        """Make journaled updates durable"""
+        if self._journal:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def _load(self):
+        if self._snapshot_path.exists():
+            with open(self._snapshot_path, 'rb') as f:
+                magic, docs_len, table_len = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC:
+                    raise ValueError(f"{self._snapshot_path} is not a search index")
+                snapshot = json.loads(f.read(docs_len))
+                table = json.loads(f.read(table_len))
+                data = f.read()
+
+            self.site_names = snapshot['sites']
+            self.site_ids = {site: i for i, site in enumerate(self.site_names)}
+            for gram, (offset, count) in table.items():
+                posting = array('I')
+                posting.frombytes(data[offset:offset + count * 4])
+                self.postings[gram] = posting
+            gram_counts = snapshot.get('gram_counts')
+            for i, doc in enumerate(snapshot['docs']):
+                doc = tuple(doc)
+                if gram_counts is None:
+                    gram_count = len(trigrams(normalize(doc[3]) + normalize(doc[4])))
+                else:
+                    gram_count = gram_counts[i]
+                self._index(doc, gram_count, postings=False)
+
+        if self._journal_path.exists():
+            with open(self._journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn final line from a crash
+                    if entry['op'] == 'add':
+                        self.add(entry['key'], entry['site'], entry['kind'], entry['name'],
+                                 entry['slug'], entry['url'], journal=False)
+                    else:
+                        self.remove(entry['key'], journal=False)
+
+    def save(self):
+        """Compact tombstones, write a fresh snapshot atomically and clear the journal"""
+        if not self.directory:
+            raise ValueError("In-memory index has no directory to save to")
+
+        live = [doc for doc in self.docs if doc is not None]
+        self.docs, self.keys, self.postings, self.filters, self.names = [], {}, {}, {}, {}
+        self.gram_counts = array('H')
+        for doc in live:
+            self._index(doc)
+
+        table = {}
+        data = bytearray()
+        for gram, posting in self.postings.items():
+            table[gram] = (len(data), len(posting))
+            data += posting.tobytes()
+        docs_blob = json.dumps({'sites': self.site_names, 'docs': self.docs,
+                                'gram_counts': self.gram_counts.tolist()}, ensure_ascii=False).encode('utf-8')
+        table_blob = json.dumps(table, ensure_ascii=False).encode('utf-8')
+
+        tmp_path = self._snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(docs_blob), len(table_blob)))
+            f.write(docs_blob)
+            f.write(table_blob)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+
+        # Replaying the old journal over the new snapshot would be harmless, so a crash here is safe
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        if self._journal_path.exists():
+            self._journal_path.unlink()
+
+    def close(self):
+        if self._journal:
+            self.flush()
+            self._journal.close()
+            self._journal = None
+
+
+def _read_article_rows(path: str) -> Iterable[Dict]:
+    """Stream article rows from a CSV with site, url and title columns"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('title'):
+                yield row
+
+
+def _bench(docs: int, queries: int = 200):
+    """Build a synthetic corpus of article titles and time queries against it"""
+    rng = random.Random(42)
+    vocab = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+             for _ in range(20000)]
+    sites = ['collegian', 'collegeavemag', 'kcsu', 'fifty03', 'rmsmc']
+
+    index = SearchIndex()
+    started = time.perf_counter()
+    for i in range(docs):
+        title = ' '.join(rng.choice(vocab) for _ in range(rng.randint(4, 9)))
+        index.add(f"https://example.com/{i}/", rng.choice(sites), 'article', title, journal=False)
+    print(f"🏗️  Indexed {docs:,} documents in {time.perf_counter() - started:.1f}s "
+          f"({len(index.postings):,} trigrams)")
+
+    samples = [rng.choice(vocab) for _ in range(queries)]
+    typos = [w[:2] + w[3:] if len(w) > 4 else w for w in samples]
+    for label, terms, site in [('exact', samples, None), ('prefix', [w[:4] for w in samples], None),
+                               ('typo', typos, None), ('site filter', samples, 'kcsu')]:
+        timings = []
+        for term in terms:
+            t0 = time.perf_counter()
+            index.search(term, site=site)
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        print(f"🔎 {label:<12} p50 {timings[len(timings) // 2]:.2f} ms   "
+              f"p99 {timings[int(len(timings) * 0.99) - 1]:.2f} ms")
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='Trigram search over RMSMC categories and articles')
+    parser.add_argument('--index', default='rmsmc_search', help='Index directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build a fresh index')
+    build.add_argument('--input', default='rmsmc_categories.json', help='Category JSON file')
+    build.add_argument('--articles', help='CSV of site,url,title article rows')
+
+    add = subparsers.add_parser('add', help='Add or update documents from a crawl')
+    add.add_argument('--input', help='Category JSON file')
+    add.add_argument('--articles', help='CSV of site,url,title article rows')
+    add.add_argument('--compact', action='store_true', help='Write a fresh snapshot afterwards')
+
+    query = subparsers.add_parser('query', help='Search the index')
+    query.add_argument('--site', help='Only this site')
+    query.add_argument('--kind', choices=['category', 'article'], help='Only this kind of document')
+    query.add_argument('--limit', type=int, default=10, help='Maximum results')
+    query.add_argument('text', help='Search text')
+
+    bench = subparsers.add_parser('bench', help='Benchmark queries on a synthetic corpus')
+    bench.add_argument('--docs', type=int, default=1_000_000, help='Number of synthetic documents')
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        _bench(args.docs)
+        return
+
+    if args.command == 'build':
+        for stale in ('index.bin', 'journal.jsonl'):
+            if (Path(args.index) / stale).exists():
+                (Path(args.index) / stale).unlink()
+
+    index = SearchIndex(args.index)
+
+    if args.command in ('build', 'add'):
+        count = 0
+        if args.input:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                count += index.add_categories(json.load(f))
+        if args.articles:
+            count += index.add_articles(_read_article_rows(args.articles))
+        if args.command == 'build' or args.compact:
+            index.save()
+        index.close()
+        print(f"✅ Indexed {count} documents ({len(index)} total) in {args.index}")
+        return
+
+    started = time.perf_counter()
+    results = index.search(args.text, site=args.site, kind=args.kind, limit=args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if not results:
+        print(f"❌ No matches for '{args.text}'")
+        sys.exit(1)
+    for result in results:
+        print(f"{result['score']:.3f}  [{result['site']}] {result['name']:<30} {result['url']}")
+    print(f"\n⏱️  {len(results)} results in {elapsed:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+RMSMC Snapshot Archive
+Append-only, zstd-compressed store for raw HTML snapshots, with a per-site
+trained dictionary and an offset index for random access
+
+Usage:
+    python3 rmsmc_snapshot_archive.py --archive ./snapshots import ./html_files
+    python3 rmsmc_snapshot_archive.py --archive ./snapshots add collegian page1.html page2.html
+    python3 rmsmc_snapshot_archive.py --archive ./snapshots list [--site collegian]
+    python3 rmsmc_snapshot_archive.py --archive ./snapshots cat collegian [--index -1]
+    python3 rmsmc_snapshot_archive.py --archive ./snapshots stats
+
+Layout:
+    archive.json            - Marker and settings
+    <site>/seg-000001.zst   - Concatenated zstd frames, one per snapshot
+    <site>/index.bin        - Fixed-size records: captured_at, segment, offset, lengths, dict id, hash
+    <site>/dict-<id>.zdict  - Trained dictionaries (id 0 means no dictionary)
+
+Snapshots of one site share most of their theme markup, so once a site has
+enough snapshots a dictionary is trained from them and used for every later
+frame. Each snapshot is its own frame, so any one can be read with a single
+pread and decompress. Frames are written before their index record, and a
+torn trailing record is ignored, so a crash never exposes a half snapshot.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+MARKER = 'archive.json'
+INDEX_RECORD = struct.Struct('<dIQIIH8s')  # captured_at, segment, offset, length, raw_length, dict_id, hash
+
+
+def is_archive(path) -> bool:
+    return (Path(path) / MARKER).exists()
+
+
+class SnapshotEntry:
+    """One index record"""
+
+    __slots__ = ('site', 'position', 'captured_at', 'segment', 'offset', 'length',
+                 'raw_length', 'dict_id', 'digest')
+
+    def __init__(self, site: str, position: int, captured_at: float, segment: int, offset: int,
+                 length: int, raw_length: int, dict_id: int, digest: bytes):
+        self.site = site
+        self.position = position
+        self.captured_at = captured_at
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.raw_length = raw_length
+        self.dict_id = dict_id
+        self.digest = digest
+
+    def to_dict(self) -> Dict:
+        return {
+            'site': self.site,
+            'position': self.position,
+            'captured_at': datetime.fromtimestamp(self.captured_at).isoformat(timespec='seconds'),
+            'segment': self.segment,
+            'offset': self.offset,
+            'compressed_bytes': self.length,
+            'raw_bytes': self.raw_length,
+            'dict_id': self.dict_id
+        }
+
+
+class SnapshotArchive:
+    """
+    Per-site append-only segments of zstd frames plus an offset index.
+
+    Not safe for concurrent writers to the same site; any number of readers
+    may read while one process appends.
+    """
+
+    def __init__(self, root: str, max_segment_bytes: int = 64 * 1024 * 1024, level: int = 12,
+                 dict_size: int = 112 * 1024, dict_samples: int = 16, create: bool = True):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Snapshot archives require 'zstandard' (pip install zstandard)")
+
+        self.root = Path(root)
+        if not is_archive(self.root):
+            if not create:
+                raise FileNotFoundError(f"No snapshot archive at {self.root}")
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / MARKER, 'w', encoding='utf-8') as f:
+                json.dump({'format': 1, 'max_segment_bytes': max_segment_bytes, 'level': level,
+                           'dict_size': dict_size, 'dict_samples': dict_samples}, f, indent=2)
+
+        with open(self.root / MARKER, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        self.max_segment_bytes = settings['max_segment_bytes']
+        self.level = settings['level']
+        self.dict_size = settings['dict_size']
+        self.dict_samples = settings['dict_samples']
+
+        self._dicts = {}
+        self._decompressors = {}
+        self._compressors = {}
+
+    # ---- Index ----
+
+    def sites(self) -> List[str]:
+        return sorted(p.parent.name for p in self.root.glob('*/index.bin'))
+
+    def entries(self, site: str) -> List[SnapshotEntry]:
+        """All index records for a site, oldest first"""
+        index_path = self.root / site / 'index.bin'
+        if not index_path.exists():
+            return []
+        with open(index_path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_RECORD.size  # Ignore a torn trailing record
+        return [
+            SnapshotEntry(site, i, *INDEX_RECORD.unpack_from(data, offset))
+            for i, offset in enumerate(range(0, usable, INDEX_RECORD.size))
+        ]
+
+    def _tail(self, site: str) -> Tuple[int, Optional[SnapshotEntry]]:
+        """(record count, last record) without reading the whole index"""
+        index_path = self.root / site / 'index.bin'
+        if not index_path.exists():
+            return 0, None
+        count = index_path.stat().st_size // INDEX_RECORD.size
+        if count == 0:
+            return 0, None
+        with open(index_path, 'rb') as f:
+            f.seek((count - 1) * INDEX_RECORD.size)
+            return count, SnapshotEntry(site, count - 1, *INDEX_RECORD.unpack(f.read(INDEX_RECORD.size)))
+
+    def latest(self, site: str) -> Optional[SnapshotEntry]:
+        entries = self.entries(site)
+        return max(entries, key=lambda e: e.captured_at) if entries else None
+
+    # ---- Dictionaries ----
+
+    def _dict(self, site: str, dict_id: int) -> Optional['zstandard.ZstdCompressionDict']:
+        if dict_id == 0:
+            return None
+        key = (site, dict_id)
+        if key not in self._dicts:
+            with open(self.root / site / f"dict-{dict_id}.zdict", 'rb') as f:
+                self._dicts[key] = zstandard.ZstdCompressionDict(f.read())
+        return self._dicts[key]
+
+    def current_dict_id(self, site: str) -> int:
+        ids = [int(p.stem.split('-')[1]) for p in (self.root / site).glob('dict-*.zdict')]
+        return max(ids, default=0)
+
+    def train_dictionary(self, site: str, samples: int = 200) -> int:
+        """Train a new dictionary from the site's most recent snapshots; returns its id"""
+        entries = self.entries(site)[-samples:]
+        if not entries:
+            raise ValueError(f"No snapshots for {site} to train from")
+        data = [self.read(entry) for entry in entries]
+        trained = zstandard.train_dictionary(self.dict_size, data, level=self.level)
+
+        dict_id = self.current_dict_id(site) + 1
+        dict_path = self.root / site / f"dict-{dict_id}.zdict"
+        tmp_path = dict_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(trained.as_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, dict_path)
+        self._compressors.pop(site, None)
+        return dict_id
+
+    def _compressor(self, site: str) -> Tuple[int, 'zstandard.ZstdCompressor']:
+        if site not in self._compressors:
+            dict_id = self.current_dict_id(site)
+            self._compressors[site] = (dict_id, zstandard.ZstdCompressor(
+                level=self.level, dict_data=self._dict(site, dict_id), write_content_size=True
+            ))
+        return self._compressors[site]
+
+    def _decompressor(self, site: str, dict_id: int) -> 'zstandard.ZstdDecompressor':
+        key = (site, dict_id)
+        if key not in self._decompressors:
+            self._decompressors[key] = zstandard.ZstdDecompressor(dict_data=self._dict(site, dict_id))
+        return self._decompressors[key]
+
+    # ---- Writing ----
+
+    def append(self, site: str, html, captured_at: Optional[float] = None) -> SnapshotEntry:
+        """Add one snapshot (str or bytes); an unchanged page reuses the previous frame"""
+        raw = html.encode('utf-8') if isinstance(html, str) else html
+        captured_at = time.time() if captured_at is None else captured_at
+        digest = hashlib.blake2b(raw, digest_size=8).digest()
+        site_dir = self.root / site
+        site_dir.mkdir(exist_ok=True)
+
+        count, previous = self._tail(site)
+        if previous and previous.digest == digest and previous.raw_length == len(raw):
+            segment, offset, length, dict_id = previous.segment, previous.offset, previous.length, previous.dict_id
+        else:
+            # Train once there are enough samples to learn the site's shared markup from
+            if count >= self.dict_samples and count % self.dict_samples == 0 and self.current_dict_id(site) == 0:
+                try:
+                    self.train_dictionary(site)
+                except zstandard.ZstdError:
+                    pass  # Too little distinct content yet; try again after the next batch
+
+            dict_id, compressor = self._compressor(site)
+            frame = compressor.compress(raw)
+
+            segment = previous.segment if previous else 1
+            segment_path = site_dir / f"seg-{segment:06d}.zst"
+            if segment_path.exists() and segment_path.stat().st_size + len(frame) > self.max_segment_bytes:
+                segment += 1
+                segment_path = site_dir / f"seg-{segment:06d}.zst"
+
+            with open(segment_path, 'ab') as f:
+                offset = f.tell()
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+            length = len(frame)
+
+        record = INDEX_RECORD.pack(captured_at, segment, offset, length, len(raw), dict_id, digest)
+        with open(site_dir / 'index.bin', 'ab') as f:
+            # Drop a torn record left by a crash so the new one lands on a record boundary
+            f.truncate(count * INDEX_RECORD.size)
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+
+        return SnapshotEntry(site, count, captured_at, segment, offset, length, len(raw), dict_id, digest)
+
+    def import_html_dir(self, html_dir: str) -> int:
+        """Import <site>.html files (and <site>/*.html snapshot folders), oldest first by mtime"""
+        html_path = Path(html_dir)
+        files = [(p.stem, p) for p in html_path.glob('*.html')]
+        files += [(p.parent.name, p) for p in html_path.glob('*/*.html')]
+        files.sort(key=lambda item: item[1].stat().st_mtime)
+        for site, path in files:
+            self.append(site, path.read_bytes(), captured_at=path.stat().st_mtime)
+        return len(files)
+
+    # ---- Reading ----
+
+    def read(self, entry: SnapshotEntry) -> bytes:
+        """Random access to one snapshot: one pread and one decompress"""
+        segment_path = self.root / entry.site / f"seg-{entry.segment:06d}.zst"
+        fd = os.open(segment_path, os.O_RDONLY)
+        try:
+            frame = os.pread(fd, entry.length, entry.offset)
+        finally:
+            os.close(fd)
+        return self._decompressor(entry.site, entry.dict_id).decompress(frame, max_output_size=entry.raw_length)
+
+    def iter_snapshots(self, site: str, since: Optional[float] = None) -> Iterator[Tuple[SnapshotEntry, bytes]]:
+        """Yield (entry, html bytes) one at a time, oldest first"""
+        for entry in self.entries(site):
+            if since is None or entry.captured_at >= since:
+                yield entry, self.read(entry)
+
+    def stats(self) -> Dict:
+        """Per-site snapshot counts, raw vs stored bytes and dictionary in use"""
+        summary = {}
+        for site in self.sites():
+            entries = self.entries(site)
+            stored = sum(p.stat().st_size for p in (self.root / site).glob('seg-*.zst'))
+            raw = sum(e.raw_length for e in entries)
+            summary[site] = {
+                'snapshots': len(entries),
+                'raw_bytes': raw,
+                'stored_bytes': stored,
+                'ratio': round(raw / stored, 1) if stored else None,
+                'dict_id': self.current_dict_id(site)
+            }
+        return summary
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='Compressed HTML snapshot archive')
+    parser.add_argument('--archive', required=True, help='Archive directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = sub.add_parser('import', help='Import <site>.html files from a directory')
+    import_parser.add_argument('html_dir')
+
+    add_parser = sub.add_parser('add', help='Append HTML files as snapshots of one site')
+    add_parser.add_argument('site')
+    add_parser.add_argument('files', nargs='+')
+
+    list_parser = sub.add_parser('list', help='List snapshots')
+    list_parser.add_argument('--site', help='Only this site')
+
+    cat_parser = sub.add_parser('cat', help='Write one snapshot to stdout')
+    cat_parser.add_argument('site')
+    cat_parser.add_argument('--index', type=int, default=-1, help='Snapshot position (default: latest)')
+
+    train_parser = sub.add_parser('train', help='Train a new dictionary for a site')
+    train_parser.add_argument('site')
+
+    sub.add_parser('stats', help='Show compression statistics')
+    args = parser.parse_args()
+
+    if not ZSTD_AVAILABLE:
+        print("❌ Snapshot archives require 'zstandard'")
+        print("   Install with: pip install zstandard")
+        sys.exit(1)
+
+    archive = SnapshotArchive(args.archive, create=args.command in ('import', 'add'))
+
+    if args.command == 'import':
+        count = archive.import_html_dir(args.html_dir)
+        print(f"📦 Imported {count} snapshots into {args.archive}")
+    elif args.command == 'add':
+        for path in args.files:
+            entry = archive.append(args.site, Path(path).read_bytes(), captured_at=Path(path).stat().st_mtime)
+            print(f"📦 {path} -> {args.site} #{entry.position} ({entry.raw_length} -> {entry.length} bytes)")
+    elif args.command == 'list':
+        for site in [args.site] if args.site else archive.sites():
+            for entry in archive.entries(site):
+                print(json.dumps(entry.to_dict()))
+    elif args.command == 'cat':
+        entries = archive.entries(args.site)
+        if not entries:
+            print(f"❌ No snapshots for {args.site}", file=sys.stderr)
+            sys.exit(1)
+        sys.stdout.buffer.write(archive.read(entries[args.index]))
+    elif args.command == 'train':
+        print(f"📚 Trained dictionary {archive.train_dictionary(args.site)} for {args.site}")
+    else:
+        print(json.dumps(archive.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
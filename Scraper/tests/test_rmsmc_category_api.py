@@ -0,0 +1,153 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from rmsmc_category_api import MAX_BODY_BYTES, CategoryAPIProtocol, CategoryAPIServer
+
+STORE = {
+    'kcsu': {
+        'site': 'KCSU',
+        'url': 'https://kcsufm.com',
+        'categories': [
+            {'name': 'News', 'slug': 'news', 'url': 'https://kcsufm.com/category/news/'},
+            {'name': 'Campus', 'slug': 'news/campus', 'url': 'https://kcsufm.com/category/news/campus/'},
+        ],
+    },
+}
+
+
+class FakeTransport:
+    def __init__(self):
+        self.written = bytearray()
+        self.closed = False
+
+    def write(self, data: bytes):
+        assert not self.closed
+        self.written += data
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def server(tmp_path):
+    store = tmp_path / 'rmsmc_categories.json'
+    store.write_text(json.dumps(STORE), encoding='utf-8')
+    return CategoryAPIServer(str(store))
+
+
+@pytest.fixture
+def connection(server):
+    protocol = CategoryAPIProtocol(server)
+    protocol.connection_made(FakeTransport())
+    return protocol
+
+
+def responses(transport):
+    """Split written bytes into (status, headers, body) tuples"""
+    data = bytes(transport.written)
+    parsed = []
+    while data:
+        head, _, data = data.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        headers = dict(line.split(': ', 1) for line in lines[1:])
+        length = int(headers.get('Content-Length', 0))
+        parsed.append((int(lines[0].split(' ')[1]), headers, data[:length]))
+        data = data[length:]
+    return parsed
+
+
+def get(path, *headers):
+    return ('\r\n'.join([f'GET {path} HTTP/1.1', 'Host: localhost', *headers]) + '\r\n\r\n').encode('latin-1')
+
+
+def test_routes_for_sites_and_nested_slugs(connection):
+    connection.data_received(get('/api/categories/kcsu/news/campus/') + get('/api/categories/kcsu?x=1')
+                             + get('/api/categories/kcsu/sports'))
+    (status, _, body), (site_status, _, site_body), (missing, headers, _) = responses(connection.transport)
+
+    assert (status, json.loads(body)['name']) == (200, 'Campus')
+    assert (site_status, json.loads(site_body)['site']) == (200, 'KCSU')
+    assert missing == 404 and headers['Cache-Control'] == 'public, max-age=0'
+    assert not connection.transport.closed
+
+
+def test_gzip_and_conditional_requests(connection):
+    connection.data_received(get('/api/categories', 'Accept-Encoding: gzip, br'))
+    [(_, headers, body)] = responses(connection.transport)
+    assert headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(body)) == STORE
+
+    connection.transport.written.clear()
+    connection.data_received(get('/api/categories', 'Accept-Encoding: gzip', f"If-None-Match: W/{headers['ETag']}"))
+    [(status, not_modified, body)] = responses(connection.transport)
+    assert (status, body) == (304, b'')
+    assert not_modified['ETag'] == headers['ETag']
+
+
+def test_request_split_across_packets(connection):
+    request = get('/api/categories/kcsu/news')
+    for i in range(0, len(request), 7):
+        connection.data_received(request[i:i + 7])
+    assert [status for status, _, _ in responses(connection.transport)] == [200]
+
+
+def test_request_body_is_skipped_before_the_next_pipelined_request(connection):
+    head = b'GET /api/categories/kcsu HTTP/1.1\r\nContent-Length: 10\r\n\r\n'
+    connection.data_received(head + b'01234')
+    assert connection.transport.written == b''
+
+    connection.data_received(b'56789' + get('/api/categories/kcsu/news'))
+    assert [status for status, _, _ in responses(connection.transport)] == [200, 200]
+    assert json.loads(responses(connection.transport)[1][2])['slug'] == 'news'
+
+
+@pytest.mark.parametrize('header, status', [
+    ('Transfer-Encoding: chunked', 400),
+    ('Content-Length: -1', 400),
+    ('Content-Length: 1e3', 400),
+    (f'Content-Length: {MAX_BODY_BYTES + 1}', 413),
+])
+def test_unframed_or_oversized_bodies_are_rejected(connection, header, status):
+    connection.data_received(get('/api/categories', header) + get('/api/categories'))
+    assert [s for s, _, _ in responses(connection.transport)] == [status]
+    assert connection.transport.closed
+
+
+def test_oversized_headers_and_bad_request_lines(server):
+    for data, status in [(b'GET /' + b'a' * 20000, 431), (b'NONSENSE\r\n\r\n', 400)]:
+        protocol = CategoryAPIProtocol(server)
+        protocol.connection_made(FakeTransport())
+        protocol.data_received(data)
+        assert [s for s, _, _ in responses(protocol.transport)] == [status]
+        assert protocol.transport.closed
+
+
+def test_methods_and_connection_close(connection):
+    connection.data_received(b'HEAD /api/categories/kcsu HTTP/1.1\r\n\r\n')
+    [(status, headers, body)] = responses(connection.transport)
+    assert status == 200 and body == b'' and int(headers['Content-Length']) > 0
+    connection.transport.written.clear()
+
+    connection.data_received(get('/api/categories', 'Connection: close') + get('/api/categories'))
+    assert len(responses(connection.transport)) == 1 and connection.transport.closed
+
+    post = CategoryAPIProtocol(connection.server)
+    post.connection_made(FakeTransport())
+    post.data_received(b'POST /api/categories HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}')
+    assert [s for s, _, _ in responses(post.transport)] == [405]
+
+
+def test_reload_swaps_in_valid_stores_only(server):
+    old = server.snapshot
+    server.store_path.write_text('{"kcsu": {"site": "KCSU"}}', encoding='utf-8')
+    assert not asyncio.run(server.reload())
+    assert server.snapshot is old
+
+    store = dict(STORE, kcsu=dict(STORE['kcsu'], categories=STORE['kcsu']['categories'][:1]))
+    server.store_path.write_text(json.dumps(store), encoding='utf-8')
+    assert asyncio.run(server.reload())
+    assert '/api/categories/kcsu/news/campus' not in server.snapshot.routes
+    assert not asyncio.run(server.reload())
@@ -0,0 +1,63 @@
+import pytest
+
+from rmsmc_category_index import CategoryIndex, build_category_index, canonical_url
+
+DATA = {
+    'collegian': {
+        'categories': [
+            {'name': 'Sports', 'slug': 'sports', 'url': 'https://collegian.com/category/sports/'},
+            {'name': 'Football', 'slug': 'sports/football',
+             'url': 'https://collegian.com/category/sports/football/'},
+            {'name': 'Rams', 'slug': 'sports/football/rams',
+             'url': 'https://collegian.com/category/sports/football/rams/'},
+        ]
+    },
+    'kcsu': {
+        'categories': [
+            {'name': 'News', 'slug': 'news', 'url': 'https://kcsufm.com/category/news/'},
+        ]
+    },
+    'broken': {'error': 'timeout'},
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = build_category_index(DATA, tmp_path / 'categories.idx',
+                                articles=[('kcsu', 'https://kcsufm.com/2024/01/story/', 'news')])
+    with CategoryIndex(path) as idx:
+        yield idx
+
+
+def test_canonical_url_drops_scheme_www_query_and_slash():
+    assert canonical_url('https://www.Collegian.com//category/sports/?page=2') == 'collegian.com/category/sports'
+    assert canonical_url('collegian.com/category/sports') == 'collegian.com/category/sports'
+
+
+def test_lookup_by_url_and_path(index):
+    assert len(index) == 4
+    assert index.lookup_url('http://www.collegian.com/category/sports/football')['name'] == 'Football'
+    assert index.lookup_url('/category/news/', site='kcsu')['slug'] == 'news'
+    assert index.lookup_url('/category/news/') is None
+    assert index.lookup_url('https://collegian.com/category/opinion/') is None
+
+
+def test_article_urls_map_to_their_category(index):
+    assert index.lookup_url('https://kcsufm.com/2024/01/story')['name'] == 'News'
+
+
+def test_lookup_by_slug_is_per_site(index):
+    assert index.lookup_slug('collegian', '/sports/football/')['name'] == 'Football'
+    assert index.lookup_slug('kcsu', 'sports') is None
+
+
+def test_ancestors_follow_slug_nesting(index):
+    rams = index.lookup_slug('collegian', 'sports/football/rams')
+    assert [c['name'] for c in index.ancestors(rams['id'])] == ['Football', 'Sports']
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'bogus.idx'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        CategoryIndex(path)
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from rmsmc_scraper_toolkit import RMSMCScraperToolkit, load_category_store, validate_category_store
+
+STORE = {
+    'kcsu': {
+        'site': 'KCSU',
+        'url': 'https://kcsufm.com',
+        'categories': [{'name': 'News', 'slug': 'news', 'url': 'https://kcsufm.com/category/news/'}],
+    },
+    'broken': {'site': 'Broken', 'url': 'https://broken.example', 'error': 'timeout'},
+}
+
+
+@pytest.fixture
+def store_file(tmp_path):
+    path = tmp_path / 'rmsmc_categories.json'
+    path.write_text(json.dumps(STORE), encoding='utf-8')
+    return path
+
+
+@pytest.mark.parametrize('data, message', [
+    ([], 'expected an object of sites'),
+    ({'kcsu': {'site': 'KCSU'}}, "missing 'url'"),
+    ({'kcsu': {'site': 'KCSU', 'url': 'u'}}, "missing 'categories'"),
+    ({'kcsu': {'site': 'KCSU', 'url': 'u', 'categories': [{'name': 'News', 'slug': 'news'}]}},
+     "category 0 is missing 'url'"),
+    ({'kcsu': {'site': 'KCSU', 'url': 'u', 'categories': ['news']}}, "category 0 is missing 'name'"),
+])
+def test_validation_errors(data, message):
+    with pytest.raises(ValueError, match=message):
+        validate_category_store(data)
+
+
+def test_store_is_memoized_until_its_content_changes(store_file):
+    first = load_category_store(store_file)
+    assert load_category_store(store_file) is first
+
+    # Same bytes, new mtime: hashed but not re-parsed
+    stat = os.stat(store_file)
+    os.utime(store_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert load_category_store(store_file) is first
+
+    changed = dict(STORE, kcsu=dict(STORE['kcsu'], categories=[]))
+    store_file.write_text(json.dumps(changed), encoding='utf-8')
+    assert load_category_store(store_file) == changed
+
+
+def test_invalid_store_is_not_cached(store_file):
+    store_file.write_text('{"kcsu": {"site": "KCSU"}}', encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_category_store(store_file)
+    store_file.write_text(json.dumps(STORE), encoding='utf-8')
+    assert load_category_store(store_file) == STORE
+
+
+def test_cached_results_are_private_copies(tmp_path, store_file):
+    toolkit = RMSMCScraperToolkit(output_dir=str(tmp_path), store_file=str(store_file))
+    results = toolkit.get_cached_results()
+    assert results['kcsu']['total_categories'] == 1
+    assert results['broken'] == STORE['broken']
+
+    results['kcsu']['categories'][0]['name'] = 'Changed'
+    assert toolkit.get_cached_results()['kcsu']['categories'][0]['name'] == 'News'
+
+
+def test_missing_store_falls_back_to_built_in_data(tmp_path):
+    toolkit = RMSMCScraperToolkit(output_dir=str(tmp_path), store_file=str(tmp_path / 'missing.json'))
+    assert set(toolkit.get_cached_results()) == set(toolkit.SITES)
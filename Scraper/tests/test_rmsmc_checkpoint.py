@@ -0,0 +1,102 @@
+from collections import deque
+
+import pytest
+
+from rmsmc_checkpoint import BloomFilter, CrawlCheckpoint
+from rmsmc_scraper_toolkit import LIVE_MODE_AVAILABLE, RMSMCScraperToolkit
+
+
+def test_bloom_filter_membership():
+    seen = BloomFilter(capacity=1000, error_rate=0.01)
+    urls = [f"https://collegian.com/category/{i}/" for i in range(1000)]
+    for url in urls:
+        seen.add(url)
+
+    assert all(url in seen for url in urls)
+    false_positives = sum(f"https://kcsufm.com/{i}/" in seen for i in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_round_trip(tmp_path):
+    seen = BloomFilter(capacity=100)
+    seen.add('https://collegian.com')
+    seen.save(tmp_path / 'seen.bloom')
+
+    loaded = BloomFilter.load(tmp_path / 'seen.bloom')
+    assert 'https://collegian.com' in loaded
+    assert (loaded.num_bits, loaded.num_hashes) == (seen.num_bits, seen.num_hashes)
+    assert [p.name for p in tmp_path.iterdir()] == ['seen.bloom']
+
+
+def test_bloom_filter_rejects_other_files(tmp_path):
+    (tmp_path / 'seen.bloom').write_bytes(b'NOTBLOOM' + b'\0' * 32)
+    with pytest.raises(ValueError):
+        BloomFilter.load(tmp_path / 'seen.bloom')
+
+
+def test_checkpoint_round_trip_keeps_one_generation(tmp_path):
+    checkpoint = CrawlCheckpoint(tmp_path / 'checkpoint', capacity=100)
+    seen = checkpoint.new_seen_set()
+    seen.add('https://kcsufm.com')
+    results = {'kcsu': {'site': 'KCSU', 'categories': {}}}
+
+    checkpoint.save(deque([('kcsu', 'https://kcsufm.com')]), results, seen)
+    checkpoint.save(deque([('kcsu', 'https://kcsufm.com/category/news/')]), results, seen)
+    assert sorted(p.name for p in checkpoint.directory.iterdir()) == ['seen.2.bloom', 'state.json']
+
+    resumed = CrawlCheckpoint(tmp_path / 'checkpoint')
+    frontier, partial, loaded = resumed.load()
+    assert frontier == deque([('kcsu', 'https://kcsufm.com/category/news/')])
+    assert partial == results
+    assert 'https://kcsufm.com' in loaded
+    assert resumed.generation == 2
+
+    resumed.clear()
+    assert not resumed.exists()
+    assert list(checkpoint.directory.iterdir()) == []
+
+
+def test_maybe_save_waits_for_the_page_interval(tmp_path):
+    checkpoint = CrawlCheckpoint(tmp_path, interval_seconds=3600, interval_pages=3, capacity=100)
+    seen = checkpoint.new_seen_set()
+    for _ in range(2):
+        checkpoint.maybe_save(deque(), {}, seen)
+    assert not checkpoint.exists()
+    checkpoint.maybe_save(deque(), {}, seen)
+    assert checkpoint.exists()
+
+
+class _Response:
+    def __init__(self, html: str):
+        self.content = html.encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.mark.skipif(not LIVE_MODE_AVAILABLE, reason='requires requests and beautifulsoup4')
+def test_resume_skips_sites_removed_from_the_registry(tmp_path):
+    checkpoint = CrawlCheckpoint(tmp_path / 'checkpoint', capacity=100)
+    partial = {
+        'gone': {'site': 'Gone', 'url': 'https://gone.example', 'categories': {}},
+        'kcsu': {'site': 'KCSU', 'url': 'https://kcsufm.com', 'categories': {}},
+    }
+    frontier = deque([('gone', 'https://gone.example/category/a/'), ('kcsu', 'https://kcsufm.com/category/news/')])
+    checkpoint.save(frontier, partial, checkpoint.new_seen_set())
+
+    toolkit = RMSMCScraperToolkit(output_dir=str(tmp_path))
+    toolkit.SITES = {'kcsu': {'name': 'KCSU', 'url': 'https://kcsufm.com', 'patterns': ['/category/']}}
+    fetched = []
+
+    def get(url, headers=None, timeout=None):
+        fetched.append(url)
+        return _Response('<a href="/category/news/">News</a>')
+
+    toolkit.fetcher.get = get
+
+    results = toolkit.scrape_live(checkpoint=checkpoint, resume=True)
+
+    assert fetched == ['https://kcsufm.com/category/news/']
+    assert list(results) == ['kcsu']
+    assert [c['slug'] for c in results['kcsu']['categories']] == ['news']
+    assert not checkpoint.exists()
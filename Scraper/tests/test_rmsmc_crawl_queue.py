@@ -0,0 +1,103 @@
+import pytest
+
+from rmsmc_crawl_queue import CrawlQueue, CrawlWorker
+
+SITES = {
+    'collegian': {'name': 'The Collegian', 'url': 'https://collegian.com'},
+    'kcsu': {'name': 'KCSU', 'url': 'https://kcsufm.com'},
+}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = CrawlQueue(str(tmp_path / 'crawl.db'), max_attempts=3, retry_delay=0)
+    queue.register_sites(SITES)
+    yield queue
+    queue.close()
+
+
+def test_register_sites_is_idempotent(queue):
+    queue.register_sites(SITES)
+    assert queue.sites() == SITES
+    assert queue.counts() == {'pending': 2}
+
+
+def test_leases_are_exclusive(queue):
+    first = queue.lease('a')
+    second = queue.lease('b')
+    assert (first['site'], second['site']) == ('collegian', 'kcsu')
+    assert queue.lease('c') is None
+
+
+def test_expired_lease_moves_to_another_worker(queue):
+    task = queue.lease('a', lease_seconds=-1)
+    stolen = queue.lease('b')
+    assert (stolen['id'], stolen['attempts']) == (task['id'], 2)
+
+    # The crashed holder can neither renew nor record a result any more
+    assert not queue.heartbeat(task['id'], 'a')
+    assert not queue.complete(task['id'], 'a', {'categories': []})
+    assert queue.heartbeat(task['id'], 'b')
+
+
+def test_complete_records_result_and_enqueues_discovered(queue):
+    task = queue.lease('a')
+    discovered = [{'kind': 'category_page', 'site': 'collegian', 'url': 'https://collegian.com/category/news/'}]
+    assert queue.complete(task['id'], 'a', {'categories': [{'slug': 'news'}], 'scraped_at': 'now'}, discovered)
+    assert not queue.complete(task['id'], 'a', {'categories': []})
+    assert queue.counts() == {'done': 1, 'pending': 2}
+
+
+def test_failures_retry_until_max_attempts(queue):
+    for attempt in range(1, 4):
+        task = queue.lease('a')
+        assert (task['site'], task['attempts']) == ('collegian', attempt)
+        queue.fail(task['id'], 'a', 'timeout')
+    assert queue.counts() == {'failed': 1, 'pending': 1}
+
+    results = queue.collect(last_good=lambda site: None)
+    assert results['collegian'] == {'site': 'The Collegian', 'url': 'https://collegian.com', 'error': 'timeout'}
+    assert results['kcsu']['total_categories'] == 0
+
+
+def test_expired_final_attempt_fails_the_task(queue):
+    for _ in range(3):
+        task = queue.lease('a', lease_seconds=-1)
+        assert task['site'] == 'collegian'
+    assert queue.lease('b')['site'] == 'kcsu'
+    assert queue.counts() == {'failed': 1, 'leased': 1}
+
+
+def test_release_does_not_spend_an_attempt(queue):
+    task = queue.lease('a')
+    queue.release(task['id'], 'a', retry_in=60)
+    assert queue.lease('b')['site'] == 'kcsu'
+    assert queue.lease('c') is None
+
+    queue.release(task['id'], 'nobody')
+    row = queue.conn.execute('SELECT attempts, status FROM tasks WHERE id = ?', (task['id'],)).fetchone()
+    assert (row['attempts'], row['status']) == (0, 'pending')
+
+
+def test_stale_result_is_used_when_homepage_fails(queue):
+    for _ in range(3):
+        queue.fail(queue.lease('a')['id'], 'a', 'HTTP 503')
+    good = {'site': 'The Collegian', 'categories': [{'slug': 'news'}]}
+    assert queue.collect(last_good=lambda site: good)['collegian'] == {**good, 'stale': 'HTTP 503'}
+
+
+def test_worker_fails_tasks_for_unknown_sites(tmp_path):
+    db_path = str(tmp_path / 'crawl.db')
+    queue = CrawlQueue(db_path)
+    queue.register_sites({'kcsu': SITES['kcsu']})
+    queue.conn.execute("UPDATE tasks SET site = 'gone'")
+    queue.close()
+
+    worker = CrawlWorker(db_path, worker_id='w1')
+    worker.queue.retry_delay = 0
+    assert worker.run() == 0
+
+    queue = CrawlQueue(db_path)
+    row = queue.conn.execute('SELECT status, error, attempts FROM tasks').fetchone()
+    assert dict(row) == {'status': 'failed', 'error': 'unknown site: gone', 'attempts': 3}
+    queue.close()
@@ -0,0 +1,167 @@
+import threading
+import time
+
+import pytest
+
+from rmsmc_fetcher import (REQUESTS_AVAILABLE, CircuitBreaker, CircuitOpenError, HedgedFetcher, LatencyTracker,
+                           make_standin_server)
+
+needs_requests = pytest.mark.skipif(not REQUESTS_AVAILABLE, reason='requires requests')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_latency_percentiles_need_enough_samples():
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(9):
+        tracker.record(i / 100)
+    assert tracker.percentile(0.5) is None
+    for i in range(9, 100):
+        tracker.record(i / 100)
+    assert tracker.percentile(0.5) == 0.5
+    assert tracker.percentile(0.99) == 0.99
+    assert tracker.percentile(1.0) == 0.99
+
+
+def test_breaker_opens_probes_and_backs_off():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, max_reset_timeout=25, clock=clock)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    clock.now = 4
+    assert breaker.retry_in() == 6
+    clock.now = 10
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # One probe at a time
+
+    breaker.record_failure()
+    assert (breaker.state, breaker.reset_timeout) == (CircuitBreaker.OPEN, 20)
+    clock.now = 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.reset_timeout == 25
+
+    clock.now = 55
+    assert breaker.allow()
+    breaker.record_success()
+    assert (breaker.state, breaker.failures, breaker.reset_timeout) == (CircuitBreaker.CLOSED, 0, 10)
+
+
+@needs_requests
+def test_timeout_follows_observed_latency():
+    fetcher = HedgedFetcher(max_timeout=10, min_timeout=0.5, timeout_multiplier=3, min_samples=5)
+    try:
+        assert fetcher.timeout_for('a.example') == 10
+        for _ in range(5):
+            fetcher.host_state('a.example').latency.record(0.4)
+            fetcher.host_state('b.example').latency.record(0.01)
+        assert fetcher.timeout_for('a.example') == pytest.approx(1.2)
+        assert fetcher.timeout_for('a.example', cap=1.0) == 1.0
+        assert fetcher.timeout_for('b.example') == 0.5
+        assert fetcher.hedge_delay_for('b.example') == fetcher.min_hedge_delay
+
+        fetcher.host_state('a.example').breaker.state = CircuitBreaker.HALF_OPEN
+        assert fetcher.timeout_for('a.example') == 10
+    finally:
+        fetcher.close()
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(**kwargs):
+        server = make_standin_server(port=0, delay=0.0, seed=1, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@needs_requests
+def test_fetches_and_records_latency(standin):
+    url = standin()
+    fetcher = HedgedFetcher(min_samples=3)
+    try:
+        for _ in range(3):
+            assert b'/category/news/' in fetcher.get(url).content
+        summary = fetcher.summary()[url.split('/')[2]]
+        assert (summary['requests'], summary['failures'], summary['circuit']) == (3, 0, 'closed')
+        assert summary['p50_ms'] is not None
+    finally:
+        fetcher.close()
+
+
+@needs_requests
+def test_server_errors_open_the_circuit(standin):
+    url = standin(fail_rate=1.0)
+    fetcher = HedgedFetcher(failure_threshold=2, reset_timeout=60)
+    try:
+        for _ in range(2):
+            assert fetcher.get(url).status_code == 503
+        with pytest.raises(CircuitOpenError) as excinfo:
+            fetcher.get(url)
+        assert 0 < excinfo.value.retry_in <= 60
+        assert fetcher.summary()[url.split('/')[2]]['rejected'] == 1
+    finally:
+        fetcher.close()
+
+
+class _Response:
+    status_code = 200
+
+
+@needs_requests
+def test_slow_first_attempt_is_hedged():
+    fetcher = HedgedFetcher(min_samples=5, min_hedge_delay=0.01)
+    calls = []
+
+    def get(url, headers=None, timeout=None):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            time.sleep(0.5)
+        return _Response()
+
+    fetcher.session.get = get
+    try:
+        for _ in range(5):
+            fetcher.host_state('slow.example').latency.record(0.01)
+        started = time.monotonic()
+        assert isinstance(fetcher.get('http://slow.example/'), _Response)
+        assert time.monotonic() - started < 0.4
+        counters = fetcher.host_state('slow.example').counters
+        assert (counters['hedged'], counters['hedge_wins']) == (1, 1)
+    finally:
+        fetcher.close()
+
+
+@needs_requests
+def test_unexpected_attempt_errors_count_as_failures():
+    fetcher = HedgedFetcher(failure_threshold=1)
+
+    def get(url, headers=None, timeout=None):
+        raise ValueError('bad header value')
+
+    fetcher.session.get = get
+    try:
+        with pytest.raises(ValueError):
+            fetcher.get('http://broken.example/')
+        state = fetcher.host_state('broken.example')
+        assert state.counters['failures'] == 1
+        assert state.breaker.state == CircuitBreaker.OPEN
+    finally:
+        fetcher.close()
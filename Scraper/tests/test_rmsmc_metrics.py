@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from rmsmc_metrics import ScrapeMetrics
+from rmsmc_scraper_toolkit import LIVE_MODE_AVAILABLE, RMSMCScraperToolkit
+
+
+def test_repeated_stages_accumulate():
+    metrics = ScrapeMetrics(mode='live')
+    for _ in range(3):
+        with metrics.stage('fetch', 'collegian'):
+            pass
+    with metrics.stage('write_json'):
+        pass
+
+    stages = {(s['stage'], s['site']): s for s in metrics.to_dict()['stages']}
+    assert stages[('fetch', 'collegian')]['count'] == 3
+    assert stages[('write_json', None)]['count'] == 1
+
+
+def test_stage_is_recorded_when_it_raises():
+    metrics = ScrapeMetrics()
+    with pytest.raises(RuntimeError):
+        with metrics.stage('fetch', 'kcsu'):
+            raise RuntimeError('boom')
+    assert metrics.stages[('fetch', 'kcsu')]['count'] == 1
+
+
+def test_counters_and_gauges():
+    metrics = ScrapeMetrics()
+    metrics.increment('kcsu', 'pages_parsed')
+    metrics.increment('kcsu', 'pages_parsed')
+    metrics.set_value('kcsu', 'categories_found', 7)
+    metrics.set_value('kcsu', 'categories_found', 5)
+    assert metrics.sites['kcsu'] == {'pages_parsed': 2, 'categories_found': 5}
+
+
+def test_prometheus_output_escapes_labels():
+    metrics = ScrapeMetrics(mode='live')
+    with metrics.stage('parse', 'we"ird'):
+        pass
+    metrics.increment('kcsu', 'bytes_downloaded', 1024)
+    text = metrics.to_prometheus()
+
+    assert '# TYPE rmsmc_scraper_stage_seconds gauge' in text
+    assert 'rmsmc_scraper_stage_calls{mode="live",stage="parse",site="we\\"ird"} 1' in text
+    assert 'rmsmc_scraper_bytes_downloaded{mode="live",site="kcsu"} 1024' in text
+
+
+def test_parse_profiles_cover_every_page(tmp_path):
+    metrics = ScrapeMetrics()
+    metrics.profile_parse = {'cprofile', 'tracemalloc'}
+    for page in ['https://kcsufm.com', 'https://kcsufm.com/category/news/']:
+        with metrics.parse_stage('kcsu', page):
+            sorted(str(i) for i in range(1000))
+
+    assert len(metrics.parse_profiles) == 1
+    assert [page for page, _ in metrics.parse_memory['kcsu']] == [
+        'https://kcsufm.com', 'https://kcsufm.com/category/news/'
+    ]
+
+    saved = {path.name for path in metrics.save(tmp_path)}
+    assert saved == {'scrape_metrics.json', 'scrape_metrics.prom', 'parse_kcsu.prof', 'parse_kcsu_tracemalloc.txt'}
+    assert json.loads((tmp_path / 'scrape_metrics.json').read_text())['stages'][0]['count'] == 2
+    memory = (tmp_path / 'parse_kcsu_tracemalloc.txt').read_text()
+    assert '# https://kcsufm.com\n' in memory and '# https://kcsufm.com/category/news/\n' in memory
+
+
+class _Response:
+    def __init__(self, html: str):
+        self.content = html.encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.mark.skipif(not LIVE_MODE_AVAILABLE, reason='requires requests and beautifulsoup4')
+def test_categories_found_tracks_the_homepage_only(tmp_path):
+    toolkit = RMSMCScraperToolkit(output_dir=str(tmp_path))
+    site_info = {'name': 'KCSU', 'url': 'https://kcsufm.com', 'patterns': ['/category/']}
+    pages = {
+        'https://kcsufm.com': '<a href="/category/news/">News</a><a href="/category/sports/">Sports</a>',
+        'https://kcsufm.com/category/news/': '<a href="/category/news/">News</a>',
+    }
+    toolkit.fetcher.get = lambda url, headers=None, timeout=None: _Response(pages[url])
+
+    toolkit.scrape_site('kcsu', site_info)
+    toolkit.scrape_site('kcsu', site_info, page_url='https://kcsufm.com/category/news/')
+
+    assert toolkit.metrics.sites['kcsu']['categories_found'] == 2
+    assert toolkit.metrics.sites['kcsu']['pages_parsed'] == 2
@@ -0,0 +1,138 @@
+import time
+
+import pytest
+import requests
+
+from rmsmc_recrawl_scheduler import RecrawlScheduler, fingerprint
+
+HOME = 'https://kcsufm.com'
+
+
+def cat(slug):
+    return {'name': slug.title(), 'slug': slug, 'url': f"{HOME}/category/{slug}/"}
+
+
+class FakeToolkit:
+    """Serves pages from a dict; a status code entry raises an HTTPError"""
+
+    SITES = {'kcsu': {'name': 'KCSU', 'url': HOME, 'patterns': ['/category/']}}
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def scrape_site(self, site_key, site_info, timeout=10, page_url=None, include_articles=False):
+        page = self.pages[page_url]
+        if isinstance(page, int):
+            response = requests.Response()
+            response.status_code = page
+            raise requests.HTTPError(f"{page} Client Error", response=response)
+        return {'site': site_info['name'], 'url': site_info['url'], 'categories': page.get('categories', []),
+                'total_categories': len(page.get('categories', [])), 'articles': page.get('articles', []),
+                'scraped_at': 'now'}
+
+
+def make_scheduler(tmp_path, pages, **kwargs):
+    changes = []
+    kwargs.setdefault('jitter', 0)
+    scheduler = RecrawlScheduler(FakeToolkit(pages), tmp_path / 'state.json', min_interval=100,
+                                 max_interval=1000, on_change=changes.append, **kwargs)
+    return scheduler, changes
+
+
+def test_fingerprint_ignores_order_and_duplicates():
+    assert fingerprint(['b', 'a', 'a']) == fingerprint(['a', 'b'])
+    assert fingerprint(['a']) != fingerprint(['a', 'b'])
+
+
+def test_changes_shrink_and_quiet_checks_grow_the_interval(tmp_path):
+    scheduler, _ = make_scheduler(tmp_path, {}, initial_interval=400)
+    scheduler.sync_targets(now=0)
+
+    assert not scheduler.record(HOME, ['news'], now=0)
+    assert scheduler.targets[HOME]['interval'] == 400
+    assert not scheduler.record(HOME, ['news'], now=1)
+    assert scheduler.targets[HOME]['interval'] == 600
+    assert scheduler.record(HOME, ['news', 'sports'], now=2)
+    assert scheduler.targets[HOME]['interval'] == 300
+    assert scheduler.targets[HOME]['next_due'] == 302
+
+    for i in range(3):
+        scheduler.record(HOME, [f'page-{i}'], now=3)
+    assert scheduler.targets[HOME]['interval'] == 100
+    for _ in range(10):
+        scheduler.record(HOME, ['sports'], now=4)
+    assert scheduler.targets[HOME]['interval'] == 1000
+
+
+def test_errors_keep_the_interval(tmp_path):
+    scheduler, _ = make_scheduler(tmp_path, {HOME: 503}, initial_interval=400)
+    scheduler.sync_targets(now=0)
+    assert not scheduler.crawl(scheduler.targets[HOME], now=10)
+    assert scheduler.targets[HOME]['interval'] == 400
+    assert scheduler.targets[HOME]['next_due'] == 110
+    assert scheduler.targets[HOME]['errors'] == 1
+
+
+def test_homepage_crawl_keeps_unlinked_seeded_categories(tmp_path):
+    pages = {HOME: {'categories': [cat('news')]}}
+    scheduler, changes = make_scheduler(tmp_path, pages)
+    seed = {'kcsu': {'site': 'KCSU', 'url': HOME, 'categories': [cat('news'), cat('news/campus')]}}
+    scheduler.sync_targets(seed=seed, now=0)
+    assert set(scheduler.targets) == {HOME, cat('news')['url'], cat('news/campus')['url']}
+
+    scheduler.crawl(scheduler.targets[HOME], now=1)
+
+    assert [c['slug'] for c in scheduler.results['kcsu']['categories']] == ['news', 'news/campus']
+    assert scheduler.seeded['kcsu'] == [cat('news/campus')]
+    assert len(changes) == 1
+
+    # The homepage now owns 'news', so dropping it there drops the target
+    pages[HOME] = {'categories': []}
+    scheduler.crawl(scheduler.targets[HOME], now=2)
+    assert set(scheduler.targets) == {HOME, cat('news/campus')['url']}
+
+
+def test_missing_seeded_category_page_is_dropped(tmp_path):
+    campus = cat('news/campus')['url']
+    scheduler, changes = make_scheduler(tmp_path, {campus: 404})
+    scheduler.sync_targets(seed={'kcsu': {'site': 'KCSU', 'url': HOME, 'categories': [cat('news/campus')]}},
+                           now=0)
+
+    assert scheduler.crawl(scheduler.targets[campus], now=1)
+
+    assert set(scheduler.targets) == {HOME}
+    assert scheduler.seeded['kcsu'] == []
+    assert scheduler.results['kcsu']['categories'] == []
+    assert len(changes) == 1
+
+
+def test_category_pages_track_their_articles(tmp_path):
+    news = cat('news')['url']
+    pages = {HOME: {'categories': [cat('news')]}, news: {'articles': ['/a', '/b']}}
+    scheduler, _ = make_scheduler(tmp_path, pages)
+    scheduler.sync_targets(now=0)
+    scheduler.crawl(scheduler.targets[HOME], now=0)
+
+    assert not scheduler.crawl(scheduler.targets[news], now=1)
+    pages[news] = {'articles': ['/b', '/a']}
+    assert not scheduler.crawl(scheduler.targets[news], now=2)
+    pages[news] = {'articles': ['/c', '/a', '/b']}
+    assert scheduler.crawl(scheduler.targets[news], now=3)
+
+
+def test_load_clamps_saved_intervals_to_new_bounds(tmp_path):
+    scheduler, _ = make_scheduler(tmp_path, {}, initial_interval=1000)
+    scheduler.sync_targets(now=0)
+    scheduler.targets[HOME]['next_due'] = time.time() + 1000
+    scheduler.save()
+
+    reloaded = RecrawlScheduler(FakeToolkit({}), tmp_path / 'state.json', min_interval=10, max_interval=50,
+                                jitter=0)
+    reloaded.load()
+    assert reloaded.targets[HOME]['interval'] == 50
+    assert reloaded.targets[HOME]['next_due'] <= time.time() + 50
+
+
+def test_rejects_inverted_bounds(tmp_path):
+    with pytest.raises(ValueError):
+        RecrawlScheduler(FakeToolkit({}), tmp_path / 'state.json', min_interval=100, max_interval=10)
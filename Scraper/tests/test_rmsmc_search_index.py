@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from rmsmc_search_index import SearchIndex, normalize, trigrams
+
+STORE = {
+    'collegian': {'categories': [
+        {'name': 'Sports', 'slug': 'sports', 'url': 'https://collegian.com/category/sports/'},
+        {'name': 'Sports Features', 'slug': 'sports/features', 'url': 'https://collegian.com/category/sports/features/'},
+        {'name': 'Spotlight', 'slug': 'spotlight', 'url': 'https://collegian.com/category/spotlight/'},
+        {'name': 'News', 'slug': 'news', 'url': 'https://collegian.com/category/news/'},
+    ]},
+    'kcsu': {'categories': [
+        {'name': 'Sports', 'slug': 'sports', 'url': 'https://kcsufm.com/category/sports/'},
+        {'name': 'Music', 'slug': 'music', 'url': 'https://kcsufm.com/category/music/'},
+    ]},
+}
+
+ARTICLES = [
+    {'site': 'collegian', 'url': 'https://collegian.com/2024/01/rams-win/', 'title': 'Sports roundup: Rams win'},
+]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add_categories(STORE)
+    index.add_articles(ARTICLES)
+    return index
+
+
+def names(results):
+    return [(r['site'], r['name']) for r in results]
+
+
+def test_trigrams_leave_a_prefix_open():
+    assert normalize('Arts & Culture') == ['arts', 'culture']
+    assert trigrams(['spo'], partial_last=True) < trigrams(['sports'])
+    assert not trigrams(['spo']) < trigrams(['sports'])
+
+
+def test_exact_names_rank_first(index):
+    results = index.search('sports', limit=4)
+    assert {r['name'] for r in results[:2]} == {'Sports'}
+    assert results[2]['name'] == 'Sports Features'
+    assert results[0]['score'] > results[2]['score']
+
+
+def test_prefix_query_matches_longer_names(index):
+    assert [r['name'] for r in index.search('spo', site='collegian')] == ['Sports', 'Spotlight', 'Sports Features',
+                                                                           'Sports roundup: Rams win']
+    # A finished word is not a prefix any more; Spotlight only comes back through the fuzzy fallback
+    assert index.search('sports ', site='collegian')[-1]['name'] == 'Spotlight'
+
+
+def test_typos_fall_back_to_partial_overlap(index):
+    assert names(index.search('sprots', site='kcsu')) == [('kcsu', 'Sports')]
+    assert index.search('mosic')[0]['name'] == 'Music'
+    assert index.search('zzzz') == []
+
+
+def test_site_and_kind_filters(index):
+    assert {r['site'] for r in index.search('sports', site='kcsu')} == {'kcsu'}
+    assert [r['kind'] for r in index.search('sports', kind='article')] == ['article']
+    assert index.search('sports', site='unknown') == []
+
+
+def test_replace_and_remove(index):
+    url = 'https://kcsufm.com/category/music/'
+    index.add(url, 'kcsu', 'category', 'Music Reviews', 'music', url)
+    assert index.search('music')[0]['name'] == 'Music Reviews'
+    assert len(index) == 7
+
+    assert index.remove(url)
+    assert not index.remove(url)
+    assert index.search('music') == []
+
+
+def test_bounded_walk_matches_full_scoring():
+    rng = random.Random(7)
+    words = ['sports', 'spotlight', 'spokes', 'news', 'music', 'arts', 'sport', 'support', 'reports']
+    full = SearchIndex()
+    bounded = SearchIndex(candidate_limit=1)
+    for i in range(400):
+        name = ' '.join(rng.sample(words, rng.randint(1, 3)))
+        kind = rng.choice(['category', 'article'])
+        for index in (full, bounded):
+            index.add(f'https://example.com/{i}', 'site', kind, name)
+
+    for query in ['sports', 'spo', 'sport news', 'rep']:
+        expected = [r['score'] for r in full.search(query, limit=5)]
+        assert [r['score'] for r in bounded.search(query, limit=5)] == expected
+
+
+def test_journal_replays_and_save_compacts(tmp_path):
+    index = SearchIndex(tmp_path / 'search')
+    index.add_categories(STORE)
+    index.remove('https://kcsufm.com/category/music/')
+    index.flush()
+
+    reopened = SearchIndex(tmp_path / 'search')
+    assert len(reopened) == 5
+    assert reopened.search('music') == []
+    reopened.save()
+    assert not (tmp_path / 'search' / 'journal.jsonl').exists()
+    index.close()
+
+    compacted = SearchIndex(tmp_path / 'search')
+    assert len(compacted.docs) == 5
+    assert names(compacted.search('sprots', site='kcsu')) == [('kcsu', 'Sports')]
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / 'index.bin').write_bytes(b'NOTINDEX' + b'\0' * 16)
+    with pytest.raises(ValueError):
+        SearchIndex(tmp_path)
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from rmsmc_snapshot_archive import INDEX_RECORD, ZSTD_AVAILABLE, SnapshotArchive, is_archive
+
+pytestmark = pytest.mark.skipif(not ZSTD_AVAILABLE, reason='requires zstandard')
+
+
+def page(i: int) -> str:
+    rng = random.Random(i)
+    links = ''.join(f'<li><a href="/category/c{rng.randrange(500)}/">Category {rng.randrange(500)}</a></li>'
+                    for _ in range(40))
+    return f'<html><head><title>Snapshot {i}</title></head><body><nav><ul>{links}</ul></nav></body></html>'
+
+
+def test_round_trip_and_random_access(tmp_path):
+    archive = SnapshotArchive(tmp_path / 'snapshots')
+    assert is_archive(tmp_path / 'snapshots') and not is_archive(tmp_path)
+
+    entries = [archive.append('kcsu', page(i), captured_at=1000 + i) for i in range(5)]
+    assert [e.position for e in entries] == list(range(5))
+
+    reopened = SnapshotArchive(tmp_path / 'snapshots', create=False)
+    assert reopened.sites() == ['kcsu']
+    assert reopened.read(reopened.entries('kcsu')[3]).decode('utf-8') == page(3)
+    assert reopened.latest('kcsu').captured_at == 1004
+    assert [e.captured_at for e, _ in reopened.iter_snapshots('kcsu', since=1003)] == [1003, 1004]
+    assert reopened.latest('collegian') is None
+
+
+def test_missing_archive_is_not_created_on_read(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SnapshotArchive(tmp_path / 'missing', create=False)
+    assert not (tmp_path / 'missing').exists()
+
+
+def test_unchanged_page_reuses_the_previous_frame(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    first = archive.append('kcsu', page(0), captured_at=1)
+    second = archive.append('kcsu', page(0).encode('utf-8'), captured_at=2)
+
+    assert (second.segment, second.offset) == (first.segment, first.offset)
+    assert archive.stats()['kcsu']['stored_bytes'] == first.length
+    assert archive.read(second).decode('utf-8') == page(0)
+
+
+def test_segments_roll_over_at_the_size_limit(tmp_path):
+    archive = SnapshotArchive(tmp_path, max_segment_bytes=2000, level=1)
+    entries = [archive.append('kcsu', page(i)) for i in range(6)]
+
+    assert entries[-1].segment > 1
+    assert all(archive.read(e).decode('utf-8') == page(e.position) for e in archive.entries('kcsu'))
+
+
+def test_dictionary_is_trained_after_enough_samples(tmp_path):
+    archive = SnapshotArchive(tmp_path, dict_samples=8, dict_size=4096)
+    for i in range(40):
+        archive.append('kcsu', page(i))
+
+    assert archive.current_dict_id('kcsu') == 1
+    entries = archive.entries('kcsu')
+    assert entries[0].dict_id == 0 and entries[-1].dict_id == 1
+    assert archive.read(entries[0]).decode('utf-8') == page(0)
+    assert archive.read(entries[-1]).decode('utf-8') == page(39)
+
+
+def test_torn_index_record_is_ignored_and_overwritten(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    archive.append('kcsu', page(0))
+    with open(tmp_path / 'kcsu' / 'index.bin', 'ab') as f:
+        f.write(b'\0' * (INDEX_RECORD.size // 2))
+
+    assert len(archive.entries('kcsu')) == 1
+    entry = archive.append('kcsu', page(1))
+    assert entry.position == 1
+    assert [archive.read(e).decode('utf-8') for e in archive.entries('kcsu')] == [page(0), page(1)]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Fake GA4 Data API
+A local stand-in for analyticsdata.googleapis.com that returns deterministic
+runReport responses, for exercising the proxy and report runner offline
+
+Usage:
+    python3 fake_ga4_api.py --port 9090 [--latency 0.2] [--realtime-step 5]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+RUN_REPORT_PATH = re.compile(r'^/v1beta/properties/(\d+):(runReport|runRealtimeReport)$')
+
+DIMENSION_VALUES = {
+    'deviceCategory': ['desktop', 'mobile', 'tablet'],
+    'sessionDefaultChannelGroup': ['Direct', 'Organic Search', 'Organic Social', 'Referral'],
+    'pagePath': ['/', '/category/news/', '/category/sports/', '/category/podcast/', '/about-us/'],
+}
+
+RATIO_METRICS = {'engagementRate', 'bounceRate'}
+
+
+def _number(*parts) -> int:
+    digest = hashlib.md5('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+    return int(digest[:8], 16)
+
+
+def metric_value(name: str, *parts) -> str:
+    """Deterministic, plausible value for a metric"""
+    n = _number(name, *parts)
+    if name in RATIO_METRICS:
+        return str(round(0.3 + (n % 500) / 1000, 4))
+    if name == 'averageSessionDuration':
+        return str(round(30 + (n % 300) + (n % 97) / 100, 2))
+    return str(50 + n % 5000)
+
+
+def _days(date_range: Dict) -> List[str]:
+    start = date.fromisoformat(date_range['startDate'])
+    end = date.fromisoformat(date_range['endDate'])
+    return [(start + timedelta(days=i)).strftime('%Y%m%d') for i in range((end - start).days + 1)]
+
+
+def run_report(property_id: str, body: Dict) -> Dict:
+    """Build a runReport-shaped response for a request body"""
+    dimensions = [d['name'] for d in body.get('dimensions', [])]
+    metrics = [m['name'] for m in body.get('metrics', [])]
+    date_ranges = body.get('dateRanges', [])
+    multi_range = len(date_ranges) > 1
+    filter_key = json.dumps(body.get('dimensionFilter'), sort_keys=True)
+
+    rows = []
+    for index, date_range in enumerate(date_ranges):
+        range_name = date_range.get('name') or f"date_range_{index}"
+        combos = [[]]
+        for dimension in dimensions:
+            values = _days(date_range) if dimension == 'date' else DIMENSION_VALUES.get(dimension, ['(other)'])
+            combos = [combo + [value] for combo in combos for value in values]
+
+        for combo in combos:
+            key_values = combo if 'date' in dimensions else combo + [date_range['startDate'], date_range['endDate']]
+            dimension_values = combo + ([range_name] if multi_range else [])
+            rows.append({
+                'dimensionValues': [{'value': v} for v in dimension_values],
+                'metricValues': [
+                    {'value': metric_value(m, property_id, filter_key, *key_values)} for m in metrics
+                ]
+            })
+
+    dimension_headers = [{'name': d} for d in dimensions] + ([{'name': 'dateRange'}] if multi_range else [])
+    response = {
+        'dimensionHeaders': dimension_headers,
+        'metricHeaders': [
+            {'name': m, 'type': 'TYPE_FLOAT' if m in RATIO_METRICS else 'TYPE_INTEGER'} for m in metrics
+        ],
+        'rowCount': len(rows),
+        'kind': 'analyticsData#runReport'
+    }
+    if rows:
+        response['rows'] = rows
+    return response
+
+
+def run_realtime_report(property_id: str, body: Dict, step: float = 5.0) -> Dict:
+    """Realtime response whose values change every `step` seconds"""
+    dimensions = [d['name'] for d in body.get('dimensions', [])]
+    metrics = [m['name'] for m in body.get('metrics', [])]
+    tick = int(time.time() // step) if step > 0 else 0
+
+    values = DIMENSION_VALUES.get(dimensions[0], ['(other)']) if dimensions else [None]
+    rows = []
+    for value in values:
+        rows.append({
+            'dimensionValues': [{'value': value}] if value is not None else [],
+            'metricValues': [{'value': str(_number(m, property_id, value, tick) % 40)} for m in metrics]
+        })
+
+    response = {
+        'dimensionHeaders': [{'name': d} for d in dimensions],
+        'metricHeaders': [{'name': m, 'type': 'TYPE_INTEGER'} for m in metrics],
+        'rows': rows,
+        'rowCount': len(rows),
+        'kind': 'analyticsData#runRealtimeReport'
+    }
+    if 'TOTAL' in body.get('metricAggregations', []):
+        response['totals'] = [{
+            'dimensionValues': [{'value': 'RESERVED_TOTAL'}] * len(dimensions),
+            'metricValues': [
+                {'value': str(sum(int(r['metricValues'][i]['value']) for r in rows))} for i in range(len(metrics))
+            ]
+        }]
+    return response
+
+
+class FakeGA4Handler(BaseHTTPRequestHandler):
+    """Serves runReport and runRealtimeReport for any property"""
+
+    latency = 0.0
+    realtime_step = 5.0
+    calls = None  # {(property, method): count}, set by make_server
+
+    def do_POST(self):
+        match = RUN_REPORT_PATH.match(self.path)
+        if not match:
+            self._send(404, {'error': {'code': 404, 'message': 'Not found'}})
+            return
+        if not self.headers.get('Authorization'):
+            self._send(401, {'error': {'code': 401, 'message': 'Request is missing required authentication credential.'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self.latency:
+            time.sleep(self.latency)
+        property_id, method = match.groups()
+        self.calls[(property_id, method)] = self.calls.get((property_id, method), 0) + 1
+        if method == 'runRealtimeReport':
+            self._send(200, run_realtime_report(property_id, body, self.realtime_step))
+        else:
+            self._send(200, run_report(property_id, body))
+
+    def _send(self, status: int, payload: Dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = '127.0.0.1', port: int = 9090, latency: float = 0.0,
+                realtime_step: float = 5.0) -> ThreadingHTTPServer:
+    """Create a fake API server; port 0 picks a free port. Call counts are on server.calls"""
+    calls = {}
+    handler = type('BoundFakeGA4Handler', (FakeGA4Handler,),
+                   {'latency': latency, 'realtime_step': realtime_step, 'calls': calls})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.calls = calls
+    return server
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='Local fake GA4 Data API')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=9090, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to delay each response')
+    parser.add_argument('--realtime-step', type=float, default=5.0, help='Seconds between realtime value changes')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency, args.realtime_step)
+    print(f"🧪 Fake GA4 API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
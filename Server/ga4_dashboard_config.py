@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+GA4 Dashboard Config
+Reads PROPERTIES, METRICS and the category property map from app.js so Python
+services use exactly the dashboard's definitions
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APP_JS = REPO_ROOT / 'app.js'
+CATEGORIES_JSON = REPO_ROOT / 'Scraper' / 'rmsmc_categories.json'
+
+# Strings and comments are matched first so keys or commas inside them are left alone
+_JS_TOKEN = re.compile(
+    r"""'(?P<single>(?:[^'\\]|\\.)*)'"""
+    r'''|"(?P<double>(?:[^"\\]|\\.)*)"'''
+    r'|//[^\n]*|/\*.*?\*/'
+    r'|(?P<key>[A-Za-z_$][\w$]*)(?=\s*:)',
+    re.S
+)
+
+
+def extract_js_literal(source: str, name: str) -> str:
+    """Return the source text of the array/object literal assigned to `name`"""
+    match = re.search(rf'\b(?:const|let|var)\s+{re.escape(name)}\s*=\s*([\[{{])', source)
+    if not match:
+        raise ValueError(f"{name} not found in app.js")
+
+    start = match.start(1)
+    depth = 0
+    quote = None
+    i = start
+    while i < len(source):
+        ch = source[i]
+        if quote:
+            if ch == '\\':
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            depth -= 1
+            if depth == 0:
+                return source[start:i + 1]
+        i += 1
+    raise ValueError(f"Unterminated literal for {name}")
+
+
+def js_literal_to_python(literal: str):
+    """Convert a plain JS object/array literal (no expressions) to Python data"""
+    def replace(match):
+        if match.group('single') is not None:
+            return json.dumps(match.group('single').replace("\\'", "'"))
+        if match.group('double') is not None:
+            return match.group(0)
+        if match.group('key') is not None:
+            return json.dumps(match.group('key'))
+        return ''  # Comment
+
+    converted = _JS_TOKEN.sub(replace, literal)
+    converted = re.sub(r',(\s*[\]}])', r'\1', converted)
+    return json.loads(converted)
+
+
+def _load(name: str, app_js: Path = APP_JS):
+    with open(app_js, 'r', encoding='utf-8') as f:
+        return js_literal_to_python(extract_js_literal(f.read(), name))
+
+
+def load_properties(app_js: Path = APP_JS) -> List[Dict]:
+    """Return the dashboard's PROPERTIES list: [{'id', 'name', 'logo'}, ...]"""
+    return _load('PROPERTIES', app_js)
+
+
+def load_metrics(app_js: Path = APP_JS) -> List[Dict]:
+    """Return the dashboard's METRICS list: [{'name': ...}, ...]"""
+    return _load('METRICS', app_js)
+
+
+def load_category_property_map(app_js: Path = APP_JS) -> Dict[str, str]:
+    """Return the scraped-category site key -> property ID map"""
+    return _load('propertyMap', app_js)
+
+
+def load_property_categories(categories_json: Path = CATEGORIES_JSON,
+                             app_js: Path = APP_JS) -> Dict[str, List[Dict]]:
+    """
+    Return {property_id: [{'id', 'name', 'pattern'}]} the way
+    loadScrapedCategories builds PROPERTY_CATEGORIES in the dashboard
+    """
+    property_map = load_category_property_map(app_js)
+    with open(categories_json, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    categories = {}
+    for site_key, site_data in data.items():
+        property_id = property_map.get(site_key)
+        if not property_id or not site_data.get('categories'):
+            continue
+        categories[property_id] = [
+            {
+                'id': cat['slug'].replace('/', '_'),
+                'name': cat['name'],
+                'pattern': cat['url'].replace(site_data['url'], '')
+            }
+            for cat in site_data['categories']
+        ]
+    return categories
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+GA4 Series Downsampling
+Largest-Triangle-Three-Buckets downsampling of daily overview series, sized
+to the chart's pixel width, with results cached per series and resolution
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """
+    Downsample (x, y) points sorted by x to `threshold` points, keeping the
+    first and last point and, from each bucket in between, the point forming
+    the largest triangle with its neighbours' selections. Peaks and dips
+    survive where plain averaging or striding would flatten them.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the triangle's third vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_points = points[next_start:next_end] or points[-1:]
+        avg_x = sum(p[0] for p in next_points) / len(next_points)
+        avg_y = sum(p[1] for p in next_points) / len(next_points)
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def rows_to_points(response: Dict) -> List[Point]:
+    """Turn a date-dimension runReport response into sorted (epoch ms, value) points"""
+    points = []
+    for row in response.get('rows', []):
+        day = datetime.strptime(row['dimensionValues'][0]['value'], '%Y%m%d').replace(tzinfo=timezone.utc)
+        points.append((day.timestamp() * 1000, float(row['metricValues'][0]['value'] or 0)))
+    points.sort()
+    return points
+
+
+class SeriesCache:
+    """Thread-safe LRU of downsampled series; each entry expires with the report it came from"""
+
+    def __init__(self, max_entries: int = 500):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, expires: float):
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class OverviewSeries:
+    """
+    Serves the overview chart's per-property daily series, downsampled to the
+    requested pixel width. Full-resolution series come from the proxy's
+    report cache; zooming in requests a narrower window at the same width, so
+    detail is refined progressively instead of shipping every day up front.
+    Properties are fetched in parallel, so an overview costs about one
+    upstream round trip rather than one per property.
+    """
+
+    WIDTH_STEP = 50  # Round widths so small resizes share cache entries
+
+    def __init__(self, proxy, pixels_per_point: float = 2.0, max_entries: int = 500, max_workers: int = 8):
+        self.proxy = proxy
+        self.pixels_per_point = pixels_per_point
+        self.cache = SeriesCache(max_entries)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='overview')
+
+    def threshold(self, width: int) -> int:
+        width = max(self.WIDTH_STEP, -(-int(width) // self.WIDTH_STEP) * self.WIDTH_STEP)
+        return max(3, int(width / self.pixels_per_point))
+
+    def series(self, property_id: str, start_date: str, end_date: str, width: int, authorization: str,
+               metric: str = 'screenPageViews', window: Optional[Tuple[float, float]] = None) -> Tuple[int, Dict]:
+        """Return (status, {'property', 'points', 'raw_points'}) for one property"""
+        body = {
+            'dateRanges': [{'startDate': start_date, 'endDate': end_date}],
+            'metrics': [{'name': metric}],
+            'dimensions': [{'name': 'date'}],
+            'orderBys': [{'dimension': {'dimensionName': 'date'}}],
+            'limit': 100000
+        }
+        # The report cache's key: it includes the token, so users never share results
+        series_key = self.proxy.cache.key(authorization, property_id, body)
+        threshold = self.threshold(width)
+        cache_key = (series_key, tuple(window) if window else None, threshold)
+
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return 200, cached
+
+        status, payload = self.proxy.run_report(property_id, body, authorization, 'overview')
+        if status != 200:
+            return status, json.loads(payload or b'{}')
+
+        points = rows_to_points(json.loads(payload))
+        if window:
+            points = [p for p in points if window[0] <= p[0] <= window[1]]
+
+        result = {
+            'property': property_id,
+            'points': [[x, y] for x, y in lttb(points, threshold)],
+            'raw_points': len(points)
+        }
+        # Never outlive the report: once it expires (or if it was never cached,
+        # e.g. --cache-ttl 0) the series must be rebuilt from fresh data
+        expires = self.proxy.cache.expires_at(series_key)
+        if expires is not None:
+            self.cache.put(cache_key, result, expires)
+        return 200, result
+
+    def overview(self, request: Dict, authorization: str) -> Tuple[int, Dict]:
+        """Handle an /overview/series request body for several properties"""
+        window = request.get('window')
+        window = (float(window['from']), float(window['to'])) if window else None
+        futures = [
+            (str(property_id), self.executor.submit(
+                self.series, str(property_id), request['startDate'], request['endDate'],
+                int(request.get('width', 800)), authorization, request.get('metric', 'screenPageViews'), window
+            ))
+            for property_id in request.get('properties', [])
+        ]
+        results = []
+        for property_id, future in futures:
+            status, result = future.result()
+            if status == 200:
+                results.append(result)
+            else:
+                results.append({'property': str(property_id), 'error': result.get('error', {'code': status})})
+        return 200, {'series': results, 'threshold': self.threshold(int(request.get('width', 800)))}
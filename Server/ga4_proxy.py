@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+GA4 Reporting Proxy
+Forwards dashboard runReport calls to the GA4 Data API with response caching,
+per-report tracing spans and latency histograms
+
+Usage:
+    python3 ga4_proxy.py --port 8080 [--cache-ttl 300] [--span-log spans.jsonl] [--realtime-interval 10]
+
+Endpoints:
+    POST /v1beta/properties/{id}:runReport  - Proxied GA4 report (Authorization forwarded)
+    POST /overview/series                   - Overview series downsampled (LTTB) to a pixel width
+    GET  /realtime/stream?property=ID&...   - Server-Sent Events: realtime snapshot, then deltas
+    GET  /metrics                           - Prometheus latency histograms
+    GET  /debug/spans                       - Most recent spans as JSON
+    GET  /healthz                           - Liveness check
+"""
+
+import argparse
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from ga4_downsample import OverviewSeries
+from ga4_realtime import RealtimeHub
+from ga4_tracing import Tracer
+
+GA4_API_BASE = 'https://analyticsdata.googleapis.com'
+RUN_REPORT_PATH = re.compile(r'^/v1beta/properties/(\d+):runReport$')
+# Kinds a client may name in X-Report-Kind; anything else is inferred, so labels stay bounded
+REPORT_KINDS = {'main', 'device', 'channel', 'engagement', 'summary', 'overview'}
+
+
+def infer_report_kind(body: Dict) -> str:
+    """Classify a runReport body as one of the dashboard's report kinds"""
+    dimensions = [d.get('name') for d in body.get('dimensions', [])]
+    metrics = [m.get('name') for m in body.get('metrics', [])]
+
+    if 'deviceCategory' in dimensions:
+        return 'device'
+    if 'sessionDefaultChannelGroup' in dimensions:
+        return 'channel'
+    if 'pagePath' in dimensions:
+        return 'engagement'
+    if 'date' in dimensions:
+        return 'overview' if metrics == ['screenPageViews'] else 'main'
+    if not dimensions:
+        return 'summary'
+    return 'other'
+
+
+def date_span_days(body: Dict) -> int:
+    """Total number of days covered by a request's date ranges"""
+    total = 0
+    for date_range in body.get('dateRanges', []):
+        try:
+            start = date.fromisoformat(date_range['startDate'])
+            end = date.fromisoformat(date_range['endDate'])
+        except (KeyError, ValueError):
+            continue
+        total += (end - start).days + 1
+    return total
+
+
+class ReportCache:
+    """Thread-safe TTL cache of upstream report responses"""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(authorization: str, property_id: str, body: Dict) -> str:
+        # The token is part of the key so one user never sees another's cached data
+        raw = json.dumps([authorization, property_id, body], sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            return payload
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Monotonic expiry time of a live entry, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry and entry[0] >= time.monotonic() else None
+
+    def put(self, key: str, payload: bytes):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + self.ttl, payload)
+
+
+class GA4Proxy:
+    """Runs GA4 reports upstream, with caching and tracing"""
+
+    def __init__(self, upstream: str = GA4_API_BASE, cache_ttl: float = 300,
+                 timeout: float = 60, span_log: Optional[str] = None,
+                 realtime_interval: float = 10):
+        self.upstream = upstream.rstrip('/')
+        self.timeout = timeout
+        self.cache = ReportCache(ttl=cache_ttl)
+        self.tracer = Tracer(span_log=span_log)
+        self.realtime = RealtimeHub(self.upstream, interval=realtime_interval, tracer=self.tracer)
+        self.overview = OverviewSeries(self)
+
+    def run_report(self, property_id: str, body: Dict, authorization: str,
+                   report_kind: Optional[str] = None) -> Tuple[int, bytes]:
+        """Return (status, response body) for a runReport call"""
+        cache_key = ReportCache.key(authorization, property_id, body)
+
+        with self.tracer.span(
+            'ga4.runReport',
+            property=property_id,
+            report_kind=report_kind if report_kind in REPORT_KINDS else infer_report_kind(body),
+            date_span_days=date_span_days(body)
+        ) as span:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                span.set_attribute('cache', 'hit')
+                span.set_attribute('http_status', 200)
+                return 200, cached
+
+            span.set_attribute('cache', 'miss')
+            status, payload = self._fetch_upstream(property_id, body, authorization)
+            span.set_attribute('http_status', status)
+            if status == 200:
+                self.cache.put(cache_key, payload)
+            else:
+                span.status = 'error'
+            return status, payload
+
+    def _fetch_upstream(self, property_id: str, body: Dict, authorization: str) -> Tuple[int, bytes]:
+        request = urllib.request.Request(
+            f"{self.upstream}/v1beta/properties/{property_id}:runReport",
+            data=json.dumps(body).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Authorization': authorization},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+        except (urllib.error.URLError, OSError) as e:
+            return 502, _error_body(502, f"Upstream request failed: {e}")
+
+
+def _error_body(code: int, message: str) -> bytes:
+    """GA4-style error payload so the dashboard's error handling applies"""
+    return json.dumps({'error': {'code': code, 'message': message}}).encode('utf-8')
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for GA4Proxy"""
+
+    proxy = None  # Set by make_server
+    keepalive_seconds = 15
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._send_cors_headers()
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send(200, self.proxy.tracer.to_prometheus().encode('utf-8'),
+                       'text/plain; version=0.0.4')
+        elif self.path.startswith('/debug/spans'):
+            self._send(200, json.dumps(self.proxy.tracer.recent_spans()).encode('utf-8'))
+        elif self.path == '/healthz':
+            self._send(200, b'{"status": "ok"}')
+        elif self.path.startswith('/realtime/stream'):
+            self._stream_realtime()
+        else:
+            self._send(404, _error_body(404, 'Not found'))
+
+    def do_POST(self):
+        match = RUN_REPORT_PATH.match(self.path)
+        if not match and self.path != '/overview/series':
+            self._send(404, _error_body(404, 'Not found'))
+            return
+
+        authorization = self.headers.get('Authorization', '')
+        if not authorization:
+            self._send(401, _error_body(401, 'Missing Authorization header'))
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError):
+            self._send(400, _error_body(400, 'Request body must be JSON'))
+            return
+
+        if not match:
+            try:
+                status, result = self.proxy.overview.overview(body, authorization)
+            except (KeyError, TypeError, ValueError) as e:
+                self._send(400, _error_body(400, f"Invalid overview request: {e}"))
+                return
+            self._send(status, json.dumps(result, separators=(',', ':')).encode('utf-8'))
+            return
+
+        status, payload = self.proxy.run_report(
+            match.group(1), body, authorization, self.headers.get('X-Report-Kind')
+        )
+        self._send(status, payload)
+
+    def _stream_realtime(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        property_ids = [p for p in query.get('property', []) if p.isdigit()]
+        # EventSource cannot set headers, so the token may also come as ?access_token=
+        authorization = self.headers.get('Authorization') or (
+            f"Bearer {query['access_token'][0]}" if query.get('access_token') else ''
+        )
+        if not property_ids:
+            self._send(400, _error_body(400, 'At least one numeric property parameter is required'))
+            return
+        if not authorization:
+            self._send(401, _error_body(401, 'Missing Authorization header or access_token'))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self._send_cors_headers()
+        self.end_headers()
+        self.close_connection = True
+
+        subscriber = self.proxy.realtime.subscribe(property_ids, authorization)
+        try:
+            self.wfile.write(f"retry: {int(self.proxy.realtime.interval * 1000)}\n\n".encode('utf-8'))
+            while True:
+                try:
+                    event, data = subscriber.events.get(timeout=self.keepalive_seconds)
+                except queue.Empty:
+                    if subscriber.closed.is_set():
+                        break
+                    self.wfile.write(b': keepalive\n\n')
+                else:
+                    self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.proxy.realtime.unsubscribe(subscriber)
+
+    def _send(self, status: int, payload: bytes, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self._send_cors_headers()
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Authorization, Content-Type, X-Report-Kind')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(proxy: GA4Proxy, host: str = '127.0.0.1', port: int = 8080) -> ThreadingHTTPServer:
+    """Create a threaded HTTP server bound to the given proxy"""
+    handler = type('BoundProxyRequestHandler', (ProxyRequestHandler,), {'proxy': proxy})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description='GA4 reporting proxy with tracing')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--upstream', default=GA4_API_BASE, help='GA4 Data API base URL')
+    parser.add_argument('--cache-ttl', type=float, default=300, help='Seconds to cache report responses (0 disables)')
+    parser.add_argument('--span-log', help='Append finished spans to this JSONL file')
+    parser.add_argument('--realtime-interval', type=float, default=10,
+                        help='Seconds between shared realtime polls per property')
+    args = parser.parse_args()
+
+    proxy = GA4Proxy(upstream=args.upstream, cache_ttl=args.cache_ttl, span_log=args.span_log,
+                     realtime_interval=args.realtime_interval)
+    server = make_server(proxy, args.host, args.port)
+
+    print(f"🚀 GA4 proxy listening on http://{args.host}:{args.port}")
+    print(f"   Upstream: {proxy.upstream}")
+    print(f"   Metrics:  http://{args.host}:{args.port}/metrics")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+GA4 Realtime Fan-out
+Polls the GA4 Realtime API once per property on a shared schedule and pushes
+only what changed to every subscribed dashboard, so upstream load does not
+grow with the number of viewers
+"""
+
+import hashlib
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+from ga4_tracing import Tracer
+
+REALTIME_REQUEST = {
+    'dimensions': [{'name': 'unifiedScreenName'}],
+    'metrics': [{'name': 'activeUsers'}, {'name': 'screenPageViews'}],
+    'metricAggregations': ['TOTAL'],
+    'orderBys': [{'metric': {'metricName': 'activeUsers'}, 'desc': True}],
+    'limit': 25
+}
+
+
+def snapshot_from_response(response: Dict) -> Dict:
+    """Reduce a runRealtimeReport response to {'totals': {...}, 'rows': {dimension: {...}}}"""
+    metrics = [h['name'] for h in response.get('metricHeaders', [])]
+    rows = {}
+    for row in response.get('rows', []):
+        key = ' | '.join(v['value'] for v in row.get('dimensionValues', []))
+        rows[key] = {name: float(v['value']) for name, v in zip(metrics, row['metricValues'])}
+
+    if response.get('totals'):
+        totals = {name: float(v['value']) for name, v in zip(metrics, response['totals'][0]['metricValues'])}
+    else:
+        totals = {name: sum(r[name] for r in rows.values()) for name in metrics}
+    return {'totals': totals, 'rows': rows}
+
+
+def diff_snapshots(old: Dict, new: Dict) -> Optional[Dict]:
+    """Changed totals, changed/added rows and removed row keys; None when nothing changed"""
+    totals = {k: v for k, v in new['totals'].items() if old['totals'].get(k) != v}
+    rows = {k: v for k, v in new['rows'].items() if old['rows'].get(k) != v}
+    removed = [k for k in old['rows'] if k not in new['rows']]
+    if not (totals or rows or removed):
+        return None
+    return {'totals': totals, 'rows': rows, 'removed': removed}
+
+
+class Subscriber:
+    """One SSE connection; events are queued for its handler thread to write"""
+
+    def __init__(self, authorization: str, max_pending: int = 100):
+        self.authorization = authorization
+        self.events = queue.Queue(maxsize=max_pending)
+        self.closed = threading.Event()
+
+    def push(self, event: str, data: Dict):
+        try:
+            self.events.put_nowait((event, data))
+        except queue.Full:
+            # A client this far behind has stalled; drop it rather than buffer forever
+            self.close()
+
+    def close(self):
+        self.closed.set()
+
+
+class PropertyFeed:
+    """Shared poller and latest snapshot for one property"""
+
+    def __init__(self, hub: 'RealtimeHub', property_id: str):
+        self.hub = hub
+        self.property_id = property_id
+        self.subscribers = []
+        self.snapshot = None
+        self.version = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, subscriber: Subscriber, snapshot: Optional[Dict]):
+        with self.lock:
+            if self.snapshot is None and snapshot is not None:
+                self.snapshot = snapshot
+                self.version += 1
+            self.subscribers.append(subscriber)
+            if self.snapshot is not None:
+                subscriber.push('snapshot', {'property': self.property_id, 'version': self.version,
+                                             **self.snapshot})
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._poll_loop, daemon=True,
+                                               name=f"realtime-{self.property_id}")
+                self.thread.start()
+
+    def remove(self, subscriber: Subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def _tokens(self) -> List[str]:
+        with self.lock:
+            self.subscribers = [s for s in self.subscribers if not s.closed.is_set()]
+            # Newest subscriber first: its token is the least likely to have expired
+            return list(dict.fromkeys(s.authorization for s in reversed(self.subscribers)))
+
+    def _poll_loop(self):
+        while True:
+            started = time.monotonic()
+            tokens = self._tokens()
+            if not tokens:
+                with self.lock:
+                    if not self.subscribers:
+                        # Nobody watching: stop, and don't serve a stale snapshot to the next viewer
+                        self.thread = None
+                        self.snapshot = None
+                        return
+                continue
+
+            for token in tokens:
+                status, payload = self.hub.fetch(self.property_id, token)
+                if status == 200:
+                    self._publish(snapshot_from_response(payload))
+                    break
+                if status in (401, 403):
+                    self._reject(token, status, payload)
+                    continue
+                break  # Upstream trouble; keep the last snapshot and try next round
+
+            time.sleep(max(0.0, self.hub.interval - (time.monotonic() - started)))
+
+    def _publish(self, snapshot: Dict):
+        with self.lock:
+            delta = diff_snapshots(self.snapshot, snapshot) if self.snapshot else None
+            if self.snapshot is not None and delta is None:
+                return
+            self.snapshot = snapshot
+            self.version += 1
+            if delta is None:
+                event, data = 'snapshot', snapshot
+            else:
+                event, data = 'delta', delta
+            data = {'property': self.property_id, 'version': self.version, **data}
+            for subscriber in self.subscribers:
+                subscriber.push(event, data)
+
+    def _reject(self, token: str, status: int, payload: Dict):
+        self.hub.forget_token(token, self.property_id)
+        message = payload.get('error', {}).get('message', 'Not authorized for this property')
+        with self.lock:
+            for subscriber in [s for s in self.subscribers if s.authorization == token]:
+                self.subscribers.remove(subscriber)
+                if status == 401:
+                    # An expired token is expired for every property; tell the client to refresh it
+                    # before reconnecting, then end the stream
+                    subscriber.push('unauthorized', {'property': self.property_id, 'message': message})
+                    subscriber.close()
+                else:
+                    subscriber.push('error', {'property': self.property_id, 'code': status, 'message': message})
+
+
+class RealtimeHub:
+    """
+    Realtime feeds for all properties.
+
+    A subscriber's token is checked once against the property (one upstream
+    call, remembered for verify_ttl seconds). After that, each property is
+    polled by a single thread using any current subscriber's token, however
+    many dashboards are watching.
+    """
+
+    def __init__(self, upstream: str, interval: float = 10, timeout: float = 30,
+                 tracer: Optional[Tracer] = None, verify_ttl: float = 300):
+        self.upstream = upstream.rstrip('/')
+        self.interval = interval
+        self.timeout = timeout
+        self.tracer = tracer or Tracer()
+        self.verify_ttl = verify_ttl
+        self.feeds = {}
+        self._verified = {}
+        self._next_prune = time.monotonic() + verify_ttl
+        self._lock = threading.Lock()
+
+    def fetch(self, property_id: str, authorization: str) -> Tuple[int, Dict]:
+        """One runRealtimeReport call; returns (status, parsed body)"""
+        request = urllib.request.Request(
+            f"{self.upstream}/v1beta/properties/{property_id}:runRealtimeReport",
+            data=json.dumps(REALTIME_REQUEST).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Authorization': authorization},
+            method='POST'
+        )
+        with self.tracer.span('ga4.runRealtimeReport', property=property_id,
+                              report_kind='realtime', cache='shared') as span:
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    status, body = response.status, response.read()
+            except urllib.error.HTTPError as e:
+                status, body = e.code, e.read()
+            except (urllib.error.URLError, OSError) as e:
+                status, body = 502, json.dumps({'error': {'code': 502, 'message': str(e)}}).encode('utf-8')
+            span.set_attribute('http_status', status)
+            if status != 200:
+                span.status = 'error'
+
+        try:
+            return status, json.loads(body or b'{}')
+        except json.JSONDecodeError:
+            return status, {}
+
+    @staticmethod
+    def _token_key(authorization: str, property_id: str) -> str:
+        return hashlib.sha256(f"{authorization}|{property_id}".encode('utf-8')).hexdigest()
+
+    def _remember_token(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            self._verified[key] = now + self.verify_ttl
+            if now >= self._next_prune:
+                # Tokens are short-lived, so without this every token ever seen would stay here
+                self._verified = {k: expires for k, expires in self._verified.items() if expires > now}
+                self._next_prune = now + self.verify_ttl
+
+    def forget_token(self, authorization: str, property_id: str):
+        with self._lock:
+            self._verified.pop(self._token_key(authorization, property_id), None)
+
+    def subscribe(self, property_ids: List[str], authorization: str) -> Subscriber:
+        """
+        Register a subscriber for the given properties. Properties its token
+        cannot read get an 'error' event instead of data; an expired token
+        gets a single 'unauthorized' event and the stream is closed.
+        """
+        subscriber = Subscriber(authorization)
+        accepted = 0
+        for property_id in property_ids:
+            key = self._token_key(authorization, property_id)
+            with self._lock:
+                verified = self._verified.get(key, 0) > time.monotonic()
+                feed = self.feeds.setdefault(property_id, PropertyFeed(self, property_id))
+
+            snapshot = None
+            if not verified:
+                status, payload = self.fetch(property_id, authorization)
+                if status != 200:
+                    message = payload.get('error', {}).get('message', 'Realtime request failed')
+                    if status == 401:
+                        # No other property will accept this token either
+                        subscriber.push('unauthorized', {'property': property_id, 'message': message})
+                        self.unsubscribe(subscriber)
+                        return subscriber
+                    subscriber.push('error', {'property': property_id, 'code': status, 'message': message})
+                    continue
+                self._remember_token(key)
+                snapshot = snapshot_from_response(payload)
+
+            feed.add(subscriber, snapshot)
+            accepted += 1
+
+        if not accepted:
+            subscriber.close()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscriber.close()
+        with self._lock:
+            feeds = list(self.feeds.values())
+        for feed in feeds:
+            feed.remove(subscriber)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            feeds = list(self.feeds.values())
+        return sum(len(feed.subscribers) for feed in feeds)
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+GA4 Headless Report Runner
+Runs the dashboard's report set for every property and period concurrently,
+without a browser, and writes the results as CSV or Parquet
+
+Usage:
+    python3 ga4_report_runner.py --period last_month --credentials service-account.json
+    python3 ga4_report_runner.py --period last_week --period last_month --format parquet
+    python3 ga4_report_runner.py --api-base http://127.0.0.1:9090 --access-token test
+
+Reports:
+    summary      - Totals per period (no dimensions)
+    daily_trend  - Daily METRICS
+    device       - Page views by device category
+    channel      - Sessions and events by default channel group
+    engagement   - Engagement duration by page path
+    category     - Per-category totals for properties with scraped categories
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ga4_dashboard_config import load_metrics, load_properties, load_property_categories
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import Request as GoogleAuthRequest
+    GOOGLE_AUTH_AVAILABLE = True
+except ImportError:
+    GOOGLE_AUTH_AVAILABLE = False
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+GA4_API_BASE = 'https://analyticsdata.googleapis.com'
+SCOPES = ['https://www.googleapis.com/auth/analytics.readonly']
+
+PERIODS = ['last_week', 'last_month', '7days', '30days', '90days', 'month', 'year', 'fiscal_year']
+REPORTS = ['summary', 'daily_trend', 'device', 'channel', 'engagement', 'category']
+
+CATEGORY_METRICS = [
+    {'name': 'screenPageViews'},
+    {'name': 'totalUsers'},
+    {'name': 'sessions'},
+    {'name': 'engagementRate'},
+    {'name': 'averageSessionDuration'}
+]
+
+
+def period_ranges(period: str, today: Optional[date] = None) -> List[Dict]:
+    """
+    Return [primary, comparison] date ranges for a period. Presets match the
+    dashboard's getDateRanges; last_week/last_month are completed calendar
+    periods (weeks start on Sunday, as in the overview chart).
+    """
+    today = today or date.today()
+
+    if period in ('7days', '30days', '90days'):
+        days = int(period[:-4])
+        primary_end = today
+        primary_start = today - timedelta(days=days)
+        comparison_end = primary_start
+        comparison_start = primary_start - timedelta(days=days)
+    elif period == 'month':
+        primary_end = today
+        primary_start = today.replace(day=1)
+        comparison_end = primary_start - timedelta(days=1)
+        comparison_start = comparison_end.replace(day=1)
+    elif period == 'year':
+        primary_end = today
+        primary_start = date(today.year, 1, 1)
+        comparison_end = primary_start - timedelta(days=1)
+        comparison_start = date(comparison_end.year, 1, 1)
+    elif period == 'fiscal_year':
+        # Last completed July 1 - June 30 fiscal year
+        fy_end_year = today.year - 1 if (today.month, today.day) < (6, 30) else today.year
+        primary_end = date(fy_end_year, 6, 30)
+        primary_start = date(fy_end_year - 1, 7, 1)
+        comparison_end = date(fy_end_year - 1, 6, 30)
+        comparison_start = date(fy_end_year - 2, 7, 1)
+    elif period == 'last_week':
+        this_week_start = today - timedelta(days=(today.weekday() + 1) % 7)
+        primary_start = this_week_start - timedelta(days=7)
+        primary_end = this_week_start - timedelta(days=1)
+        comparison_start = primary_start - timedelta(days=7)
+        comparison_end = primary_start - timedelta(days=1)
+    elif period == 'last_month':
+        primary_end = today.replace(day=1) - timedelta(days=1)
+        primary_start = primary_end.replace(day=1)
+        comparison_end = primary_start - timedelta(days=1)
+        comparison_start = comparison_end.replace(day=1)
+    else:
+        raise ValueError(f"Unknown period: {period}")
+
+    return [
+        {'startDate': primary_start.isoformat(), 'endDate': primary_end.isoformat(), 'name': 'primary_period'},
+        {'startDate': comparison_start.isoformat(), 'endDate': comparison_end.isoformat(), 'name': 'comparison_period'}
+    ]
+
+
+def report_request(report: str, date_ranges: List[Dict], metrics: List[Dict]) -> Dict:
+    """Build the runReport body for one of the dashboard's reports"""
+    if report == 'summary':
+        return {'dateRanges': date_ranges, 'metrics': metrics}
+    if report == 'daily_trend':
+        return {'dateRanges': date_ranges, 'metrics': metrics, 'dimensions': [{'name': 'date'}]}
+    if report == 'device':
+        return {'dateRanges': date_ranges, 'metrics': [{'name': 'screenPageViews'}],
+                'dimensions': [{'name': 'deviceCategory'}]}
+    if report == 'channel':
+        return {'dateRanges': date_ranges, 'metrics': [{'name': 'sessions'}, {'name': 'eventCount'}],
+                'dimensions': [{'name': 'sessionDefaultChannelGroup'}]}
+    if report == 'engagement':
+        return {'dateRanges': date_ranges, 'metrics': [{'name': 'userEngagementDuration'}],
+                'dimensions': [{'name': 'pagePath'}]}
+    raise ValueError(f"Unknown report: {report}")
+
+
+def category_request(date_ranges: List[Dict], category: Dict) -> Dict:
+    """Build the per-category request the dashboard's fetchCategoryData sends"""
+    return {
+        'dateRanges': date_ranges,
+        'metrics': CATEGORY_METRICS,
+        'dimensionFilter': {
+            'filter': {
+                'fieldName': 'pagePath',
+                'stringFilter': {'matchType': 'CONTAINS', 'value': category['pattern'], 'caseSensitive': False}
+            }
+        }
+    }
+
+
+def flatten_rows(response: Dict, context: Dict) -> List[Dict]:
+    """Turn a runReport response into flat records prefixed with context columns"""
+    dimension_names = [h['name'] for h in response.get('dimensionHeaders', [])]
+    metric_names = [h['name'] for h in response.get('metricHeaders', [])]
+    records = []
+    for row in response.get('rows', []):
+        record = dict(context)
+        for name, value in zip(dimension_names, row.get('dimensionValues', [])):
+            record[name] = value.get('value')
+        for name, value in zip(metric_names, row.get('metricValues', [])):
+            record[name] = float(value.get('value') or 0)
+        records.append(record)
+    return records
+
+
+class StaticTokenAuth:
+    """Bearer token supplied directly (local fake API, pre-minted tokens)"""
+
+    def __init__(self, token: str):
+        self.token = token
+
+    async def authorization(self) -> str:
+        return f"Bearer {self.token}"
+
+
+class ServiceAccountAuth:
+    """Service-account credentials, refreshed off the event loop when expired"""
+
+    def __init__(self, credentials_file: str):
+        if not GOOGLE_AUTH_AVAILABLE:
+            raise RuntimeError("Service-account auth requires 'google-auth' (pip install google-auth requests)")
+        self.credentials = service_account.Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
+        self._lock = asyncio.Lock()
+
+    async def authorization(self) -> str:
+        async with self._lock:
+            if not self.credentials.valid:
+                await asyncio.to_thread(self.credentials.refresh, GoogleAuthRequest())
+        return f"Bearer {self.credentials.token}"
+
+
+class ReportRunner:
+    """Runs GA4 reports concurrently over a bounded connection pool"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, auth, api_base: str = GA4_API_BASE, max_connections: int = 8,
+                 retries: int = 3, timeout: float = 60):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("The report runner requires 'aiohttp' (pip install aiohttp)")
+        self.auth = auth
+        self.api_base = api_base.rstrip('/')
+        self.max_connections = max_connections
+        self.retries = retries
+        self.timeout = timeout
+
+    async def run_report(self, session: 'aiohttp.ClientSession', property_id: str, body: Dict,
+                         slots: Optional[asyncio.Semaphore] = None) -> Dict:
+        """POST one runReport, retrying quota, server and connection errors with backoff"""
+        url = f"{self.api_base}/v1beta/properties/{property_id}:runReport"
+        slots = slots or asyncio.Semaphore(self.max_connections)
+        # Per request, so the clock starts once a slot is free rather than while queued behind other jobs
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        for attempt in range(self.retries + 1):
+            headers = {'Authorization': await self.auth.authorization()}
+            try:
+                async with slots, session.post(url, json=body, headers=headers, timeout=timeout) as response:
+                    if 200 <= response.status < 300:
+                        return await response.json(content_type=None)
+                    # Error bodies from proxies and load balancers are often HTML, not GA4 JSON
+                    text = await response.text(errors='replace')
+                    try:
+                        message = json.loads(text).get('error', {}).get('message', response.reason)
+                    except (ValueError, AttributeError):
+                        message = response.reason
+                    if response.status not in self.RETRY_STATUSES or attempt == self.retries:
+                        raise RuntimeError(f"GA4 error {response.status} for property {property_id}: {message}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise RuntimeError(f"GA4 request failed for property {property_id}: "
+                                       f"{e.__class__.__name__} {e}") from e
+            await asyncio.sleep(2 ** attempt)
+
+    async def run_pack(self, properties: List[Dict], periods: List[str], reports: List[str],
+                       metrics: List[Dict], property_categories: Optional[Dict] = None,
+                       today: Optional[date] = None) -> Tuple[Dict[str, List[Dict]], List[str]]:
+        """Run every report for every property and period in one concurrent pass; returns (tables, errors)"""
+        property_categories = property_categories or {}
+        jobs = []
+
+        for prop in properties:
+            for period in periods:
+                date_ranges = period_ranges(period, today)
+                context = {'property_id': prop['id'], 'property_name': prop['name'], 'period': period}
+                for report in reports:
+                    if report == 'category':
+                        for category in property_categories.get(prop['id'], []):
+                            jobs.append((report, prop['id'], category_request(date_ranges, category),
+                                         {**context, 'category': category['name']}))
+                    else:
+                        jobs.append((report, prop['id'], report_request(report, date_ranges, metrics), context))
+
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        slots = asyncio.Semaphore(self.max_connections)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            responses = await asyncio.gather(
+                *(self.run_report(session, property_id, body, slots) for _, property_id, body, _ in jobs),
+                return_exceptions=True
+            )
+
+        tables = {report: [] for report in reports}
+        errors = []
+        for (report, _, _, context), response in zip(jobs, responses):
+            if isinstance(response, Exception):
+                errors.append(f"{context['property_name']} {context['period']} {report}: {response}")
+                continue
+            tables[report].extend(flatten_rows(response, context))
+
+        return tables, errors
+
+
+def write_tables(tables: Dict[str, List[Dict]], output_dir: str, fmt: str = 'csv') -> List[Path]:
+    """Write one file per report; columns are the union of record keys in first-seen order"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    saved = []
+
+    for report, records in tables.items():
+        columns = list(dict.fromkeys(key for record in records for key in record))
+        if fmt == 'parquet':
+            output_path = output_dir / f"{report}.parquet"
+            table = pyarrow.table({column: [record.get(column) for record in records] for column in columns})
+            pyarrow.parquet.write_table(table, output_path)
+        else:
+            output_path = output_dir / f"{report}.csv"
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(records)
+        saved.append(output_path)
+
+    return saved
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(
+        description='Run the GA4 dashboard reports for all properties without a browser',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--period', action='append', choices=PERIODS,
+                        help='Period to report (repeatable, default: last_month)')
+    parser.add_argument('--report', action='append', choices=REPORTS,
+                        help='Report to run (repeatable, default: all)')
+    parser.add_argument('--property', action='append', help='Property ID to include (repeatable, default: all)')
+    parser.add_argument('--output-dir', default='./reports', help='Directory for output files')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='Output format')
+    parser.add_argument('--credentials', default=os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'),
+                        help='Service-account JSON key (default: $GOOGLE_APPLICATION_CREDENTIALS)')
+    parser.add_argument('--access-token', default=os.environ.get('GA4_ACCESS_TOKEN'),
+                        help='Use a bearer token instead of a service account')
+    parser.add_argument('--api-base', default=GA4_API_BASE, help='GA4 Data API base URL (e.g. a local fake)')
+    parser.add_argument('--max-connections', type=int, default=8, help='Connection pool size')
+    args = parser.parse_args()
+
+    if not AIOHTTP_AVAILABLE:
+        print("❌ The report runner requires 'aiohttp'")
+        print("   Install with: pip install aiohttp")
+        sys.exit(1)
+    if args.format == 'parquet' and not PARQUET_AVAILABLE:
+        print("❌ Parquet output requires 'pyarrow'")
+        print("   Install with: pip install pyarrow")
+        sys.exit(1)
+
+    if args.access_token:
+        auth = StaticTokenAuth(args.access_token)
+    elif args.credentials:
+        auth = ServiceAccountAuth(args.credentials)
+    else:
+        print("❌ Provide --credentials (service account) or --access-token")
+        sys.exit(1)
+
+    properties = load_properties()
+    if args.property:
+        properties = [p for p in properties if p['id'] in args.property]
+    periods = args.period or ['last_month']
+    reports = args.report or REPORTS
+
+    print(f"🚀 Running {len(reports)} reports x {len(periods)} periods x {len(properties)} properties...")
+    start = time.perf_counter()
+
+    runner = ReportRunner(auth, api_base=args.api_base, max_connections=args.max_connections)
+    tables, errors = asyncio.run(runner.run_pack(
+        properties, periods, reports, load_metrics(),
+        property_categories=load_property_categories() if 'category' in reports else None
+    ))
+
+    print(f"⏱️  Fetched in {time.perf_counter() - start:.2f}s")
+    if errors:
+        for error in errors:
+            print(f"  ❌ {error}")
+        # Partial tables look like complete ones, so write nothing rather than mislead
+        print(f"❌ {len(errors)} report(s) failed; no files written")
+        sys.exit(1)
+
+    print("💾 Saved files:")
+    for path in write_tables(tables, args.output_dir, args.format):
+        print(f"   {path}")
+
+    print("\n✅ Complete!")
+
+
+if __name__ == '__main__':
+    main()
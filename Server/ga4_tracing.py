@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+GA4 Proxy Tracing
+Spans and in-process latency histograms for upstream GA4 report calls
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from opentelemetry import trace as otel_trace
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+
+class Span:
+    """A single timed operation with attributes"""
+
+    def __init__(self, name: str, attributes: Optional[Dict] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.status = 'ok'
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self):
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'name': self.name,
+            'start_time': self.start_time,
+            'duration_seconds': round(self.duration or 0.0, 6),
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram keyed by a fixed label set"""
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'buckets': [0] * len(self.BUCKETS), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        with self._lock:
+            return {
+                key: {'buckets': list(s['buckets']), 'sum': s['sum'], 'count': s['count']}
+                for key, s in self._series.items()
+            }
+
+    def to_prometheus(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram"
+        ]
+        for key, series in sorted(self.snapshot().items()):
+            base = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key)]
+            for bound, count in zip(self.BUCKETS, series['buckets']):
+                labels = ','.join(base + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{labels}}} {count}")
+            labels = ','.join(base + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{labels}}} {series['count']}")
+            lines.append(f"{self.name}_sum{{{','.join(base)}}} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{{{','.join(base)}}} {series['count']}")
+        return lines
+
+
+class Tracer:
+    """Records spans to a ring buffer, an optional JSONL file and OpenTelemetry"""
+
+    def __init__(self, span_log: Optional[str] = None, keep: int = 1000):
+        self.recent = deque(maxlen=keep)
+        self.span_log = Path(span_log) if span_log else None
+        self._lock = threading.Lock()
+        self.report_latency = LatencyHistogram(
+            'ga4_proxy_report_latency_seconds',
+            'Latency of GA4 runReport calls served by the proxy.',
+            ('property', 'report_kind', 'cache')
+        )
+        self._otel = otel_trace.get_tracer('ga4_proxy') if OTEL_AVAILABLE else None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block as a span; exceptions mark the span as errored"""
+        span = Span(name, attributes)
+        otel_cm = self._otel.start_as_current_span(name) if self._otel else None
+        otel_span = otel_cm.__enter__() if otel_cm else None
+
+        try:
+            yield span
+        except Exception as e:
+            span.status = 'error'
+            span.set_attribute('error', str(e))
+            raise
+        finally:
+            span.end()
+            if otel_span is not None:
+                for key, value in span.attributes.items():
+                    otel_span.set_attribute(f"ga4.{key}", value)
+                otel_cm.__exit__(None, None, None)
+            self._record(span)
+
+    def _record(self, span: Span):
+        if span.name in ('ga4.runReport', 'ga4.runRealtimeReport'):
+            self.report_latency.observe(
+                span.duration,
+                property=span.attributes.get('property', ''),
+                report_kind=span.attributes.get('report_kind', ''),
+                cache=span.attributes.get('cache', '')
+            )
+
+        with self._lock:
+            self.recent.append(span)
+            if self.span_log:
+                with open(self.span_log, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(span.to_dict()) + '\n')
+
+    def recent_spans(self, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            spans = list(self.recent)[-limit:]
+        return [span.to_dict() for span in spans]
+
+    def to_prometheus(self) -> str:
+        return '\n'.join(self.report_latency.to_prometheus()) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,21 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# The server modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake_ga4_api  # noqa: E402
+
+
+@pytest.fixture
+def fake_api():
+    """A local fake GA4 Data API on a free port; yields (server, base URL)"""
+    server = fake_ga4_api.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
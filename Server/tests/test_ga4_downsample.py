@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+from ga4_downsample import OverviewSeries, SeriesCache, lttb, rows_to_points
+from ga4_proxy import GA4Proxy
+
+AUTH = 'Bearer test-token'
+
+
+def test_lttb_keeps_endpoints_and_target_count():
+    points = [(x, math.sin(x / 10)) for x in range(1000)]
+    sampled = lttb(points, 50)
+    assert len(sampled) == 50
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert [p[0] for p in sampled] == sorted(p[0] for p in sampled)
+
+
+def test_lttb_keeps_spikes():
+    points = [(x, 0.0) for x in range(300)]
+    points[137] = (137, 100.0)
+    points[211] = (211, -50.0)
+    sampled = lttb(points, 20)
+    assert (137, 100.0) in sampled and (211, -50.0) in sampled
+
+
+@pytest.mark.parametrize('threshold', [2, 10, 11])
+def test_lttb_returns_short_series_unchanged(threshold):
+    points = [(x, x * 2.0) for x in range(10)]
+    assert lttb(points, threshold) == points
+
+
+def test_rows_to_points_sorts_by_day():
+    response = {'rows': [
+        {'dimensionValues': [{'value': '20240102'}], 'metricValues': [{'value': '5'}]},
+        {'dimensionValues': [{'value': '20240101'}], 'metricValues': [{'value': ''}]},
+    ]}
+    assert rows_to_points(response) == [(1704067200000.0, 0.0), (1704153600000.0, 5.0)]
+
+
+def test_series_cache_expiry_and_lru(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('ga4_downsample.time.monotonic', lambda: now[0])
+    cache = SeriesCache(max_entries=2)
+    cache.put('a', 1, expires=10)
+    cache.put('b', 2, expires=10)
+    assert cache.get('a') == 1
+    cache.put('c', 3, expires=5)  # Evicts 'b', the least recently used
+    assert cache.get('b') is None
+    now[0] = 6
+    assert cache.get('c') is None
+    assert cache.get('a') == 1
+
+
+def test_threshold_rounds_width_up():
+    series = OverviewSeries(proxy=None, pixels_per_point=2.0)
+    assert series.threshold(801) == 425
+    assert series.threshold(10) == 25
+
+
+def test_series_is_downsampled_and_cached_with_the_report(fake_api):
+    server, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=60)
+
+    status, result = proxy.overview.series('111', '2023-01-01', '2023-12-31', 100, AUTH)
+    assert status == 200
+    assert result['raw_points'] == 365
+    assert len(result['points']) == proxy.overview.threshold(100)
+
+    assert proxy.overview.series('111', '2023-01-01', '2023-12-31', 100, AUTH) == (200, result)
+    assert server.calls[('111', 'runReport')] == 1
+
+
+def test_window_narrows_the_series(fake_api):
+    _, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=60)
+    window = (1688169600000.0, 1690761600000.0)  # 2023-07-01 .. 2023-07-31
+    _, result = proxy.overview.series('111', '2023-01-01', '2023-12-31', 800, AUTH, window=window)
+    assert result['raw_points'] == 31
+    assert len(result['points']) == 31
+
+
+def test_uncached_reports_are_not_cached_as_series(fake_api):
+    server, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=0)
+    for _ in range(2):
+        proxy.overview.series('111', '2023-01-01', '2023-03-31', 100, AUTH)
+    assert server.calls[('111', 'runReport')] == 2
+
+
+def test_overview_reports_per_property_errors(fake_api):
+    _, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=0)
+    status, result = proxy.overview.overview(
+        {'properties': ['111', 222], 'startDate': '2023-01-01', 'endDate': '2023-01-31', 'width': 100}, ''
+    )
+    assert status == 200
+    assert [s['error']['code'] for s in result['series']] == [401, 401]
+    assert result['threshold'] == 50
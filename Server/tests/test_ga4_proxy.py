@@ -0,0 +1,126 @@
+import json
+import threading
+import urllib.request
+
+import pytest
+
+from ga4_proxy import GA4Proxy, ReportCache, date_span_days, infer_report_kind, make_server
+from ga4_tracing import LatencyHistogram
+
+BODY = {
+    'dateRanges': [{'startDate': '2024-01-01', 'endDate': '2024-01-31'}],
+    'metrics': [{'name': 'screenPageViews'}],
+    'dimensions': [{'name': 'deviceCategory'}],
+}
+
+
+@pytest.mark.parametrize('dimensions, metrics, kind', [
+    (['deviceCategory'], ['screenPageViews'], 'device'),
+    (['sessionDefaultChannelGroup'], ['sessions'], 'channel'),
+    (['pagePath'], ['userEngagementDuration'], 'engagement'),
+    (['date'], ['screenPageViews'], 'overview'),
+    (['date'], ['sessions', 'screenPageViews'], 'main'),
+    ([], ['sessions'], 'summary'),
+    (['country'], ['sessions'], 'other'),
+])
+def test_infer_report_kind(dimensions, metrics, kind):
+    body = {'dimensions': [{'name': d} for d in dimensions], 'metrics': [{'name': m} for m in metrics]}
+    assert infer_report_kind(body) == kind
+
+
+def test_date_span_days_skips_relative_dates():
+    body = {'dateRanges': [{'startDate': '2024-01-01', 'endDate': '2024-01-31'},
+                           {'startDate': '30daysAgo', 'endDate': 'today'}]}
+    assert date_span_days(body) == 31
+
+
+def test_cache_key_depends_on_token():
+    assert ReportCache.key('Bearer a', '1', BODY) != ReportCache.key('Bearer b', '1', BODY)
+    assert ReportCache.key('Bearer a', '1', BODY) == ReportCache.key('Bearer a', '1', dict(BODY))
+
+
+def test_cache_expiry_and_eviction(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('ga4_proxy.time.monotonic', lambda: now[0])
+    cache = ReportCache(ttl=10, max_entries=2)
+    cache.put('a', b'1')
+    now[0] += 1
+    cache.put('b', b'2')
+    cache.put('c', b'3')  # Evicts 'a', the soonest to expire
+    assert cache.get('a') is None
+    assert cache.get('b') == b'2'
+    assert cache.expires_at('c') == 111.0
+    now[0] += 20
+    assert cache.get('b') is None
+    assert cache.expires_at('c') is None
+
+
+def test_zero_ttl_disables_cache():
+    cache = ReportCache(ttl=0)
+    cache.put('a', b'1')
+    assert cache.get('a') is None
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = LatencyHistogram('latency', 'Latency.', ('kind',))
+    histogram.observe(0.07, kind='main')
+    histogram.observe(3.0, kind='main')
+    lines = histogram.to_prometheus()
+    assert 'latency_bucket{kind="main",le="0.05"} 0' in lines
+    assert 'latency_bucket{kind="main",le="0.1"} 1' in lines
+    assert 'latency_bucket{kind="main",le="5.0"} 2' in lines
+    assert 'latency_bucket{kind="main",le="+Inf"} 2' in lines
+    assert 'latency_count{kind="main"} 2' in lines
+
+
+def test_run_report_caches_and_traces(fake_api):
+    server, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=60)
+
+    first = proxy.run_report('123', BODY, 'Bearer t', 'device')
+    second = proxy.run_report('123', BODY, 'Bearer t', 'device')
+
+    assert first == second and first[0] == 200
+    assert server.calls[('123', 'runReport')] == 1
+    assert [s['attributes']['cache'] for s in proxy.tracer.recent_spans()] == ['miss', 'hit']
+    metrics = proxy.tracer.to_prometheus()
+    assert 'ga4_proxy_report_latency_seconds_count{property="123",report_kind="device",cache="hit"} 1' in metrics
+
+
+def test_unknown_report_kind_header_is_inferred(fake_api):
+    _, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=0)
+    proxy.run_report('123', BODY, 'Bearer t', 'attacker-chosen-label')
+    assert proxy.tracer.recent_spans()[-1]['attributes']['report_kind'] == 'device'
+    assert 'attacker-chosen-label' not in proxy.tracer.to_prometheus()
+
+
+def test_upstream_errors_are_not_cached(fake_api):
+    _, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=60)
+    status, payload = proxy.run_report('123', BODY, '', None)  # The fake rejects a missing token
+    assert status == 401
+    assert json.loads(payload)['error']['code'] == 401
+    assert proxy.tracer.recent_spans()[-1]['status'] == 'error'
+    assert proxy.cache.get(ReportCache.key('', '123', BODY)) is None
+
+
+def test_http_front_end_forwards_report_kind(fake_api):
+    _, upstream = fake_api
+    proxy = GA4Proxy(upstream=upstream, cache_ttl=0)
+    server = make_server(proxy, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_address[1]}/v1beta/properties/123:runReport",
+            data=json.dumps(BODY).encode('utf-8'),
+            headers={'Authorization': 'Bearer t', 'Content-Type': 'application/json', 'X-Report-Kind': 'summary'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            assert response.status == 200
+            assert 'rows' in json.loads(response.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert proxy.tracer.recent_spans()[-1]['attributes']['report_kind'] == 'summary'
@@ -0,0 +1,133 @@
+import pytest
+
+import ga4_realtime
+from ga4_realtime import RealtimeHub, Subscriber, diff_snapshots, snapshot_from_response
+
+
+def response(rows, totals=None):
+    body = {
+        'metricHeaders': [{'name': 'activeUsers'}, {'name': 'screenPageViews'}],
+        'rows': [{'dimensionValues': [{'value': name}], 'metricValues': [{'value': str(v)} for v in values]}
+                 for name, values in rows.items()],
+    }
+    if totals:
+        body['totals'] = [{'metricValues': [{'value': str(v)} for v in totals]}]
+    return body
+
+
+def events(subscriber):
+    drained = []
+    while not subscriber.events.empty():
+        drained.append(subscriber.events.get_nowait())
+    return drained
+
+
+def test_snapshot_uses_reported_totals_or_sums_rows():
+    rows = {'Home': (3, 10), 'Sports': (1, 2)}
+    assert snapshot_from_response(response(rows)) == {
+        'totals': {'activeUsers': 4.0, 'screenPageViews': 12.0},
+        'rows': {'Home': {'activeUsers': 3.0, 'screenPageViews': 10.0},
+                 'Sports': {'activeUsers': 1.0, 'screenPageViews': 2.0}},
+    }
+    assert snapshot_from_response(response(rows, totals=(5, 12)))['totals']['activeUsers'] == 5.0
+
+
+def test_diff_reports_changed_added_and_removed_rows():
+    old = snapshot_from_response(response({'Home': (3, 10), 'Sports': (1, 2)}))
+    new = snapshot_from_response(response({'Home': (3, 10), 'News': (1, 1)}))
+    assert diff_snapshots(old, new) == {
+        'totals': {'screenPageViews': 11.0},
+        'rows': {'News': {'activeUsers': 1.0, 'screenPageViews': 1.0}},
+        'removed': ['Sports'],
+    }
+    assert diff_snapshots(old, old) is None
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    # Feeds are driven by hand here instead of by their polling threads
+    monkeypatch.setattr(ga4_realtime.PropertyFeed, '_poll_loop', lambda self: None)
+    hub = RealtimeHub('http://upstream.invalid')
+    hub.calls = []
+    hub.replies = {}
+
+    def fetch(property_id, authorization):
+        hub.calls.append((property_id, authorization))
+        return hub.replies.get((property_id, authorization), (200, response({'Home': (1, 1)})))
+
+    hub.fetch = fetch
+    return hub
+
+
+def test_token_is_verified_once_per_property(hub):
+    first = hub.subscribe(['111'], 'Bearer a')
+    second = hub.subscribe(['111'], 'Bearer a')
+
+    assert hub.calls == [('111', 'Bearer a')]
+    assert [event for event, _ in events(first)] == ['snapshot']
+    assert events(second)[0][1]['rows'] == {'Home': {'activeUsers': 1.0, 'screenPageViews': 1.0}}
+    assert hub.subscriber_count() == 2
+
+
+def test_forbidden_property_gets_an_error_event(hub):
+    hub.replies[('222', 'Bearer a')] = (403, {'error': {'message': 'No access'}})
+    subscriber = hub.subscribe(['222', '111'], 'Bearer a')
+
+    assert [event for event, _ in events(subscriber)] == ['error', 'snapshot']
+    assert not subscriber.closed.is_set()
+
+    alone = hub.subscribe(['222'], 'Bearer a')
+    assert alone.closed.is_set()
+
+
+def test_expired_token_is_told_to_refresh_and_closed(hub):
+    hub.replies[('111', 'Bearer old')] = (401, {'error': {'message': 'Token expired'}})
+    subscriber = hub.subscribe(['111', '222'], 'Bearer old')
+
+    assert events(subscriber) == [('unauthorized', {'property': '111', 'message': 'Token expired'})]
+    assert subscriber.closed.is_set()
+    assert hub.calls == [('111', 'Bearer old')]
+    assert hub.subscriber_count() == 0
+
+
+def test_feed_publishes_deltas_only_when_something_changed(hub):
+    subscriber = hub.subscribe(['111'], 'Bearer a')
+    feed = hub.feeds['111']
+    events(subscriber)
+
+    feed._publish(snapshot_from_response(response({'Home': (1, 1)})))
+    assert events(subscriber) == []
+
+    feed._publish(snapshot_from_response(response({'Home': (2, 1)})))
+    [(event, data)] = events(subscriber)
+    assert event == 'delta' and data['version'] == 2
+    assert data['rows'] == {'Home': {'activeUsers': 2.0, 'screenPageViews': 1.0}}
+
+
+def test_rejected_poll_token_drops_only_its_subscribers(hub):
+    stale = hub.subscribe(['111'], 'Bearer old')
+    fresh = hub.subscribe(['111'], 'Bearer new')
+    feed = hub.feeds['111']
+
+    feed._reject('Bearer old', 401, {'error': {'message': 'Token expired'}})
+
+    assert stale.closed.is_set() and events(stale)[-1][0] == 'unauthorized'
+    assert not fresh.closed.is_set()
+    assert feed.subscribers == [fresh]
+    assert hub._token_key('Bearer old', '111') not in hub._verified
+    hub.subscribe(['111'], 'Bearer old')
+    assert hub.calls.count(('111', 'Bearer old')) == 2
+
+
+def test_expired_verifications_are_pruned(hub):
+    hub._verified = {'expired': 0}
+    hub._next_prune = 0
+    hub._remember_token('current')
+    assert list(hub._verified) == ['current']
+
+
+def test_stalled_subscriber_is_closed():
+    subscriber = Subscriber('Bearer a', max_pending=2)
+    for version in range(3):
+        subscriber.push('delta', {'version': version})
+    assert subscriber.closed.is_set()
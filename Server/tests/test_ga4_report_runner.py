@@ -0,0 +1,112 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from ga4_report_runner import AIOHTTP_AVAILABLE, ReportRunner, StaticTokenAuth, flatten_rows, period_ranges
+
+needs_aiohttp = pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason='requires aiohttp')
+
+
+def spans(period, today):
+    return [(r['startDate'], r['endDate']) for r in period_ranges(period, today)]
+
+
+def test_rolling_periods_compare_against_the_preceding_span():
+    assert spans('7days', date(2024, 3, 10)) == [('2024-03-03', '2024-03-10'), ('2024-02-25', '2024-03-03')]
+
+
+def test_calendar_periods():
+    # 2024-03-13 is a Wednesday; weeks start on Sunday
+    assert spans('last_week', date(2024, 3, 13)) == [('2024-03-03', '2024-03-09'), ('2024-02-25', '2024-03-02')]
+    assert spans('last_month', date(2024, 3, 13)) == [('2024-02-01', '2024-02-29'), ('2024-01-01', '2024-01-31')]
+    assert spans('month', date(2024, 3, 13)) == [('2024-03-01', '2024-03-13'), ('2024-02-01', '2024-02-29')]
+
+
+def test_fiscal_year_is_the_last_completed_one():
+    assert spans('fiscal_year', date(2024, 6, 29))[0] == ('2022-07-01', '2023-06-30')
+    assert spans('fiscal_year', date(2024, 6, 30))[0] == ('2023-07-01', '2024-06-30')
+
+
+def test_unknown_period():
+    with pytest.raises(ValueError):
+        period_ranges('fortnight')
+
+
+def test_flatten_rows_prefixes_context():
+    response = {
+        'dimensionHeaders': [{'name': 'deviceCategory'}],
+        'metricHeaders': [{'name': 'screenPageViews'}],
+        'rows': [{'dimensionValues': [{'value': 'mobile'}], 'metricValues': [{'value': '12'}]}],
+    }
+    assert flatten_rows(response, {'period': '7days'}) == [
+        {'period': '7days', 'deviceCategory': 'mobile', 'screenPageViews': 12.0}
+    ]
+    assert flatten_rows({}, {'period': '7days'}) == []
+
+
+@needs_aiohttp
+def test_run_pack_against_fake_api(fake_api):
+    server, base_url = fake_api
+    runner = ReportRunner(StaticTokenAuth('t'), api_base=base_url, max_connections=4)
+    properties = [{'id': '111', 'name': 'Collegian'}, {'id': '222', 'name': 'KCSU'}]
+
+    tables, errors = asyncio.run(runner.run_pack(
+        properties, ['7days', 'month'], ['summary', 'device', 'category'], [{'name': 'sessions'}],
+        property_categories={'111': [{'name': 'Sports', 'pattern': '/sports/'}]}, today=date(2024, 3, 13)
+    ))
+
+    assert errors == []
+    assert server.calls[('111', 'runReport')] == 2 * 2 + 2
+    assert server.calls[('222', 'runReport')] == 2 * 2
+    assert {r['property_name'] for r in tables['device']} == {'Collegian', 'KCSU'}
+    assert {r['category'] for r in tables['category']} == {'Sports'}
+
+
+@needs_aiohttp
+def test_failed_reports_are_returned_as_errors(fake_api):
+    _, base_url = fake_api
+
+    class NoAuth:
+        async def authorization(self):
+            return ''
+
+    runner = ReportRunner(NoAuth(), api_base=base_url)
+    tables, errors = asyncio.run(runner.run_pack(
+        [{'id': '111', 'name': 'Collegian'}], ['7days'], ['summary'], [{'name': 'sessions'}]
+    ))
+    assert tables == {'summary': []}
+    assert len(errors) == 1 and errors[0].startswith('Collegian 7days summary: GA4 error 401')
+
+
+@needs_aiohttp
+def test_html_gateway_errors_are_retried(monkeypatch):
+    from aiohttp import ClientSession, web
+    from aiohttp.test_utils import TestServer
+
+    async def no_sleep(_):
+        pass
+
+    monkeypatch.setattr(asyncio, 'sleep', no_sleep)
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request.headers['Authorization'])
+        if len(attempts) < 3:
+            return web.Response(status=502, text='<html>Bad Gateway</html>', content_type='text/html')
+        return web.json_response({'rows': []})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post('/v1beta/properties/{name}', handler)
+        async with TestServer(app) as server, ClientSession() as session:
+            runner = ReportRunner(StaticTokenAuth('t'), api_base=str(server.make_url('')), retries=3)
+            result = await runner.run_report(session, '111', {})
+            runner.retries = 1
+            attempts.clear()
+            with pytest.raises(RuntimeError, match='GA4 error 502 for property 111: Bad Gateway'):
+                await runner.run_report(session, '111', {})
+            return result
+
+    assert asyncio.run(scenario()) == {'rows': []}
+    assert attempts == ['Bearer t', 'Bearer t']
@@ -44,6 +44,14 @@ let trendChart = null;
 let comparisonChart = null;
 let overviewChart = null;
 let overviewTimeframe = 'ytd'; // 'ytd' or 'fiscal'
+let overviewSeriesState = null; // Proxy-downsampled overview: { dateRange, fullSeries, series, window, extent }
+let overviewZoomTimer = null;
+let overviewZoomSeq = 0;
+
+// Realtime stream (proxy only)
+let realtimeSource = null;
+let realtimeData = {}; // propertyId -> { totals, rows }
+let realtimeAwaitingToken = false; // stream closed on 401; reopen once a fresh token arrives
 
 // Property Metadata (ID, Name, Logo)
 const PROPERTIES = [
@@ -236,6 +244,13 @@ function handleAuthCallback(resp) {
   accessToken = resp.access_token;
   gapi.client.setToken({ access_token: accessToken });
 
+  if (realtimeAwaitingToken) {
+    // Silent refresh after the realtime stream was rejected; the rest of the UI is already up
+    realtimeAwaitingToken = false;
+    startRealtimeStream();
+    return;
+  }
+
   // Update UI to show authenticated state
   showAuthenticatedUI();
 }
@@ -254,6 +269,7 @@ function showAuthenticatedUI() {
   // Show Overview Section and Fetch Data
   document.getElementById('overviewSection').classList.remove('hidden');
   fetchAndRenderOverviewGraph();
+  startRealtimeStream();
 
   // Show user info (if available from Google Identity)
   const signInButton = document.getElementById('signInButton');
@@ -300,6 +316,7 @@ function handleSignOut() {
     gapi.client.setToken('');
     accessToken = null;
   }
+  stopRealtimeStream();
 
   // Reset UI
   document.getElementById('authRequired').classList.remove('hidden');
@@ -311,6 +328,108 @@ function handleSignOut() {
   document.getElementById('signOutButton').classList.add('hidden');
 }
 
+// ===================================
+// Realtime Stream (via Reporting Proxy)
+// ===================================
+
+/**
+ * Subscribe to the proxy's realtime stream for every property.
+ * The proxy polls GA4 once per property for all open dashboards and pushes
+ * a snapshot followed by deltas, so tabs never poll Google themselves.
+ */
+function startRealtimeStream() {
+  if (!CONFIG.PROXY_URL || !window.EventSource) return;
+  stopRealtimeStream();
+
+  const params = new URLSearchParams();
+  PROPERTIES.forEach(p => params.append('property', p.id));
+  // EventSource cannot send headers, so the token travels as a query parameter
+  params.append('access_token', accessToken);
+
+  realtimeData = {};
+  realtimeSource = new EventSource(`${CONFIG.PROXY_URL}/realtime/stream?${params}`);
+  document.getElementById('realtimeCard').classList.remove('hidden');
+
+  realtimeSource.addEventListener('snapshot', (e) => {
+    const data = JSON.parse(e.data);
+    realtimeData[data.property] = { totals: data.totals, rows: data.rows };
+    renderRealtime();
+  });
+
+  realtimeSource.addEventListener('delta', (e) => {
+    const data = JSON.parse(e.data);
+    const current = realtimeData[data.property];
+    if (!current) return;
+    Object.assign(current.totals, data.totals);
+    Object.assign(current.rows, data.rows);
+    data.removed.forEach(key => delete current.rows[key]);
+    renderRealtime();
+  });
+
+  realtimeSource.addEventListener('unauthorized', () => {
+    // The token expired; EventSource would keep reconnecting with it, so close and refresh first
+    realtimeSource.close();
+    realtimeSource = null;
+    realtimeAwaitingToken = true;
+    document.getElementById('realtimeStatus').textContent = '· refreshing sign-in…';
+    tokenClient.requestAccessToken({ prompt: '' });
+  });
+
+  realtimeSource.addEventListener('error', (e) => {
+    // Named 'error' events come from the proxy; plain ones are connection drops (EventSource retries)
+    if (e.data) {
+      const data = JSON.parse(e.data);
+      console.warn(`Realtime unavailable for property ${data.property}:`, data.message);
+    }
+    document.getElementById('realtimeStatus').textContent = '· reconnecting…';
+  });
+
+  realtimeSource.onopen = () => {
+    document.getElementById('realtimeStatus').textContent = '';
+  };
+}
+
+/**
+ * Close the realtime stream and hide its card
+ */
+function stopRealtimeStream() {
+  realtimeAwaitingToken = false;
+  if (realtimeSource) {
+    realtimeSource.close();
+    realtimeSource = null;
+  }
+  realtimeData = {};
+  document.getElementById('realtimeCard').classList.add('hidden');
+}
+
+/**
+ * Render one live card per property with its active users and top page
+ */
+function renderRealtime() {
+  const grid = document.getElementById('realtimeGrid');
+  grid.innerHTML = '';
+
+  PROPERTIES.filter(p => realtimeData[p.id]).forEach(p => {
+    const { totals, rows } = realtimeData[p.id];
+    const topPage = Object.entries(rows)
+      .sort((a, b) => b[1].activeUsers - a[1].activeUsers)[0];
+
+    const card = document.createElement('div');
+    card.className = 'metric-card';
+    card.innerHTML = `
+      <div class="metric-header">
+        <span class="metric-label">${p.name}</span>
+      </div>
+      <div class="metric-value">${formatNumber(totals.activeUsers || 0)}</div>
+      <div class="text-xs text-muted">${formatNumber(totals.screenPageViews || 0)} views</div>
+      <div class="text-xs text-muted realtime-top"></div>
+    `;
+    // Page titles come from the sites themselves, so keep them out of innerHTML
+    if (topPage) card.querySelector('.realtime-top').textContent = `Top: ${topPage[0]}`;
+    grid.appendChild(card);
+  });
+}
+
 // ===================================
 // Event Listeners
 // ===================================
@@ -382,10 +501,17 @@ function setupEventListeners() {
   });
 
   document.getElementById('overviewLogScale').addEventListener('click', () => {
-    if (window.lastOverviewData) {
+    if (overviewSeriesState) {
+      renderOverviewSeriesChart(overviewSeriesState.series, overviewSeriesState.window);
+    } else if (window.lastOverviewData) {
       renderOverviewChart(window.lastOverviewData);
     }
   });
+
+  // Zoom (wheel) and reset (double-click) for the proxy-downsampled overview
+  const overviewCanvas = document.getElementById('overviewChart');
+  overviewCanvas.addEventListener('wheel', handleOverviewZoom, { passive: false });
+  overviewCanvas.addEventListener('dblclick', () => setOverviewWindow(null));
 }
 
 /**
@@ -1204,9 +1330,304 @@ function renderCategoryAnalysis(data, dateRanges) {
   });
 }
 
+// ===================================
+// GA4 Query Sharding
+// ===================================
+
+// Long windows (fiscal year, year-over-year) are split into weekly or monthly
+// shards so GA4 does not sample or threshold them, then merged back into a
+// single runReport-shaped response.
+const SHARD_CONFIG = {
+  maxUnshardedDays: 31, // Ranges up to this length run as a single query
+  weeklyUpToDays: 92,   // Longer ranges shard by week up to this length, by month beyond
+  concurrency: 6,       // Per property, across all reports: GA4 allows 10 concurrent requests per property
+  defaultLimit: 10000,  // GA4's row limit when a request sets none
+};
+
+// Metrics that can be summed across shards exactly
+const ADDITIVE_METRICS = new Set([
+  'sessions',
+  'screenPageViews',
+  'engagedSessions',
+  'eventCount',
+  'userEngagementDuration',
+]);
+
+// Ratio metrics and the component they are weighted by when recombined.
+// engagementRate = engagedSessions / sessions, bounceRate = 1 - engagementRate,
+// averageSessionDuration = total session duration / sessions.
+const RATIO_METRICS = {
+  engagementRate: 'sessions',
+  bounceRate: 'sessions',
+  averageSessionDuration: 'sessions',
+};
+
+/**
+ * Parse a YYYY-MM-DD string into a local Date (null for relative dates like "today")
+ */
+function parseISODate(dateStr) {
+  const match = /^(\d{4})-(\d{2})-(\d{2})$/.exec(dateStr || '');
+  if (!match) return null;
+  return new Date(parseInt(match[1]), parseInt(match[2]) - 1, parseInt(match[3]));
+}
+
+/**
+ * Split a date range into contiguous weekly or monthly shards
+ */
+function splitDateRange(dateRange) {
+  const start = parseISODate(dateRange.startDate);
+  const end = parseISODate(dateRange.endDate);
+  if (!start || !end || end < start) return [dateRange];
+
+  const days = Math.round((end - start) / 86400000) + 1;
+  if (days <= SHARD_CONFIG.maxUnshardedDays) return [dateRange];
+
+  const shards = [];
+  let shardStart = new Date(start);
+
+  while (shardStart <= end) {
+    let shardEnd;
+    if (days <= SHARD_CONFIG.weeklyUpToDays) {
+      shardEnd = new Date(shardStart);
+      shardEnd.setDate(shardStart.getDate() + 6);
+    } else {
+      // Last day of the shard's calendar month
+      shardEnd = new Date(shardStart.getFullYear(), shardStart.getMonth() + 1, 0);
+    }
+    if (shardEnd > end) shardEnd = new Date(end);
+
+    const shard = { startDate: formatDate(shardStart), endDate: formatDate(shardEnd) };
+    if (dateRange.name) shard.name = dateRange.name;
+    shards.push(shard);
+
+    shardStart = new Date(shardEnd);
+    shardStart.setDate(shardEnd.getDate() + 1);
+  }
+
+  return shards;
+}
+
+/**
+ * Whether a report can be split by date and merged back exactly.
+ * Reports broken down by date never merge rows across shards, so any metric
+ * is safe. Otherwise every metric must be additive or a ratio whose weight
+ * is also requested; user counts are not additive across windows.
+ */
+function canShardRequest(request) {
+  // Each shard would skip its own first `offset` rows
+  if (request.offset) return false;
+
+  const dimensions = (request.dimensions || []).map(d => d.name);
+  if (dimensions.includes('date')) return true;
+
+  const metrics = request.metrics.map(m => m.name);
+  return metrics.every(name =>
+    ADDITIVE_METRICS.has(name) || (RATIO_METRICS[name] && metrics.includes(RATIO_METRICS[name]))
+  );
+}
+
+/**
+ * Run a single runReport request against the GA4 Data API.
+ * When CONFIG.PROXY_URL is set the call goes through the reporting proxy,
+ * which caches responses and traces each report by kind.
+ */
+async function runReport(propertyId, request, reportKind = null) {
+  if (CONFIG.PROXY_URL) {
+    const headers = {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${accessToken}`,
+    };
+    if (reportKind) headers['X-Report-Kind'] = reportKind;
+
+    const response = await fetch(`${CONFIG.PROXY_URL}/v1beta/properties/${propertyId}:runReport`, {
+      method: 'POST',
+      headers,
+      body: JSON.stringify(request),
+    });
+    const result = await response.json();
+    if (!response.ok) throw { result };
+    return result;
+  }
+
+  const response = await gapi.client.request({
+    path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + propertyId + ':runReport',
+    method: 'POST',
+    body: request,
+  });
+  return response.result;
+}
+
+/**
+ * Create a limiter that runs at most `limit` async calls at once, queuing the rest in order
+ */
+function createLimiter(limit) {
+  let active = 0;
+  const waiting = [];
+
+  return async fn => {
+    if (active < limit) {
+      active++;
+    } else {
+      // The finishing call hands its slot straight over, so `active` stays put
+      await new Promise(resolve => waiting.push(resolve));
+    }
+    try {
+      return await fn();
+    } finally {
+      if (waiting.length > 0) waiting.shift()();
+      else active--;
+    }
+  };
+}
+
+// One limiter per property, shared by every report that property is queried for
+const propertyLimiters = new Map();
+
+function propertyLimiter(propertyId) {
+  if (!propertyLimiters.has(propertyId)) {
+    propertyLimiters.set(propertyId, createLimiter(SHARD_CONFIG.concurrency));
+  }
+  return propertyLimiters.get(propertyId);
+}
+
+/**
+ * Run a report, sharding long date ranges and merging the shard responses.
+ * Returns the same shape as a single runReport result.
+ */
+async function runShardedReport(propertyId, request, reportKind = null) {
+  const limit = propertyLimiter(propertyId);
+  if (!canShardRequest(request)) {
+    return limit(() => runReport(propertyId, request, reportKind));
+  }
+
+  const shards = [];
+  request.dateRanges.forEach((dateRange, rangeIndex) => {
+    splitDateRange(dateRange).forEach(shardRange => shards.push({ rangeIndex, shardRange }));
+  });
+
+  if (shards.length === request.dateRanges.length) {
+    return limit(() => runReport(propertyId, request, reportKind));
+  }
+
+  const responses = await Promise.all(shards.map(shard =>
+    limit(() => runReport(propertyId, { ...request, dateRanges: [shard.shardRange] }, reportKind))
+  ));
+
+  return mergeShardResponses(request, shards, responses);
+}
+
+/**
+ * Compare two merged rows by the request's orderBys. Without any, GA4 orders
+ * by the first metric descending; date breakdowns keep their merged (chronological
+ * per date range) order.
+ */
+function compareMergedRows(request, a, b) {
+  const metricNames = request.metrics.map(m => m.name);
+  const dimensionNames = (request.dimensions || []).map(d => d.name);
+  let orderBys = request.orderBys || [];
+  if (orderBys.length === 0 && !dimensionNames.includes('date')) {
+    orderBys = [{ metric: { metricName: metricNames[0] }, desc: true }];
+  }
+
+  for (const orderBy of orderBys) {
+    let diff = 0;
+    if (orderBy.metric) {
+      const i = metricNames.indexOf(orderBy.metric.metricName);
+      if (i < 0) continue;
+      diff = parseFloat(a.metricValues[i].value) - parseFloat(b.metricValues[i].value);
+    } else if (orderBy.dimension) {
+      const i = dimensionNames.indexOf(orderBy.dimension.dimensionName);
+      if (i < 0) continue;
+      const x = a.dimensionValues[i].value;
+      const y = b.dimensionValues[i].value;
+      diff = orderBy.dimension.orderType === 'NUMERIC'
+        ? parseFloat(x) - parseFloat(y)
+        : (x < y ? -1 : x > y ? 1 : 0);
+    }
+    if (diff !== 0) return orderBy.desc ? -diff : diff;
+  }
+  return 0;
+}
+
+/**
+ * Merge shard responses: additive metrics are summed, ratio metrics are
+ * recomputed as a weighted mean of their components. The merged rows are
+ * re-sorted and re-truncated to the request's orderBys and limit, since each
+ * shard was ordered and cut off on its own.
+ */
+function mergeShardResponses(request, shards, responses) {
+  const metricNames = request.metrics.map(m => m.name);
+  const multiRange = request.dateRanges.length > 1;
+  const merged = new Map();
+  let headers = null;
+
+  responses.forEach((response, shardIndex) => {
+    const rangeName = request.dateRanges[shards[shardIndex].rangeIndex].name || `date_range_${shards[shardIndex].rangeIndex}`;
+    const dimensionHeaders = response.dimensionHeaders || [];
+    const dateRangeIndex = dimensionHeaders.findIndex(h => h.name === 'dateRange');
+    if (!headers && response.metricHeaders) headers = response;
+
+    (response.rows || []).forEach(row => {
+      const dimensionValues = (row.dimensionValues || [])
+        .filter((_, i) => i !== dateRangeIndex)
+        .map(v => v.value);
+      if (multiRange) dimensionValues.push(rangeName);
+
+      const key = JSON.stringify(dimensionValues);
+      let entry = merged.get(key);
+      if (!entry) {
+        entry = { dimensionValues, sums: metricNames.map(() => 0), weights: metricNames.map(() => 0) };
+        merged.set(key, entry);
+      }
+
+      metricNames.forEach((name, i) => {
+        const value = parseFloat(row.metricValues[i]?.value || 0);
+        const weightName = RATIO_METRICS[name];
+        if (weightName) {
+          const weight = parseFloat(row.metricValues[metricNames.indexOf(weightName)]?.value || 0);
+          entry.sums[i] += value * weight;
+          entry.weights[i] += weight;
+        } else {
+          entry.sums[i] += value;
+        }
+      });
+    });
+  });
+
+  const allRows = Array.from(merged.values()).map(entry => ({
+    dimensionValues: entry.dimensionValues.map(value => ({ value })),
+    metricValues: metricNames.map((name, i) => ({
+      value: String(RATIO_METRICS[name]
+        ? (entry.weights[i] > 0 ? entry.sums[i] / entry.weights[i] : 0)
+        : entry.sums[i]),
+    })),
+  }));
+  allRows.sort((a, b) => compareMergedRows(request, a, b));
+  const rows = allRows.slice(0, Number(request.limit) || SHARD_CONFIG.defaultLimit);
+
+  // rowCount is the total number of matching rows, not the number returned. Truncated shards
+  // hide some rows, so the best lower bound is the larger of the merged and per-shard totals.
+  const rowCount = Math.max(allRows.length, ...responses.map(response => response.rowCount || 0));
+
+  const dimensionHeaders = (request.dimensions || []).map(d => ({ name: d.name }));
+  if (multiRange) dimensionHeaders.push({ name: 'dateRange' });
+
+  const result = {
+    dimensionHeaders,
+    metricHeaders: headers ? headers.metricHeaders : metricNames.map(name => ({ name })),
+    rowCount,
+    metadata: headers ? headers.metadata : undefined,
+    kind: 'analyticsData#runReport',
+  };
+  if (rows.length > 0) result.rows = rows;
+
+  return result;
+}
+
 /**
  * Fetch data from GA4 Data API
  * Fetches 3 reports: Main (metrics), Device (mobile views), Channel (social traffic)
+ * Long date ranges are sharded by runShardedReport to avoid sampling
  */
 async function fetchGA4Data(propertyId, dateRanges, dimensionFilter = null) {
   // 1. Main Report (Daily Trend)
@@ -1262,40 +1683,21 @@ async function fetchGA4Data(propertyId, dateRanges, dimensionFilter = null) {
   }
 
   try {
-    const [mainResponse, deviceResponse, channelResponse, engagementResponse, summaryResponse] = await Promise.all([
-      gapi.client.request({
-        path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + propertyId + ':runReport',
-        method: 'POST',
-        body: mainRequest,
-      }),
-      gapi.client.request({
-        path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + propertyId + ':runReport',
-        method: 'POST',
-        body: deviceRequest,
-      }),
-      gapi.client.request({
-        path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + propertyId + ':runReport',
-        method: 'POST',
-        body: channelRequest,
-      }),
-      gapi.client.request({
-        path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + propertyId + ':runReport',
-        method: 'POST',
-        body: engagementRequest,
-      }),
-      gapi.client.request({
-        path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + propertyId + ':runReport',
-        method: 'POST',
-        body: summaryRequest,
-      }),
+
+    const [main, device, channel, engagement, summary] = await Promise.all([
+      runShardedReport(propertyId, mainRequest, 'main'),
+      runShardedReport(propertyId, deviceRequest, 'device'),
+      runShardedReport(propertyId, channelRequest, 'channel'),
+      runShardedReport(propertyId, engagementRequest, 'engagement'),
+      runShardedReport(propertyId, summaryRequest, 'summary'),
     ]);
 
     return {
-      main: mainResponse.result,
-      device: deviceResponse.result,
-      channel: channelResponse.result,
-      engagement: engagementResponse.result,
-      summary: summaryResponse.result,
+      main,
+      device,
+      channel,
+      engagement,
+      summary,
     };
   } catch (error) {
     throw new Error(error.result?.error?.message || 'Failed to fetch GA4 data');
@@ -1375,43 +1777,24 @@ async function fetchMultiPropertyData(properties, dateRange, dimensionFilter = n
     }
 
     try {
-      const [mainResponse, deviceResponse, channelResponse, engagementResponse, summaryResponse] = await Promise.all([
-        gapi.client.request({
-          path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + property.id + ':runReport',
-          method: 'POST',
-          body: mainRequest,
-        }),
-        gapi.client.request({
-          path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + property.id + ':runReport',
-          method: 'POST',
-          body: deviceRequest,
-        }),
-        gapi.client.request({
-          path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + property.id + ':runReport',
-          method: 'POST',
-          body: channelRequest,
-        }),
-        gapi.client.request({
-          path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + property.id + ':runReport',
-          method: 'POST',
-          body: engagementRequest,
-        }),
-        gapi.client.request({
-          path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + property.id + ':runReport',
-          method: 'POST',
-          body: summaryRequest,
-        }),
+
+      const [main, device, channel, engagement, summary] = await Promise.all([
+        runShardedReport(property.id, mainRequest, 'main'),
+        runShardedReport(property.id, deviceRequest, 'device'),
+        runShardedReport(property.id, channelRequest, 'channel'),
+        runShardedReport(property.id, engagementRequest, 'engagement'),
+        runShardedReport(property.id, summaryRequest, 'summary'),
       ]);
 
       allData.push({
         propertyId: property.id,
         propertyName: property.name,
         data: {
-          main: mainResponse.result,
-          device: deviceResponse.result,
-          channel: channelResponse.result,
-          engagement: engagementResponse.result,
-          summary: summaryResponse.result,
+          main,
+          device,
+          channel,
+          engagement,
+          summary,
         },
       });
     } catch (error) {
@@ -1895,6 +2278,27 @@ async function fetchAndRenderOverviewGraph() {
   const dateRange = { startDate, endDate };
 
   try {
+    // Through the proxy, fetch daily series already downsampled to the chart's width
+    if (CONFIG.PROXY_URL) {
+      const series = await fetchOverviewSeries(dateRange);
+      if (series.length === 0) {
+        throw new Error('No data available for any property. Please check permissions.');
+      }
+
+      const xs = series.flatMap(s => s.points.map(p => p[0]));
+      overviewSeriesState = {
+        dateRange,
+        fullSeries: series,
+        series,
+        window: null,
+        extent: [Math.min(...xs), Math.max(...xs)],
+      };
+      loadingDiv.remove();
+      renderOverviewSeriesChart(series, null);
+      return;
+    }
+    overviewSeriesState = null;
+
     // Fetch daily page views for all properties
     // Use map to create promises, but catch individual errors to prevent Promise.all from failing entirely
     // OR use Promise.allSettled
@@ -1907,16 +2311,12 @@ async function fetchAndRenderOverviewGraph() {
           dimensions: [{ name: 'date' }]
         };
 
-        const response = await gapi.client.request({
-          path: 'https://analyticsdata.googleapis.com/v1beta/properties/' + prop.id + ':runReport',
-          method: 'POST',
-          body: request,
-        });
+        const result = await runShardedReport(prop.id, request, 'overview');
 
         return {
           id: prop.id,
           name: prop.name,
-          rows: response.result.rows || []
+          rows: result.rows || []
         };
       } catch (err) {
         console.error(`Error fetching data for ${prop.name} (${prop.id}):`, err);
@@ -1956,6 +2356,175 @@ async function fetchAndRenderOverviewGraph() {
   }
 }
 
+/**
+ * Fetch overview series from the proxy, LTTB-downsampled to the canvas width.
+ * `range` narrows to a zoom window { from, to } in epoch ms.
+ */
+async function fetchOverviewSeries(dateRange, range = null) {
+  const canvas = document.getElementById('overviewChart');
+  const response = await fetch(`${CONFIG.PROXY_URL}/overview/series`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${accessToken}`,
+    },
+    body: JSON.stringify({
+      properties: PROPERTIES.map(p => p.id),
+      startDate: dateRange.startDate,
+      endDate: dateRange.endDate,
+      width: canvas.clientWidth || 800,
+      window: range,
+    }),
+  });
+  const result = await response.json();
+  if (!response.ok) throw new Error(result.error?.message || 'Overview request failed');
+
+  return result.series
+    .filter(s => !s.error && s.points.length > 0)
+    .map(s => ({
+      id: s.property,
+      name: PROPERTIES.find(p => p.id === s.property)?.name || s.property,
+      points: s.points,
+    }));
+}
+
+/**
+ * Wheel zoom on the overview: rescale the coarse full-range series at once,
+ * then swap in a series refined for the new window once the wheel settles
+ */
+function handleOverviewZoom(e) {
+  if (!overviewSeriesState || !overviewChart) return;
+  e.preventDefault();
+
+  const scale = overviewChart.scales.x;
+  const center = scale.getValueForPixel(e.offsetX);
+  const factor = e.deltaY < 0 ? 0.8 : 1.25;
+  const [minX, maxX] = overviewSeriesState.extent;
+
+  const from = Math.max(minX, center - (center - scale.min) * factor);
+  const to = Math.min(maxX, center + (scale.max - center) * factor);
+  const zoomedOut = to - from >= (maxX - minX) * 0.999;
+
+  setOverviewWindow(zoomedOut ? null : { from, to });
+}
+
+/**
+ * Show a zoom window (null for the full range), refining it from the proxy
+ */
+function setOverviewWindow(range) {
+  if (!overviewSeriesState) return;
+  const state = overviewSeriesState;
+  state.window = range;
+  state.series = state.fullSeries;
+  renderOverviewSeriesChart(state.series, range);
+
+  clearTimeout(overviewZoomTimer);
+  if (!range) return;
+
+  const seq = ++overviewZoomSeq;
+  overviewZoomTimer = setTimeout(async () => {
+    try {
+      const refined = await fetchOverviewSeries(state.dateRange, range);
+      // Ignore responses for windows the user has already zoomed away from
+      if (seq !== overviewZoomSeq || overviewSeriesState !== state) return;
+      state.series = refined;
+      renderOverviewSeriesChart(refined, range);
+    } catch (error) {
+      console.error('Error refining overview window:', error);
+    }
+  }, 250);
+}
+
+/**
+ * Render proxy-downsampled daily series on a linear time axis
+ */
+function renderOverviewSeriesChart(series, range) {
+  if (overviewChart) overviewChart.destroy();
+
+  const ctx = document.getElementById('overviewChart').getContext('2d');
+  const isLogScale = document.getElementById('overviewLogScale').checked;
+  const colors = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6'];
+
+  const datasets = series.map((prop, index) => {
+    const data = prop.points.map(([x, y]) => ({ x, y }));
+    const isLast = (idx) => idx === data.length - 1 && !range;
+
+    return {
+      label: prop.name,
+      data,
+      borderColor: colors[index % colors.length],
+      backgroundColor: colors[index % colors.length],
+      borderWidth: 3,
+      tension: 0.4,
+      pointStyle: data.map((_, idx) => isLast(idx) ? (propertyLogos[prop.id] || 'circle') : 'circle'),
+      pointRadius: data.map((_, idx) => isLast(idx) ? 32 : 0),
+      pointHoverRadius: 8,
+      pointBackgroundColor: 'white',
+    };
+  });
+
+  overviewChart = new Chart(ctx, {
+    type: 'line',
+    data: { datasets },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      animation: false,
+      parsing: false,
+      interaction: {
+        mode: 'nearest',
+        intersect: false,
+      },
+      plugins: {
+        legend: {
+          position: 'bottom',
+          labels: {
+            usePointStyle: false,
+            boxWidth: 15,
+            boxHeight: 15,
+            padding: 20,
+            font: { family: 'Inter', size: 12 }
+          }
+        },
+        tooltip: {
+          usePointStyle: true,
+          padding: 12,
+          backgroundColor: 'rgba(15, 23, 42, 0.9)',
+          titleFont: { family: 'Inter', size: 13 },
+          bodyFont: { family: 'Inter', size: 12 },
+          callbacks: {
+            title: (items) => new Date(items[0].parsed.x).toLocaleDateString(undefined, { timeZone: 'UTC' })
+          }
+        }
+      },
+      scales: {
+        x: {
+          type: 'linear',
+          min: range ? range.from : undefined,
+          max: range ? range.to : undefined,
+          grid: { display: false },
+          ticks: {
+            color: '#64748b',
+            maxTicksLimit: 12,
+            callback: (value) => new Date(value).toLocaleDateString(undefined, {
+              month: '2-digit', day: '2-digit', timeZone: 'UTC'
+            })
+          }
+        },
+        y: {
+          type: isLogScale ? 'logarithmic' : 'linear',
+          grid: { color: 'rgba(148, 163, 184, 0.1)' },
+          beginAtZero: false,
+          ticks: {
+            color: '#64748b',
+            maxTicksLimit: 20
+          }
+        }
+      }
+    }
+  });
+}
+
 function renderOverviewChart(data) {
   if (overviewChart) overviewChart.destroy();
 
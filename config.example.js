@@ -17,6 +17,10 @@ const CONFIG = {
 
     // OAuth Scopes (do not change unless you know what you're doing)
     SCOPES: 'https://www.googleapis.com/auth/analytics.readonly',
+
+    // Reporting proxy base URL (optional), e.g. 'http://localhost:8080'
+    // When set, GA4 reports go through Server/ga4_proxy.py for caching and tracing
+    PROXY_URL: '',
 };
 
 // ===================================
@@ -5,6 +5,7 @@ const configContent = `const CONFIG = {
     DEFAULT_PROPERTY_ID: '${process.env.DEFAULT_PROPERTY_ID || ""}',
     DISCOVERY_DOC: 'https://analyticsdata.googleapis.com/$discovery/rest?version=v1beta',
     SCOPES: 'https://www.googleapis.com/auth/analytics.readonly',
+    PROXY_URL: '${process.env.PROXY_URL || ""}',
 };
 `;
 
@@ -0,0 +1,130 @@
+"""Date-range sharding in app.js, run under Node with browser globals stubbed out"""
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+APP_JS = Path(__file__).resolve().parent.parent / 'app.js'
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='requires node')
+
+HARNESS = r"""
+const fs = require('fs'), vm = require('vm');
+const stub = new Proxy(function () {}, { get: () => stub, apply: () => stub, construct: () => stub });
+const ctx = vm.createContext({
+  console, setTimeout, document: stub, window: stub, gapi: stub, google: stub, Chart: stub,
+  localStorage: stub, fetch: stub, CONFIG: { PROXY_URL: '' },
+});
+vm.runInContext(fs.readFileSync(process.argv[1], 'utf8'), ctx);
+vm.runInContext(`(async () => { ${process.argv[2]} })()`, ctx)
+  .then(result => process.stdout.write(JSON.stringify(result)));
+"""
+
+
+def run_js(body: str):
+    """Run an async function body against app.js and return its JSON result"""
+    out = subprocess.run(['node', '-e', HARNESS, str(APP_JS), body],
+                         capture_output=True, text=True, timeout=30, check=True)
+    return json.loads(out.stdout)
+
+
+def test_short_range_is_not_split():
+    assert run_js("return splitDateRange({startDate: '2024-01-01', endDate: '2024-01-31'});") == [
+        {'startDate': '2024-01-01', 'endDate': '2024-01-31'}
+    ]
+
+
+def test_relative_dates_are_not_split():
+    assert run_js("return splitDateRange({startDate: '365daysAgo', endDate: 'today'});") == [
+        {'startDate': '365daysAgo', 'endDate': 'today'}
+    ]
+
+
+def test_medium_range_splits_by_week():
+    shards = run_js("return splitDateRange({startDate: '2024-01-01', endDate: '2024-02-15', name: 'current'});")
+    assert shards[0] == {'startDate': '2024-01-01', 'endDate': '2024-01-07', 'name': 'current'}
+    assert shards[-1] == {'startDate': '2024-02-12', 'endDate': '2024-02-15', 'name': 'current'}
+    assert len(shards) == 7
+
+
+def test_long_range_splits_by_calendar_month_without_gaps():
+    shards = run_js("return splitDateRange({startDate: '2023-07-15', endDate: '2024-06-30'});")
+    assert shards[0] == {'startDate': '2023-07-15', 'endDate': '2023-07-31'}
+    assert {'startDate': '2024-02-01', 'endDate': '2024-02-29'} in shards
+    assert shards[-1] == {'startDate': '2024-06-01', 'endDate': '2024-06-30'}
+    assert len(shards) == 12
+
+
+def test_user_counts_are_not_sharded_without_a_date_dimension():
+    result = run_js("""
+        return [
+          canShardRequest({metrics: [{name: 'activeUsers'}], dimensions: [{name: 'deviceCategory'}]}),
+          canShardRequest({metrics: [{name: 'activeUsers'}], dimensions: [{name: 'date'}]}),
+          canShardRequest({metrics: [{name: 'engagementRate'}, {name: 'sessions'}]}),
+          canShardRequest({metrics: [{name: 'engagementRate'}]}),
+          canShardRequest({metrics: [{name: 'sessions'}], offset: 10}),
+        ];
+    """)
+    assert result == [False, True, True, False, False]
+
+
+def test_merge_sums_additive_and_weights_ratio_metrics():
+    merged = run_js("""
+        const request = {
+          dateRanges: [{startDate: '2024-01-01', endDate: '2024-03-31'}],
+          metrics: [{name: 'sessions'}, {name: 'engagementRate'}],
+          dimensions: [{name: 'deviceCategory'}],
+        };
+        const row = (device, sessions, rate) => ({
+          dimensionValues: [{value: device}], metricValues: [{value: String(sessions)}, {value: String(rate)}],
+        });
+        const shards = [{rangeIndex: 0}, {rangeIndex: 0}];
+        return mergeShardResponses(request, shards, [
+          {rowCount: 1, rows: [row('mobile', 100, 0.5)]},
+          {rowCount: 1, rows: [row('mobile', 300, 0.9)]},
+        ]);
+    """)
+    values = [float(v['value']) for v in merged['rows'][0]['metricValues']]
+    assert values == [400, pytest.approx(0.8)]
+
+
+def test_merge_reorders_truncates_and_keeps_total_row_count():
+    merged = run_js("""
+        const request = {
+          dateRanges: [{startDate: '2024-01-01', endDate: '2024-03-31'}],
+          metrics: [{name: 'userEngagementDuration'}],
+          dimensions: [{name: 'pagePath'}],
+          limit: 2,
+        };
+        const row = (path, value) => ({dimensionValues: [{value: path}], metricValues: [{value: String(value)}]});
+        const shards = [{rangeIndex: 0}, {rangeIndex: 0}];
+        return mergeShardResponses(request, shards, [
+          {rowCount: 40, rows: [row('/a', 5), row('/b', 1)]},
+          {rowCount: 3, rows: [row('/c', 4), row('/b', 9)]},
+        ]);
+    """)
+    assert [r['dimensionValues'][0]['value'] for r in merged['rows']] == ['/b', '/a']
+    assert merged['rowCount'] == 40
+
+
+def test_reports_for_one_property_share_its_concurrency_limit():
+    peak = run_js("""
+        let inflight = 0, peak = 0;
+        runReport = async () => {
+          inflight++; peak = Math.max(peak, inflight);
+          await new Promise(resolve => setTimeout(resolve, 5));
+          inflight--;
+          return {rowCount: 0, rows: []};
+        };
+        const request = {
+          dateRanges: [{startDate: '2024-01-01', endDate: '2024-12-31'}],
+          metrics: [{name: 'sessions'}],
+          dimensions: [{name: 'date'}],
+        };
+        await Promise.all([1, 2, 3, 4, 5].map(() => runShardedReport('123', request)));
+        return peak;
+    """)
+    assert peak == 6
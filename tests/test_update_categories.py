@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from update_categories import detect_site, parse_log_file, update_json
+
+SITE_URL = 'https://collegian.com'
+
+
+def write_log(tmp_path, *lines):
+    path = tmp_path / 'collegian_log.txt'
+    path.write_text(''.join(f'{line}\n' for line in lines), encoding='utf-8')
+    return path
+
+
+def test_detect_site_prefers_longest_key():
+    keys = ['college', 'collegeavemag', 'collegian']
+    assert detect_site('logs/collegeavemag_log.txt', keys) == 'collegeavemag'
+    assert detect_site('Collegian-2024.txt', keys) == 'collegian'
+    assert detect_site('kcsu_log.txt', keys) is None
+
+
+def test_nesting_uses_leading_markers_only(tmp_path):
+    path = write_log(
+        tmp_path,
+        'noise before the dump',
+        '[Log] Name,Slug,Count',
+        '[Log] "Arts — Culture","arts-culture",3',
+        '[Log] "— Music","music",7',
+        '[Log] "— — Reviews","reviews",2',
+        '[Log] "— Film","film",1',
+    )
+    categories = parse_log_file(path, SITE_URL)
+
+    assert categories['arts-culture']['name'] == 'Arts — Culture'
+    assert categories['arts-culture']['depth'] == 0
+    assert (categories['reviews']['depth'], categories['reviews']['parent']) == (2, 'music')
+    assert categories['film']['parent'] == 'arts-culture'
+    assert categories['music']['url'] == 'https://collegian.com/category/music/'
+
+
+def test_last_complete_run_wins(tmp_path):
+    path = write_log(
+        tmp_path,
+        '[Log] Name,Slug,Count',
+        '[Log] "News","news",1',
+        '[Log] "Old","old",1',
+        '[Log] Name,Slug,Count',
+        '[Log] "News","news",5',
+    )
+    assert list(parse_log_file(path, SITE_URL)) == ['news']
+    assert parse_log_file(path, SITE_URL)['news']['count'] == 5
+
+
+@pytest.mark.parametrize('tail', ['[Log] "Sports","spo', '[Log] "Sports","sports",1x'])
+def test_truncated_final_run_falls_back(tmp_path, tail):
+    path = write_log(
+        tmp_path,
+        '[Log] Name,Slug,Count',
+        '[Log] "News","news",1',
+        '[Log] Name,Slug,Count',
+        '[Log] "Opinion","opinion",2',
+        tail,
+    )
+    assert list(parse_log_file(path, SITE_URL)) == ['news']
+
+
+def test_empty_final_run_falls_back(tmp_path):
+    path = write_log(tmp_path, '[Log] Name,Slug,Count', '[Log] "News","news",1', '[Log] Name,Slug,Count')
+    assert list(parse_log_file(path, SITE_URL)) == ['news']
+
+
+def test_update_json_replaces_known_sites(tmp_path):
+    json_file = tmp_path / 'categories.json'
+    json_file.write_text(json.dumps({'collegian': {'site': 'Collegian', 'categories': []}}))
+
+    update_json({'collegian': [{'slug': 'news'}], 'unknown': [{'slug': 'x'}]}, json_file)
+
+    data = json.loads(json_file.read_text())
+    assert data == {'collegian': {'site': 'Collegian', 'categories': [{'slug': 'news'}], 'total_categories': 1}}
+    assert not (tmp_path / 'categories.json.tmp').exists()
+
+
+@pytest.mark.parametrize('site_categories', [{}, {'unknown': [{'slug': 'x'}]}])
+def test_update_json_skips_write_when_nothing_applies(tmp_path, site_categories):
+    json_file = tmp_path / 'categories.json'
+    json_file.write_text('{"collegian": {"site": "Collegian", "categories": []}}')
+    before = json_file.stat().st_mtime_ns
+
+    update_json(site_categories, json_file)
+
+    assert json_file.read_text() == '{"collegian": {"site": "Collegian", "categories": []}}'
+    assert json_file.stat().st_mtime_ns == before
@@ -1,73 +1,175 @@
-import json
-import re
+import argparse
 import csv
-import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 # Input and Output paths
-LOG_FILE = 'collegian_log.txt'
+LOG_FILES = ['collegian_log.txt']
 JSON_FILE = 'Scraper/rmsmc_categories.json'
 
-def parse_log_file(file_path):
-    categories = []
-    
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    
-    # Skip lines that don't look like CSV data or header
-    data_lines = [line.replace('[Log] ', '').strip() for line in lines if '[Log]' in line]
-    
-    # Parse CSV
-    reader = csv.reader(data_lines)
-    header = next(reader, None) # Skip header: Name,Slug,Count
-    
-    for row in reader:
-        if len(row) < 3:
+LOG_PREFIX = '[Log] '
+HEADER = ['Name', 'Slug', 'Count']
+DEPTH_MARKER = '—'
+
+
+def detect_site(file_path, site_keys):
+    """Detect the site from a log file name, e.g. collegian_log.txt -> collegian"""
+    stem = Path(file_path).stem.lower()
+    # Longest key first so 'collegeavemag' wins over a shorter prefix
+    for key in sorted(site_keys, key=len, reverse=True):
+        if stem == key or stem.startswith(key + '_') or stem.startswith(key + '-'):
+            return key
+    return None
+
+
+def parse_log_file(file_path, site_url):
+    """
+    Stream a console log dump and return category records keyed by slug.
+
+    Lines are read one at a time, so memory is bounded by the number of
+    categories rather than the file size. A file may hold many concatenated
+    runs; each Name,Slug,Count header starts a new run, and the result is the
+    last complete run, so slugs a later run dropped do not linger.
+
+    A run counts as cut short when it has no rows or ends on a partial row
+    (missing fields or a non-numeric count); the previous complete run is
+    used instead, or nothing if there is none. A dump that happens to stop
+    exactly at a line boundary cannot be told apart from a shorter run.
+    """
+    categories = {}
+    completed = {}  # Last complete run, in case the final one was cut short
+    truncated = False  # Whether the current run's last line was a partial row
+    parents = []  # Slug at each depth of the current run
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if LOG_PREFIX not in line:
+                continue
+
+            row = next(csv.reader([line.split(LOG_PREFIX, 1)[1].strip()]), None)
+            if row and row[:3] == HEADER:
+                if categories and not truncated:
+                    completed = categories
+                categories = {}
+                truncated = False
+                parents = []
+                continue
+
+            try:
+                raw_name, slug, count = row[0], row[1], int(row[2])
+            except (TypeError, IndexError, ValueError):
+                # A partial row; if nothing follows it, the dump was cut mid-line
+                truncated = True
+                continue
+            truncated = False
+
+            # Nesting is shown as leading dashes: "— — Music" is depth 2. Only the
+            # leading ones count, so "Arts — Culture" stays a top-level name
+            depth = 0
+            name = raw_name.strip()
+            while name.startswith(DEPTH_MARKER):
+                depth += 1
+                name = name[len(DEPTH_MARKER):].lstrip()
+
+            del parents[depth:]
+            parent = parents[-1] if parents else None
+            parents.append(slug)
+
+            categories[slug] = {
+                "name": name,
+                "slug": slug,
+                # Assuming standard WordPress category structure
+                "url": f"{site_url}/category/{slug}/",
+                "count": count,
+                "depth": depth,
+                "parent": parent
+            }
+
+    return completed if truncated or not categories else categories
+
+
+def _parse_job(job):
+    site_key, file_path, site_url = job
+    return site_key, file_path, parse_log_file(file_path, site_url)
+
+
+def ingest_logs(log_files, data, site=None, workers=None):
+    """Parse log files in parallel and return {site: [records]}"""
+    jobs = []
+    for file_path in log_files:
+        site_key = site or detect_site(file_path, data.keys())
+        if site_key is None or site_key not in data:
+            print(f"Error: could not determine a known site for {file_path}; use --site.")
             continue
-            
-        raw_name = row[0]
-        slug = row[1]
-        count = row[2]
-        
-        # Clean name (remove dashes)
-        name = raw_name.replace('— ', '').replace('—', '').strip()
-        
-        # Construct URL
-        # Assuming standard WordPress category structure
-        url = f"https://collegian.com/category/{slug}/"
-        
-        categories.append({
-            "name": name,
-            "slug": slug,
-            "url": url
-        })
-        
-    return categories
-
-def update_json(categories):
+        jobs.append((site_key, file_path, data[site_key]['url'].rstrip('/')))
+
+    merged = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map preserves input order, so a later file's run replaces an earlier one for the same site
+        for site_key, file_path, categories in pool.map(_parse_job, jobs):
+            print(f"Parsed {file_path}: {len(categories)} categories for {site_key}.")
+            if categories:
+                merged[site_key] = categories
+
+    return {site_key: list(categories.values()) for site_key, categories in merged.items()}
+
+
+def update_json(site_categories, json_file=JSON_FILE):
+    """Update every ingested site and replace the JSON file in one atomic write"""
+    if not site_categories:
+        print("Nothing ingested; JSON file left unchanged.")
+        return
+
     try:
-        with open(JSON_FILE, 'r') as f:
+        with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
     except FileNotFoundError:
-        print(f"Error: {JSON_FILE} not found.")
+        print(f"Error: {json_file} not found.")
         return
 
-    # Update Collegian data
-    if 'collegian' in data:
-        data['collegian']['categories'] = categories
-        data['collegian']['total_categories'] = len(categories)
-        print(f"Updated Collegian with {len(categories)} categories.")
-    else:
-        print("Error: 'collegian' key not found in JSON.")
+    updated = 0
+    for site_key, categories in site_categories.items():
+        if site_key not in data:
+            print(f"Error: '{site_key}' key not found in JSON.")
+            continue
+        data[site_key]['categories'] = categories
+        data[site_key]['total_categories'] = len(categories)
+        updated += 1
+        print(f"Updated {data[site_key]['site']} with {len(categories)} categories.")
+
+    if not updated:
+        print("No known sites updated; JSON file left unchanged.")
         return
 
-    with open(JSON_FILE, 'w') as f:
+    tmp_file = f"{json_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, json_file)
     print("JSON file saved.")
 
+
 if __name__ == "__main__":
-    print("Parsing log file...")
-    new_categories = parse_log_file(LOG_FILE)
-    print(f"Found {len(new_categories)} categories.")
-    
+    parser = argparse.ArgumentParser(description='Update category JSON from [Log] Name,Slug,Count console dumps')
+    parser.add_argument('log_files', nargs='*', default=LOG_FILES, help='Log files to ingest (site detected from file name)')
+    parser.add_argument('--site', help='Site key for all log files when it cannot be detected from the name')
+    parser.add_argument('--json', default=JSON_FILE, help='Category JSON file to update')
+    parser.add_argument('--workers', type=int, help='Parallel parser processes (default: CPU count)')
+    args = parser.parse_args()
+
+    try:
+        with open(args.json, 'r', encoding='utf-8') as f:
+            known_sites = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: {args.json} not found.")
+        raise SystemExit(1)
+
+    print("Parsing log files...")
+    new_categories = ingest_logs(args.log_files, known_sites, site=args.site, workers=args.workers)
+    print(f"Found {sum(len(c) for c in new_categories.values())} categories across {len(new_categories)} sites.")
+
     print("Updating JSON...")
-    update_json(new_categories)
+    update_json(new_categories, args.json)